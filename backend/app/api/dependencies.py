@@ -0,0 +1,99 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+import logging
+
+from fastapi import Header, HTTPException, Request
+
+from app.core.config import settings
+from app.core.profiling import TOKEN_HEADER, ProfileStore, is_admin_token
+from app.services.advice_cache import AdviceCache, create_advice_cache
+from app.services.data_ingestion import DataIngestionService
+from app.services.rag_service import RAGService
+from app.services.vector_store import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Services:
+    """The long-lived services behind the API, one instance of each per app."""
+    vector_store: VectorStoreService
+    advice_cache: Optional[AdviceCache]
+    rag_service: RAGService
+    data_ingestion: DataIngestionService
+    profile_store: ProfileStore
+
+
+def create_services() -> Services:
+    """Build the services; opens the Chroma client and the embedding cache."""
+    start = time.perf_counter()
+    vector_store = VectorStoreService()
+    advice_cache = create_advice_cache()
+    services = Services(
+        vector_store=vector_store,
+        advice_cache=advice_cache,
+        rag_service=RAGService(vector_store, advice_cache=advice_cache),
+        data_ingestion=DataIngestionService(),
+        profile_store=ProfileStore()
+    )
+    logger.info(f"Services started in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return services
+
+
+async def warm_up(services: Services):
+    """Load the embedding model and the champion index before the first request."""
+    start = time.perf_counter()
+    vector_store = services.vector_store
+    try:
+        await asyncio.gather(
+            vector_store.run(vector_store.embed_query, "warm up"),
+            vector_store.run(vector_store.comp_index)
+        )
+    except Exception as e:
+        logger.warning(f"Warm-up failed, first requests will be slower: {e}")
+        return
+    logger.info(f"Warm-up took {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+async def close_services(services: Services):
+    """Release pooled connections, threads and worker processes."""
+    await services.data_ingestion.riot_client.aclose()
+    services.data_ingestion.parallel_stats.shutdown()
+    services.data_ingestion.close()
+    services.vector_store.close()
+    if services.advice_cache is not None:
+        await services.advice_cache.close()
+
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+
+def get_vector_store(request: Request) -> VectorStoreService:
+    return get_services(request).vector_store
+
+
+def get_advice_cache(request: Request) -> Optional[AdviceCache]:
+    return get_services(request).advice_cache
+
+
+def get_rag_service(request: Request) -> RAGService:
+    return get_services(request).rag_service
+
+
+def get_data_ingestion(request: Request) -> DataIngestionService:
+    return get_services(request).data_ingestion
+
+
+def get_profile_store(request: Request) -> ProfileStore:
+    return get_services(request).profile_store
+
+
+def require_profiling_token(header_token: Optional[str] = Header(None, alias=TOKEN_HEADER)):
+    """Reject requests without the profiling admin token (404 while profiling is disabled)."""
+    if not settings.profiling_admin_token:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not is_admin_token(header_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
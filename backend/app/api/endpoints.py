@@ -1,14 +1,28 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Literal, Optional
+import asyncio
 import logging
 
 from app.models.schemas import (
+    AdviceMode,
     GameSnapshot, 
     StrategicAdvice,
     CompStats,
     AugmentStats,
     HealthStatus
 )
+from app.api.dependencies import (
+    get_advice_cache,
+    get_data_ingestion,
+    get_profile_store,
+    get_rag_service,
+    get_vector_store,
+    require_profiling_token
+)
+from app.core.profiling import ProfileStore
+from app.services.advice_cache import AdviceCache
+from app.services.json_stream import sse_event
 from app.services.rag_service import RAGService
 from app.services.vector_store import VectorStoreService
 from app.services.data_ingestion import DataIngestionService
@@ -19,20 +33,15 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize services
-rag_service = RAGService()
-vector_store = VectorStoreService()
-data_ingestion = DataIngestionService()
-
 
 @router.get("/health", response_model=HealthStatus)
-async def health_check():
+async def health_check(vector_store: VectorStoreService = Depends(get_vector_store)):
     """Health check endpoint."""
     riot_configured = bool(settings.riot_api_key)
     
     try:
         # Test vector store connection
-        vector_store.comp_collection.count()
+        await vector_store.run(vector_store.comp_collection.count)
         db_connected = True
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
@@ -47,26 +56,61 @@ async def health_check():
 
 
 @router.post("/advice", response_model=StrategicAdvice)
-async def get_strategic_advice(snapshot: GameSnapshot):
+async def get_strategic_advice(
+    snapshot: GameSnapshot,
+    mode: AdviceMode = AdviceMode.LLM,
+    rag_service: RAGService = Depends(get_rag_service)
+):
     """
     Get strategic advice for the current game state.
     
     Uses RAG to retrieve relevant statistics and playbooks,
-    then generates ranked strategic options.
+    then generates ranked strategic options. ``mode=fast`` ranks
+    options from the statistics alone, without calling the LLM.
     """
     try:
-        advice = await rag_service.generate_advice(snapshot)
+        advice = await rag_service.generate_advice(snapshot, mode=mode)
         return advice
     except Exception as e:
         logger.error(f"Error generating advice: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/advice/stream")
+async def stream_strategic_advice(
+    snapshot: GameSnapshot,
+    mode: AdviceMode = AdviceMode.LLM,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Stream strategic advice as server-sent events.
+    
+    Emits a ``context`` event once retrieval is done, an ``option`` event
+    per strategic option as soon as the LLM has produced it, then
+    ``general_advice`` and ``done`` (the complete advice). Failures are
+    reported as an ``error`` event.
+    """
+    async def events():
+        try:
+            async for event, data in rag_service.stream_advice(snapshot, mode=mode):
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error(f"Error streaming advice: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/data/ingest/player")
 async def ingest_player_data(
     puuid: str,
     count: int = 20,
-    background_tasks: BackgroundTasks = None
+    background_tasks: BackgroundTasks = None,
+    data_ingestion: DataIngestionService = Depends(get_data_ingestion)
 ):
     """
     Ingest match data for a specific player.
@@ -82,8 +126,8 @@ async def ingest_player_data(
             )
             return {"status": "ingestion_started", "puuid": puuid, "count": count}
         else:
-            matches = await data_ingestion.ingest_player_matches(puuid, count)
-            return {"status": "completed", "matches_ingested": len(matches)}
+            matches, saved = await data_ingestion.crawl_player_matches(puuid, count)
+            return {"status": "completed", "matches_ingested": len(matches), "fetches_saved": saved}
     except Exception as e:
         logger.error(f"Error ingesting player data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -94,7 +138,8 @@ async def ingest_high_elo_data(
     platform: str = "na1",
     matches_per_player: int = 10,
     max_players: int = 50,
-    background_tasks: BackgroundTasks = None
+    background_tasks: BackgroundTasks = None,
+    data_ingestion: DataIngestionService = Depends(get_data_ingestion)
 ):
     """
     Ingest match data from high ELO players.
@@ -111,55 +156,61 @@ async def ingest_high_elo_data(
             )
             return {"status": "ingestion_started", "platform": platform}
         else:
-            matches = await data_ingestion.ingest_high_elo_matches(
+            matches, saved = await data_ingestion.crawl_high_elo_matches(
                 platform, 
                 matches_per_player, 
                 max_players
             )
-            return {"status": "completed", "matches_ingested": len(matches)}
+            return {"status": "completed", "matches_ingested": len(matches), "fetches_saved": saved}
     except Exception as e:
         logger.error(f"Error ingesting high ELO data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/data/compute-stats")
-async def compute_and_store_stats(patch: str):
+async def compute_and_store_stats(
+    patch: str,
+    data_ingestion: DataIngestionService = Depends(get_data_ingestion),
+    vector_store: VectorStoreService = Depends(get_vector_store),
+    advice_cache: Optional[AdviceCache] = Depends(get_advice_cache)
+):
     """
-    Compute statistics from cached match data and store in vector database.
+    Compute statistics from stored match data and store in vector database.
     
-    This processes all cached matches and computes comp/augment statistics.
+    Matches not yet covered by the patch's persisted aggregate are folded
+    into it; comp/augment statistics are then materialized from the aggregate.
     """
     try:
-        import json
-        from pathlib import Path
-        from app.models.schemas import MatchData
-        
-        # Load all cached matches
-        cache_dir = Path(settings.match_data_cache_dir)
-        matches = []
+        if not len(data_ingestion.match_store):
+            raise HTTPException(status_code=404, detail="No stored matches found")
         
-        for match_file in cache_dir.glob("*.json"):
-            with open(match_file, 'r') as f:
-                data = json.load(f)
-                matches.append(MatchData(**data))
+        # Fold new matches into the persisted aggregate (off the event loop)
+        aggregate, matches_added = await data_ingestion.update_stats_aggregate_async(patch)
         
-        if not matches:
-            raise HTTPException(status_code=404, detail="No cached matches found")
+        # Materialize statistics
+        comp_stats, augment_stats = await asyncio.to_thread(
+            lambda: (aggregate.comp_stats(), aggregate.augment_stats())
+        )
         
-        # Compute statistics
-        comp_stats = data_ingestion.compute_comp_stats(matches, patch)
-        augment_stats = data_ingestion.compute_augment_stats(matches, patch)
+        # Store in vector database, touching only documents that changed
+        comp_changes = await vector_store.run(vector_store.reindex_comp_stats, patch, comp_stats)
+        augment_changes = await vector_store.run(vector_store.reindex_augment_stats, patch, augment_stats)
         
-        # Store in vector database
-        vector_store.add_comp_stats(comp_stats)
-        vector_store.add_augment_stats(augment_stats)
+        # Cached advice was built from the previous stats
+        if advice_cache is not None:
+            await advice_cache.invalidate(patch)
         
         return {
             "status": "completed",
-            "matches_processed": len(matches),
+            "matches_processed": aggregate.matches_seen,
+            "matches_added": matches_added,
             "comps_indexed": len(comp_stats),
-            "augments_indexed": len(augment_stats)
+            "augments_indexed": len(augment_stats),
+            "comp_changes": comp_changes,
+            "augment_changes": augment_changes
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error computing stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,7 +220,8 @@ async def compute_and_store_stats(patch: str):
 async def add_playbook(
     title: str,
     content: str,
-    tags: List[str] = None
+    tags: List[str] = None,
+    vector_store: VectorStoreService = Depends(get_vector_store)
 ):
     """
     Add a strategic playbook to the knowledge base.
@@ -178,7 +230,7 @@ async def add_playbook(
     during RAG to provide additional context.
     """
     try:
-        vector_store.add_playbook(title, content, tags or [])
+        await vector_store.run(vector_store.add_playbook, title, content, tags or [])
         return {"status": "success", "title": title}
     except Exception as e:
         logger.error(f"Error adding playbook: {e}")
@@ -186,10 +238,15 @@ async def add_playbook(
 
 
 @router.get("/stats/compositions", response_model=List[dict])
-async def query_compositions(query: str, n_results: int = 5, patch: str = None):
+async def query_compositions(
+    query: str,
+    n_results: int = 5,
+    patch: str = None,
+    vector_store: VectorStoreService = Depends(get_vector_store)
+):
     """Query for relevant composition statistics."""
     try:
-        results = vector_store.query_compositions(query, n_results, patch)
+        results = await vector_store.aquery_compositions(query, n_results, patch)
         return results
     except Exception as e:
         logger.error(f"Error querying compositions: {e}")
@@ -197,11 +254,47 @@ async def query_compositions(query: str, n_results: int = 5, patch: str = None):
 
 
 @router.get("/stats/augments", response_model=List[dict])
-async def query_augments(query: str, n_results: int = 5, patch: str = None):
+async def query_augments(
+    query: str,
+    n_results: int = 5,
+    patch: str = None,
+    vector_store: VectorStoreService = Depends(get_vector_store)
+):
     """Query for relevant augment statistics."""
     try:
-        results = vector_store.query_augments(query, n_results, patch)
+        results = await vector_store.aquery_augments(query, n_results, patch)
         return results
     except Exception as e:
         logger.error(f"Error querying augments: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/profiles", dependencies=[Depends(require_profiling_token)])
+async def list_profiles(profile_store: ProfileStore = Depends(get_profile_store)):
+    """
+    List stored request profiles, newest first.
+    
+    Requests to the profiled paths are profiled when they carry the
+    profiling token in the ``X-Profile-Token`` header;
+    the response's ``X-Profile-Id`` header names the stored profile.
+    """
+    return await asyncio.to_thread(profile_store.list)
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def download_profile(
+    profile_id: str,
+    format: Literal["json", "folded"] = "json",
+    profile_store: ProfileStore = Depends(get_profile_store)
+):
+    """
+    Download a profile: a JSON call tree per thread, or collapsed stacks
+    (``format=folded``) for flame graph tools such as speedscope.
+    """
+    try:
+        path = profile_store.path(profile_id, format)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    media_type = "text/plain" if format == "folded" else "application/json"
+    return FileResponse(path, media_type=media_type, filename=path.name)
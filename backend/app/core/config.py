@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -8,24 +8,81 @@ class Settings(BaseSettings):
     # Riot API
     riot_api_key: str = ""
     riot_api_region: str = "americas"
+    riot_http_max_connections: int = 50
+    riot_http_max_keepalive_connections: int = 20
+    riot_http_keepalive_expiry: float = 30.0
+    riot_http_timeout: float = 10.0
+    riot_http_connect_timeout: float = 5.0
+    riot_http2: bool = False
+    riot_app_rate_limit: str = "20:1,100:120"
+    riot_rate_limit_margin: float = 0.1
+    riot_max_retries: int = 3
+    riot_retry_after_default: float = 1.0
+    # Record Riot responses to riot_fixture_path, or replay them from an in-process stand-in
+    riot_fixture_mode: Literal["off", "record", "replay"] = "off"
+    riot_fixture_path: str = "./data/riot_fixtures.jsonl"
+    riot_replay_latency: float = 0.0
+    # Send every Riot request to this host instead, e.g. a localhost stand-in
+    riot_api_base_url: str = ""
     
     # OpenAI
     openai_api_key: str = ""
     openai_model: str = "gpt-4-turbo-preview"
+    openai_timeout: float = 30.0
+    # "sequential", "concurrent" (options and general advice in parallel) or
+    # "merged" (both from one structured completion)
+    advice_generation_mode: Literal["sequential", "concurrent", "merged"] = "concurrent"
+    # Seconds to wait for LLM advice before answering from stats alone (0 waits for the LLM)
+    llm_latency_budget: float = 12.0
+    # Prompt context: results retrieved per collection, and the token budget they are packed into
+    context_candidates: int = 8
+    context_token_budget: int = 1200
     
     # Database
     chroma_persist_directory: str = "./data/chroma_db"
+    vector_store_threads: int = 8
+    # Load the embedding model and champion index at startup instead of on the first request
+    warm_up_on_startup: bool = False
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "./data/embedding_cache.sqlite3"
+    embedding_cache_memory_size: int = 10000
     
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
     debug: bool = True
+    # Record latency/throughput metrics and serve them at /metrics (Prometheus text format)
+    metrics_enabled: bool = False
+    # On-demand request profiling: requests to profiling_paths carrying this token in the
+    # X-Profile-Token header are sampled; disabled while empty
+    profiling_admin_token: str = ""
+    profiling_paths: str = "/api/advice,/api/data/compute-stats"
+    profiling_sample_rate: float = 1.0  # share of token-carrying requests that are profiled
+    profiling_interval: float = 0.005
+    profiling_max_seconds: float = 120.0
+    profiling_dir: str = "./data/profiles"
+    profiling_max_profiles: int = 50
     
     # Redis
     redis_url: Optional[str] = None
     
+    # Advice cache: "memory" (per-process LRU), "redis" (uses redis_url) or "none"
+    advice_cache_backend: Literal["none", "memory", "redis"] = "memory"
+    advice_cache_ttl: float = 600.0
+    advice_cache_max_entries: int = 1000
+    
     # Data
     match_data_cache_dir: str = "./data/cache"
+    match_store_backend: Literal["segment", "json"] = "segment"
+    match_store_dir: str = "./data/match_store"
+    match_store_segment_max_bytes: int = 64 * 1024 * 1024
+    match_store_compression_level: int = 6
+    stats_aggregate_dir: str = "./data/stats"
+    stats_batch_size: int = 500
+    stats_workers: int = 1  # processes for stats computation; 0 = one per CPU
+    stats_parallel_min_matches: int = 5000
+    ingestion_match_concurrency: int = 20
+    ingestion_player_concurrency: int = 5
     playbooks_dir: str = "./data/playbooks"
     
     class Config:
@@ -0,0 +1,319 @@
+"""
+Process-wide metrics, exposed in the Prometheus text format at ``/metrics``.
+
+Metrics are module-level objects updated inline by the services. Every
+update first checks ``settings.metrics_enabled`` and returns straight away
+when it is off, so instrumented code costs one attribute lookup per call
+unless metrics are switched on.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+PREFIX = "tft_advisor_"
+
+# Seconds; covers sub-millisecond index lookups up to slow LLM completions
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Timer:
+    """Context manager observing its elapsed wall time into a histogram."""
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metric:
+    """Base class: a named family of time series, one per label combination."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing total, e.g. requests or matches ingested."""
+
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        self._values: Dict[LabelValues, float] = {}
+        super().__init__(*args, **kwargs)
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        if not settings.metrics_enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Value that can go up and down, e.g. the throughput of the last crawl."""
+
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        self._values: Dict[LabelValues, float] = {}
+        super().__init__(*args, **kwargs)
+
+    def set(self, value: float, **labels: str):
+        if not settings.metrics_enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observed values (latencies, token counts) in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: bucket counts (last one is +Inf), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value: float, **labels: str):
+        if not settings.metrics_enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def time(self, **labels: str):
+        """Context manager observing the wall time of its block, in seconds."""
+        if not settings.metrics_enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._values.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def sum(self, **labels: str) -> float:
+        series = self._values.get(self._key(labels))
+        return series[1][0] if series else 0.0
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The set of metrics rendered at ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def reset(self):
+        """Clear every recorded value, e.g. between tests."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# Advice
+ADVICE_SECONDS = Histogram(
+    "advice_seconds",
+    "End-to-end advice latency by requested mode and by what produced the answer",
+    ("mode", "source")
+)
+ADVICE_STAGE_SECONDS = Histogram(
+    "advice_stage_seconds",
+    "Latency of advice pipeline stages: retrieval, context build, LLM calls",
+    ("stage",)
+)
+ADVICE_FALLBACKS = Counter(
+    "advice_fallbacks",
+    "Advice answered from stats because the LLM failed or exceeded its latency budget",
+    ("reason",)
+)
+ADVICE_CACHE_REQUESTS = Counter("advice_cache_requests", "Advice cache lookups", ("result",))
+CONTEXT_TOKENS = Histogram(
+    "context_tokens",
+    "Tokens of retrieved context packed into the prompt",
+    buckets=(100, 200, 400, 600, 800, 1000, 1200, 1600, 2000, 4000)
+)
+LLM_TOKENS = Counter("llm_tokens", "Tokens used by LLM completions", ("model", "kind"))
+
+# Vector store
+VECTOR_STORE_SECONDS = Histogram(
+    "vector_store_seconds",
+    "Latency of vector store operations: query embedding, each collection query, board index lookup",
+    ("operation",)
+)
+EMBEDDING_CACHE_REQUESTS = Counter(
+    "embedding_cache_requests",
+    "Texts looked up in the embedding cache, by where the embedding came from",
+    ("result",)
+)
+
+# Riot API
+RIOT_REQUESTS = Counter("riot_requests", "Riot API responses by method and status code", ("method", "status"))
+RIOT_REQUEST_SECONDS = Histogram("riot_request_seconds", "Riot API request latency", ("method",))
+RIOT_RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "riot_rate_limit_wait_seconds",
+    "Time requests waited for the client-side rate limiter",
+    ("method",)
+)
+RIOT_RATE_LIMITED = Counter(
+    "riot_rate_limited",
+    "429 responses from the Riot API by method and X-Rate-Limit-Type",
+    ("method", "type")
+)
+
+# Ingestion
+INGESTED_MATCHES = Counter("ingested_matches", "Matches returned by ingestion crawls", ("source",))
+INGESTION_FETCHES_SAVED = Counter(
+    "ingestion_fetches_saved",
+    "Match fetches avoided because the match was already stored or in flight"
+)
+INGESTION_SECONDS = Histogram(
+    "ingestion_seconds",
+    "Duration of ingestion crawls",
+    ("source",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+INGESTION_MATCHES_PER_SECOND = Gauge(
+    "ingestion_matches_per_second",
+    "Throughput of the most recent ingestion crawl",
+    ("source",)
+)
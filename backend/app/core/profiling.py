@@ -0,0 +1,284 @@
+"""
+On-demand statistical profiling of single requests.
+
+A request to one of ``profiling_paths`` that carries the admin token in
+the ``X-Profile-Token`` header is profiled with probability
+``profiling_sample_rate``. While it runs, a background thread samples the
+Python stack of every thread every ``profiling_interval`` seconds, so the
+profile also covers the vector-store and stats threads the request hands
+work to (and, on a busy server, whatever else runs at the same time). Work
+done in stats worker processes is not sampled. The profile, a call tree per thread plus the
+request's wall time, is written to ``profiling_dir`` and can be downloaded
+from ``/api/profiles/{id}``.
+
+Nothing is sampled unless ``profiling_admin_token`` is set, and at most one
+request is profiled at a time, so the hook is safe to leave in production.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+# Leaf frames of pool threads waiting for work; their samples are dropped
+IDLE_FRAMES = {
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+Stack = Tuple[str, ...]
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether ``token`` matches ``profiling_admin_token``; always False while it is unset."""
+    expected = settings.profiling_admin_token
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+def _frame_name(code) -> str:
+    """Display name of a code object, with its file relative to ``sys.path``."""
+    filename = code.co_filename
+    for prefix in sys.path:
+        if prefix and filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1:]
+            break
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+
+
+def _call_tree(stacks: Dict[Stack, int]) -> Dict[str, Any]:
+    root: Dict[str, Any] = {"name": "<root>", "samples": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["samples"] += count
+        for name in stack:
+            node = node["children"].setdefault(name, {"name": name, "samples": 0, "children": {}})
+            node["samples"] += count
+
+    def finish(node: Dict[str, Any]) -> Dict[str, Any]:
+        children = sorted(node["children"].values(), key=lambda child: -child["samples"])
+        return {"name": node["name"], "samples": node["samples"], "children": [finish(child) for child in children]}
+
+    return finish(root)
+
+
+@dataclass
+class Profile:
+    """Sampled stacks of one request, with the request's wall time."""
+    id: str
+    method: str
+    path: str
+    started_at: str
+    interval: float
+    wall_time: float = 0.0
+    samples: int = 0
+    truncated: bool = False
+    # thread name -> stack (outermost frame first) -> samples
+    stacks: Dict[str, Dict[Stack, int]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["stacks"]
+        data["threads"] = {
+            thread: _call_tree(stacks)
+            for thread, stacks in sorted(self.stacks.items(), key=lambda item: -sum(item[1].values()))
+        }
+        return data
+
+    def folded(self) -> str:
+        """Collapsed stacks (``thread;frame;frame count``), for flame graph tools such as speedscope."""
+        lines = []
+        for thread, stacks in self.stacks.items():
+            for stack, count in stacks.items():
+                lines.append(";".join((thread,) + stack) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """Samples the stacks of every other thread from a background thread."""
+
+    def __init__(self, interval: float, max_seconds: float, main_thread: Optional[int] = None):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.main_thread = main_thread if main_thread is not None else threading.get_ident()
+        self.samples = 0
+        self.truncated = False
+        self.stacks: Dict[str, Counter] = {}
+        # code object -> frame name, so sys.path is searched once per function
+        self._names: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Ask the sampling thread to finish; ``join`` waits for it."""
+        self._stop.set()
+
+    def join(self):
+        self._thread.join()
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if time.monotonic() > deadline:
+                self.truncated = True
+                return
+            self._sample(own)
+
+    def _sample(self, own: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if ident != self.main_thread and stack:
+                leaf = stack[0]
+                if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_FRAMES:
+                    continue
+            thread = "event loop" if ident == self.main_thread else names.get(ident, str(ident))
+            counts = self.stacks.setdefault(thread, Counter())
+            counts[tuple(self._frame_name(code) for code in reversed(stack))] += 1
+
+    def _frame_name(self, code) -> str:
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = _frame_name(code)
+        return name
+
+
+class ProfileStore:
+    """Profiles on disk, one JSON file per request, keeping the newest ``max_profiles``."""
+
+    def __init__(self, directory: Optional[Path] = None, max_profiles: Optional[int] = None):
+        self.directory = Path(directory or settings.profiling_dir)
+        self.max_profiles = max(1, max_profiles if max_profiles is not None else settings.profiling_max_profiles)
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str, suffix: str = ".json") -> Path:
+        if not PROFILE_ID.match(profile_id):
+            raise KeyError(profile_id)
+        return self.directory / f"{profile_id}{suffix}"
+
+    def save(self, profile: Profile):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path(profile.id).write_text(json.dumps(profile.to_dict()))
+            self._path(profile.id, ".folded").write_text(profile.folded())
+            for stale in sorted(self.directory.glob("*.json"))[:-self.max_profiles]:
+                stale.unlink()
+                stale.with_suffix(".folded").unlink(missing_ok=True)
+        logger.info(f"Saved profile {profile.id} of {profile.method} {profile.path} ({profile.wall_time * 1000:.0f}ms)")
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored profiles, newest first."""
+        summaries = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            data = json.loads(path.read_text())
+            data.pop("threads", None)
+            summaries.append(data)
+        return summaries
+
+    def path(self, profile_id: str, format: str = "json") -> Path:
+        """File of a stored profile; raises ``KeyError`` if there is none."""
+        path = self._path(profile_id, ".folded" if format == "folded" else ".json")
+        if not path.exists():
+            raise KeyError(profile_id)
+        return path
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it (see the module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._active = threading.Lock()
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        if scope["type"] != "http" or not settings.profiling_admin_token:
+            return False
+        paths = {path.strip() for path in settings.profiling_paths.split(",") if path.strip()}
+        if scope["path"] not in paths:
+            return False
+
+        header = TOKEN_HEADER.lower().encode()
+        token = next((value.decode() for name, value in scope["headers"] if name == header), None)
+        return is_admin_token(token) and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self._requested(scope) or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            now = datetime.now(timezone.utc)
+            profile = Profile(
+                id=f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}",
+                method=scope["method"],
+                path=scope["path"],
+                started_at=now.isoformat(timespec="seconds"),
+                interval=settings.profiling_interval
+            )
+
+            async def send_with_id(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((PROFILE_ID_HEADER.lower().encode(), profile.id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            profiler = SamplingProfiler(settings.profiling_interval, settings.profiling_max_seconds)
+            start = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.stop()
+                profile.wall_time = time.perf_counter() - start
+                # The sampler may be mid-sample; wait for it off the event loop
+                await asyncio.to_thread(profiler.join)
+                profile.samples = profiler.samples
+                profile.truncated = profiler.truncated
+                profile.stacks = {thread: dict(stacks) for thread, stacks in profiler.stacks.items()}
+                await self._save(scope, profile)
+        finally:
+            self._active.release()
+
+    @staticmethod
+    async def _save(scope, profile: Profile):
+        # A failure to store the profile must not fail the request
+        try:
+            store = scope["app"].state.services.profile_store
+            await asyncio.to_thread(store.save, profile)
+        except Exception as e:
+            logger.error(f"Failed to save profile {profile.id}: {e}")
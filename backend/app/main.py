@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
 
+from app.api.dependencies import close_services, create_services, warm_up
 from app.api.endpoints import router
+from app.core import metrics
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -13,11 +18,26 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: build the services on startup and release them on shutdown."""
+    services = create_services()
+    app.state.services = services
+    if settings.warm_up_on_startup:
+        await warm_up(services)
+    try:
+        yield
+    finally:
+        await close_services(services)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="TFT Strategic Advisor API",
     description="RAG-powered strategic advice for Teamfight Tactics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -27,8 +47,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id"],
 )
 
+# Opt-in per-request profiling; inert unless profiling_admin_token is set
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(router, prefix="/api", tags=["api"])
 
@@ -43,6 +67,14 @@ async def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Metrics in the Prometheus text format; 404 unless ``metrics_enabled``."""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -10,6 +10,12 @@ class TFTSet(str, Enum):
     SET_12 = "12"
 
 
+class AdviceMode(str, Enum):
+    """How advice is generated: by the LLM, or ranked from stats alone."""
+    LLM = "llm"
+    FAST = "fast"
+
+
 class Position(BaseModel):
     """Position on the TFT board."""
     row: int = Field(..., ge=0, le=3, description="Row position (0-3)")
@@ -63,6 +69,7 @@ class StrategicAdvice(BaseModel):
     options: List[StrategicOption]
     general_advice: str
     retrieved_context: List[str] = Field(default_factory=list)
+    generated_by: str = Field("llm", description="'llm', or 'fast' when ranked from stats without the LLM")
 
 
 class MatchData(BaseModel):
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.schemas import GameSnapshot, StrategicAdvice
+
+logger = logging.getLogger(__name__)
+
+GOLD_BUCKET_SIZE = 10
+MAX_GOLD_BUCKET = 5  # 50+ gold: maximum interest
+MIN_LEVEL_BUCKET = 4
+MAX_LEVEL_BUCKET = 9
+
+
+def _set_key(set_version: Any) -> str:
+    """Set number that a snapshot's set version or a stats patch belongs to."""
+    value = getattr(set_version, "value", set_version)
+    return str(value).split(".")[0]
+
+
+def canonical_snapshot(snapshot: GameSnapshot) -> Dict[str, Any]:
+    """Reduce a snapshot to the fields that decide its advice.
+
+    Board order, positions and items are dropped, gold and level are
+    bucketed, and augment choices become a set, so near-identical game
+    states share a cache entry.
+    """
+    return {
+        "set": _set_key(snapshot.set_version),
+        "stage": snapshot.stage.strip(),
+        "level": min(max(snapshot.level, MIN_LEVEL_BUCKET), MAX_LEVEL_BUCKET),
+        "gold": min(snapshot.gold // GOLD_BUCKET_SIZE, MAX_GOLD_BUCKET),
+        "board": sorted((champion.name.lower(), champion.stars) for champion in snapshot.board),
+        "augments": sorted({augment.lower() for augment in snapshot.available_augments}),
+        "context": " ".join((snapshot.context or "").lower().split()),
+    }
+
+
+def snapshot_digest(snapshot: GameSnapshot) -> str:
+    canonical = json.dumps(canonical_snapshot(snapshot), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class AdviceCacheBackend(ABC):
+    """Key/value storage with TTLs and per-set generation counters."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float):
+        ...
+
+    @abstractmethod
+    async def generation(self, set_key: str) -> int:
+        """Current generation of a set's cache entries."""
+
+    @abstractmethod
+    async def bump_generation(self, set_key: str) -> int:
+        """Start a new generation, orphaning every entry of the previous one."""
+
+    async def close(self):
+        """Release any open resources."""
+
+
+class MemoryAdviceCacheBackend(AdviceCacheBackend):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def generation(self, set_key: str) -> int:
+        return self._generations.get(set_key, 0)
+
+    async def bump_generation(self, set_key: str) -> int:
+        self._generations[set_key] = self._generations.get(set_key, 0) + 1
+        return self._generations[set_key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisAdviceCacheBackend(AdviceCacheBackend):
+    """Redis-backed cache shared by every API process.
+
+    Entries expire through Redis TTLs; eviction beyond that is left to the
+    server's ``maxmemory-policy``.
+    """
+
+    def __init__(self, url: str, prefix: str = "advice"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(f"{self.prefix}:entry:{key}")
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self._redis.set(f"{self.prefix}:entry:{key}", value, ex=max(1, int(ttl)))
+
+    async def generation(self, set_key: str) -> int:
+        value = await self._redis.get(f"{self.prefix}:generation:{set_key}")
+        return int(value) if value else 0
+
+    async def bump_generation(self, set_key: str) -> int:
+        return await self._redis.incr(f"{self.prefix}:generation:{set_key}")
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class AdviceCache:
+    """Cache of generated advice keyed on the canonical snapshot.
+
+    Keys embed the generation of the snapshot's set, so reindexing stats
+    for a patch of that set (``invalidate``) makes all earlier entries
+    unreachable without having to find and delete them.
+    """
+
+    def __init__(self, backend: AdviceCacheBackend, ttl: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl if ttl is not None else settings.advice_cache_ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def _key(self, snapshot: GameSnapshot) -> str:
+        set_key = _set_key(snapshot.set_version)
+        generation = await self.backend.generation(set_key)
+        return f"{set_key}:{generation}:{snapshot_digest(snapshot)}"
+
+    async def key_for(self, snapshot: GameSnapshot) -> Optional[str]:
+        """Key of the snapshot's entry in the current generation, or None if the backend failed.
+
+        Resolve it once per request and pass it to both ``get`` and ``set``:
+        advice generated while ``invalidate`` runs is then stored under the
+        generation whose stats it was built from, where nobody will look.
+        """
+        try:
+            return await self._key(snapshot)
+        except Exception as e:
+            logger.warning(f"Advice cache lookup failed: {e}")
+            return None
+
+    async def get(self, snapshot: GameSnapshot, key: Optional[str] = None) -> Optional[StrategicAdvice]:
+        """Cached advice for an equivalent snapshot, answering the given one."""
+        try:
+            value = await self.backend.get(key or await self._key(snapshot))
+        except Exception as e:
+            logger.warning(f"Advice cache lookup failed: {e}")
+            return None
+
+        if value is None:
+            self.misses += 1
+            metrics.ADVICE_CACHE_REQUESTS.inc(result="miss")
+            return None
+
+        self.hits += 1
+        metrics.ADVICE_CACHE_REQUESTS.inc(result="hit")
+        advice = StrategicAdvice.model_validate_json(value)
+        return advice.model_copy(update={"snapshot": snapshot})
+
+    async def set(self, snapshot: GameSnapshot, advice: StrategicAdvice, key: Optional[str] = None):
+        """Store advice, under ``key`` when it was resolved before generating it."""
+        try:
+            await self.backend.set(key or await self._key(snapshot), advice.model_dump_json(), self.ttl)
+        except Exception as e:
+            logger.warning(f"Advice cache store failed: {e}")
+
+    async def invalidate(self, patch: str):
+        """Drop cached advice for the set that ``patch`` belongs to."""
+        generation = await self.backend.bump_generation(_set_key(patch))
+        logger.info(f"Advice cache for set {_set_key(patch)} moved to generation {generation}")
+
+    async def close(self):
+        await self.backend.close()
+
+
+def create_advice_cache() -> Optional[AdviceCache]:
+    """Create the advice cache configured in settings, or None when disabled."""
+    backend = settings.advice_cache_backend
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return AdviceCache(MemoryAdviceCacheBackend(settings.advice_cache_max_entries))
+    if backend == "redis":
+        if not settings.redis_url:
+            raise ValueError("advice_cache_backend is 'redis' but redis_url is not set")
+        return AdviceCache(RedisAdviceCacheBackend(settings.redis_url))
+
+    raise ValueError(f"Unknown advice cache backend: {backend}")
@@ -0,0 +1,158 @@
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CHAMPION_PREFIX = re.compile(r"^tft\d+_")
+METRICS = ("jaccard", "containment")
+
+
+def champion_key(name: str) -> str:
+    """Comparable champion name, e.g. ``"TFT10_Jinx"`` and ``"Jinx"`` -> ``"jinx"``."""
+    return CHAMPION_PREFIX.sub("", name.strip().lower())
+
+
+class ChampionIndex:
+    """In-memory champion -> composition index for exact board overlap.
+
+    Every composition is stored as an integer bitset over the champion
+    vocabulary, and every champion has a posting list (a sorted int32
+    array) of the compositions containing it. ``search`` counts board
+    overlaps by summing the board's posting lists, so its cost depends on
+    how many compositions share a unit with the board rather than on the
+    size of the index; ``scores`` uses the bitsets to score known keys.
+
+    Overlap is measured as Jaccard similarity (shared units over the
+    union of both unit sets) or containment (the share of a composition's
+    units that are already on the board).
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Sequence[str], Optional[str]]] = ()):
+        """Index ``(key, champions, patch)`` entries; keys must be unique."""
+        self._bits: Dict[str, int] = {}
+        self._patch_ids: Dict[Optional[str], int] = {}
+        self.keys: List[str] = []
+        self.masks: List[int] = []
+        self._positions: Dict[str, int] = {}
+
+        postings: Dict[int, List[int]] = {}
+        sizes = []
+        patches = []
+        for key, champions, patch in entries:
+            position = len(self.keys)
+            mask = self._mask(champions, grow=True)
+            self.keys.append(key)
+            self.masks.append(mask)
+            self._positions[key] = position
+            sizes.append(mask.bit_count())
+            patches.append(self._patch_ids.setdefault(patch, len(self._patch_ids)))
+
+            bit = mask
+            while bit:
+                low = bit & -bit
+                postings.setdefault(low.bit_length() - 1, []).append(position)
+                bit ^= low
+
+        self._sizes = np.array(sizes, dtype=np.int32)
+        self._patches = np.array(patches, dtype=np.int32)
+        self._postings = {
+            bit: np.array(positions, dtype=np.int32)
+            for bit, positions in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def _mask(self, champions: Iterable[str], grow: bool = False) -> int:
+        mask = 0
+        for champion in champions:
+            name = champion_key(champion)
+            bit = self._bits.get(name)
+            if bit is None:
+                if not grow:
+                    continue
+                bit = self._bits[name] = len(self._bits)
+            mask |= 1 << bit
+        return mask
+
+    def board_mask(self, board: Iterable[str]) -> int:
+        """Bitset of the board's champions; units unknown to the index are ignored."""
+        return self._mask(board)
+
+    @staticmethod
+    def _score(shared, comp_size, board_size: int, metric: str):
+        if metric == "containment":
+            return shared / np.maximum(comp_size, 1)
+        return shared / np.maximum(comp_size + board_size - shared, 1)
+
+    def search(
+        self,
+        board: Sequence[str],
+        k: int = 10,
+        metric: str = "jaccard",
+        patch: Optional[str] = None,
+        min_shared: int = 1
+    ) -> List[Tuple[str, float]]:
+        """Top ``k`` ``(key, score)`` pairs sharing at least ``min_shared`` units with ``board``."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown overlap metric: {metric}")
+
+        board_size = len({champion_key(champion) for champion in board})
+        mask = self.board_mask(board)
+        lists = []
+        while mask:
+            low = mask & -mask
+            lists.append(self._postings[low.bit_length() - 1])
+            mask ^= low
+        if not lists or k <= 0:
+            return []
+
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.keys))
+        eligible = shared >= max(min_shared, 1)
+        if patch is not None:
+            patch_id = self._patch_ids.get(patch)
+            if patch_id is None:
+                return []
+            eligible &= self._patches == patch_id
+
+        candidates = np.flatnonzero(eligible)
+        if candidates.size == 0:
+            return []
+
+        scores = self._score(shared[candidates], self._sizes[candidates], board_size, metric)
+        # Ties break on insertion order so results are deterministic
+        if candidates.size > k:
+            kth = np.partition(scores, candidates.size - k)[candidates.size - k]
+            keep = scores > kth
+            keep[np.flatnonzero(scores == kth)[:k - int(keep.sum())]] = True
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))
+        return [(self.keys[candidates[i]], float(scores[i])) for i in order]
+
+    def scores(
+        self,
+        board: Sequence[str],
+        keys: Iterable[str],
+        metric: str = "jaccard"
+    ) -> Dict[str, float]:
+        """Overlap scores of specific compositions, e.g. to rerank semantic results."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown overlap metric: {metric}")
+
+        board_size = len({champion_key(champion) for champion in board})
+        board_mask = self.board_mask(board)
+        scores = {}
+        for key in keys:
+            position = self._positions.get(key)
+            if position is None:
+                continue
+            mask = self.masks[position]
+            shared = (mask & board_mask).bit_count()
+            scores[key] = float(self._score(shared, mask.bit_count(), board_size, metric))
+        return scores
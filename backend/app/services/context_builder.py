@@ -0,0 +1,194 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stats from few games are worth less than their similarity suggests;
+# a result with SAMPLE_SIZE_PRIOR games gets half weight.
+SAMPLE_SIZE_PRIOR = 50
+PLAYBOOK_RELIABILITY = 0.8
+DUPLICATE_SIMILARITY = 0.8
+WORD = re.compile(r"\w+")
+
+
+class TokenCounter:
+    """Count prompt tokens with tiktoken when installed, else estimate.
+
+    The estimate (about four characters per token, but never fewer than
+    one token per word) is only used to budget the prompt, so it errs on
+    the high side.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self._encoding = None
+        try:
+            import tiktoken
+        except ImportError:
+            logger.info("tiktoken is not installed; estimating prompt tokens")
+            return
+
+        try:
+            self._encoding = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return max(math.ceil(len(text) / 4), len(WORD.findall(text)))
+
+
+@dataclass
+class Snippet:
+    """A retrieved document considered for the prompt."""
+    section: str
+    text: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    tokens: int = 0
+
+
+@dataclass
+class BuiltContext:
+    """Packed prompt context with its token accounting."""
+    text: str
+    snippets: List[Snippet]
+    tokens_by_section: Dict[str, int]
+    total_tokens: int
+    dropped: int = 0
+
+    def section_snippets(self, section: str) -> List[Snippet]:
+        return [snippet for snippet in self.snippets if snippet.section == section]
+
+
+def score_result(result: Dict[str, Any], reliability: Optional[float] = None) -> float:
+    """Value of a retrieved result: similarity weighted by how reliable it is."""
+    distance = result.get("distance")
+    similarity = 1.0 / (1.0 + distance) if distance is not None else 0.5
+    if result.get("overlap") is not None:
+        # Compositions matched against the board count their unit overlap too
+        similarity = (similarity + result["overlap"]) / 2
+
+    if reliability is None:
+        sample_size = (result.get("metadata") or {}).get("sample_size")
+        if sample_size is None:
+            reliability = 1.0
+        else:
+            reliability = sample_size / (sample_size + SAMPLE_SIZE_PRIOR)
+
+    return similarity * reliability
+
+
+def _word_set(text: str) -> frozenset:
+    return frozenset(word.lower() for word in WORD.findall(text))
+
+
+def _overlaps(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= DUPLICATE_SIMILARITY
+
+
+class ContextBuilder:
+    """Pack the most valuable retrieved snippets into a token budget.
+
+    A fixed header (the game state) is always included. Retrieved results
+    are deduplicated (near-identical texts keep only the best-scoring
+    copy), then the best snippet of every section is taken first and the
+    remaining budget is filled greedily by score. Snippets that do not fit
+    are skipped in favour of smaller ones further down.
+    """
+
+    def __init__(self, token_budget: int, counter: Optional[TokenCounter] = None):
+        self.token_budget = token_budget
+        self.counter = counter or TokenCounter()
+
+    def _dedupe(self, snippets: Sequence[Snippet]) -> List[Snippet]:
+        kept: List[Snippet] = []
+        kept_words: List[frozenset] = []
+        for snippet in sorted(snippets, key=lambda s: -s.score):
+            words = _word_set(snippet.text)
+            if any(_overlaps(words, other) for other in kept_words):
+                continue
+            kept.append(snippet)
+            kept_words.append(words)
+        return kept
+
+    def build(
+        self,
+        header: List[str],
+        sections: Dict[str, List[Snippet]],
+        titles: Dict[str, str]
+    ) -> BuiltContext:
+        """Render ``header`` plus the packed snippets, grouped by section in the given order."""
+        header_text = "\n".join(header)
+        used = self.counter.count(header_text)
+        tokens_by_section = {"game_state": used}
+
+        candidates: List[Snippet] = []
+        for snippets in sections.values():
+            candidates.extend(snippets)
+        unique = self._dedupe(candidates)
+        dropped = len(candidates) - len(unique)
+
+        for snippet in unique:
+            snippet.tokens = self.counter.count(snippet.text) + 1
+        # Each non-empty section also costs its title line
+        title_tokens = {name: self.counter.count(titles[name]) + 1 for name in sections}
+
+        chosen: List[Snippet] = []
+        chosen_ids = set()
+        opened = set()
+
+        def take(snippet: Snippet):
+            nonlocal used
+            cost = snippet.tokens
+            if snippet.section not in opened:
+                cost += title_tokens[snippet.section]
+            if used + cost > self.token_budget:
+                return
+            used += cost
+            opened.add(snippet.section)
+            chosen.append(snippet)
+            chosen_ids.add(id(snippet))
+
+        best_per_section = {}
+        for snippet in unique:
+            best_per_section.setdefault(snippet.section, snippet)
+        for snippet in best_per_section.values():
+            take(snippet)
+        for snippet in unique:
+            if id(snippet) not in chosen_ids:
+                take(snippet)
+
+        dropped += len(unique) - len(chosen)
+
+        parts = [header_text]
+        for name in sections:
+            packed = sorted(
+                (snippet for snippet in chosen if snippet.section == name),
+                key=lambda s: -s.score
+            )
+            if not packed:
+                continue
+            parts.append(f"\n{titles[name]}")
+            parts.extend(snippet.text for snippet in packed)
+            tokens_by_section[name] = title_tokens[name] + sum(snippet.tokens for snippet in packed)
+
+        text = "\n".join(parts)
+        return BuiltContext(
+            text=text,
+            snippets=chosen,
+            tokens_by_section=tokens_by_section,
+            total_tokens=self.counter.count(text),
+            dropped=dropped
+        )
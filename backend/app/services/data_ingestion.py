@@ -1,67 +1,152 @@
-import json
-import os
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple, TypeVar, Union
 from datetime import datetime
 import logging
-from collections import defaultdict, Counter
 
 from app.services.riot_client import RiotAPIClient
+from app.services.match_index import MatchIndex
+from app.services.match_store import MatchStore, create_match_store
+from app.services.stats_engine import StatsEngine, StatsAggregate
+from app.services.stats_aggregates import StatsAggregateStore
+from app.services.parallel_stats import ParallelStatsRunner
 from app.models.schemas import MatchData, CompStats, AugmentStats
+from app.core import metrics
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class DataIngestionService:
     """Service for ingesting and processing TFT match data."""
     
-    def __init__(self, riot_client: Optional[RiotAPIClient] = None):
+    def __init__(
+        self,
+        riot_client: Optional[RiotAPIClient] = None,
+        match_store: Optional[MatchStore] = None
+    ):
         self.riot_client = riot_client or RiotAPIClient()
-        self.cache_dir = Path(settings.match_data_cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.match_store = match_store or create_match_store()
+        self.stats_engine = StatsEngine()
+        self.stats_aggregates = StatsAggregateStore()
+        self.parallel_stats = ParallelStatsRunner()
+        self._stats_lock = asyncio.Lock()
         
-    def _get_cache_path(self, match_id: str) -> Path:
-        """Get cache file path for a match."""
-        return self.cache_dir / f"{match_id}.json"
-    
-    async def fetch_and_cache_match(self, match_id: str) -> MatchData:
-        """Fetch match data and cache it locally."""
-        cache_path = self._get_cache_path(match_id)
+        # Known match IDs come from the store; the index adds in-flight dedup
+        self.match_index = MatchIndex(self.match_store)
         
-        # Check cache first
-        if cache_path.exists():
-            with open(cache_path, 'r') as f:
-                data = json.load(f)
-                return MatchData(**data)
+        # Bound concurrent work; the Riot client's rate limiter paces the actual requests
+        self._match_semaphore = asyncio.Semaphore(max(1, settings.ingestion_match_concurrency))
+        self._player_semaphore = asyncio.Semaphore(max(1, settings.ingestion_player_concurrency))
         
-        # Fetch from API
+        # Match store reads and writes stay off the event loop; one thread,
+        # since the store's segment writers are not thread-safe
+        self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-store")
+    
+    async def _run_store(self, fn: Callable[..., T], *args) -> T:
+        """Run a blocking match store call on the store's thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._store_executor, fn, *args)
+    
+    async def _fetch_and_store_match(self, match_id: str) -> MatchData:
+        """Fetch a match from the API and write it to the match store."""
         match_data = await self.riot_client.get_match_details(match_id)
+        await self._run_store(self.match_store.put, match_data)
+        return match_data
+    
+    async def _fetch_match(self, match_id: str) -> Tuple[MatchData, bool]:
+        """Fetch a match unless it is stored or already being fetched.
         
-        # Cache the data
-        with open(cache_path, 'w') as f:
-            json.dump(match_data.dict(), f)
+        Returns the match and whether an API request was saved.
+        """
+        if match_id in self.match_index:
+            match_data = await self._run_store(self.match_store.get, match_id)
+            if match_data is not None:
+                self.match_index.record_saved()
+                return match_data, True
+            
+            logger.warning(f"Match {match_id} is indexed but could not be read from the match store")
+        
+        return await self.match_index.fetch_once(
+            match_id,
+            lambda: self._fetch_and_store_match(match_id)
+        )
+    
+    async def fetch_and_cache_match(self, match_id: str) -> MatchData:
+        """Fetch match data and cache it locally.
         
+        Matches already in the match store are served from it, and
+        concurrent calls for the same match share a single API request.
+        """
+        match_data, _ = await self._fetch_match(match_id)
         return match_data
     
+    async def _ingest_match(self, match_id: str) -> Tuple[Optional[MatchData], bool]:
+        """Fetch a single match, isolating failures from the rest of the crawl."""
+        async with self._match_semaphore:
+            try:
+                match_data, saved = await self._fetch_match(match_id)
+                logger.info(f"Ingested match {match_id}")
+                return match_data, saved
+            except Exception as e:
+                logger.error(f"Failed to ingest match {match_id}: {e}")
+                return None, False
+    
     async def ingest_player_matches(
         self, 
         puuid: str, 
         count: int = 20
     ) -> List[MatchData]:
-        """Ingest matches for a specific player."""
+        """Ingest matches for a specific player.
+        
+        Matches are fetched concurrently, bounded by ``ingestion_match_concurrency``.
+        """
+        matches, _ = await self.crawl_player_matches(puuid, count)
+        return matches
+    
+    async def crawl_player_matches(self, puuid: str, count: int = 20) -> Tuple[List[MatchData], int]:
+        """Like ``ingest_player_matches``, also returning the fetches this crawl saved."""
+        start = time.perf_counter()
+        matches, saved = await self._ingest_player_matches(puuid, count)
+        self._record_crawl("player", matches, start, saved)
+        return matches, saved
+    
+    async def _ingest_player_matches(self, puuid: str, count: int) -> Tuple[List[MatchData], int]:
         match_ids = await self.riot_client.get_match_ids_by_puuid(puuid, count=count)
-        matches = []
+        results = await asyncio.gather(*(self._ingest_match(match_id) for match_id in match_ids))
         
-        for match_id in match_ids:
+        matches = [match for match, _ in results if match is not None]
+        saved = sum(saved for _, saved in results)
+        logger.info(f"Ingested {len(matches)} matches for player {puuid}; dedup saved {saved} fetches")
+        return matches, saved
+    
+    async def _ingest_player(
+        self,
+        player_data: Dict[str, Any],
+        platform: str,
+        matches_per_player: int
+    ) -> Tuple[List[MatchData], int]:
+        """Resolve one high ELO player and ingest their matches."""
+        summoner_id = player_data.get("summonerId")
+        if not summoner_id:
+            return [], 0
+        
+        async with self._player_semaphore:
             try:
-                match_data = await self.fetch_and_cache_match(match_id)
-                matches.append(match_data)
-                logger.info(f"Ingested match {match_id}")
+                # Get summoner info to get PUUID
+                summoner = await self.riot_client.get_summoner_by_puuid(summoner_id, platform)
+                puuid = summoner.get("puuid")
+                
+                if puuid:
+                    return await self._ingest_player_matches(puuid, matches_per_player)
+                    
             except Exception as e:
-                logger.error(f"Failed to ingest match {match_id}: {e}")
+                logger.error(f"Failed to ingest matches for player {summoner_id}: {e}")
         
-        return matches
+        return [], 0
     
     async def ingest_high_elo_matches(
         self, 
@@ -69,41 +154,69 @@ class DataIngestionService:
         matches_per_player: int = 10,
         max_players: int = 50
     ) -> List[MatchData]:
-        """Ingest matches from high ELO players."""
-        all_matches = []
+        """Ingest matches from high ELO players.
+        
+        Players are processed concurrently, bounded by ``ingestion_player_concurrency``.
+        """
+        matches, _ = await self.crawl_high_elo_matches(platform, matches_per_player, max_players)
+        return matches
+    
+    async def crawl_high_elo_matches(
+        self,
+        platform: str = "na1",
+        matches_per_player: int = 10,
+        max_players: int = 50
+    ) -> Tuple[List[MatchData], int]:
+        """Like ``ingest_high_elo_matches``, also returning the fetches this crawl saved."""
+        start = time.perf_counter()
         
         # Get high ELO players
         try:
-            challenger = await self.riot_client.get_challenger_players(platform)
-            grandmaster = await self.riot_client.get_grandmaster_players(platform)
-            master = await self.riot_client.get_master_players(platform)
+            challenger, grandmaster, master = await asyncio.gather(
+                self.riot_client.get_challenger_players(platform),
+                self.riot_client.get_grandmaster_players(platform),
+                self.riot_client.get_master_players(platform)
+            )
             
             high_elo_players = (challenger + grandmaster + master)[:max_players]
             logger.info(f"Found {len(high_elo_players)} high ELO players")
             
         except Exception as e:
             logger.error(f"Failed to get high ELO players: {e}")
-            return []
+            return [], 0
         
         # Fetch matches for each player
-        for player_data in high_elo_players:
-            summoner_id = player_data.get("summonerId")
-            if not summoner_id:
-                continue
-                
-            try:
-                # Get summoner info to get PUUID
-                summoner = await self.riot_client.get_summoner_by_puuid(summoner_id, platform)
-                puuid = summoner.get("puuid")
-                
-                if puuid:
-                    matches = await self.ingest_player_matches(puuid, count=matches_per_player)
-                    all_matches.extend(matches)
-                    
-            except Exception as e:
-                logger.error(f"Failed to ingest matches for player {summoner_id}: {e}")
+        results = await asyncio.gather(*(
+            self._ingest_player(player_data, platform, matches_per_player)
+            for player_data in high_elo_players
+        ))
         
-        return all_matches
+        # Players share lobbies, so keep only the first copy of each match
+        all_matches = {}
+        for matches, _ in results:
+            for match in matches:
+                all_matches.setdefault(match.match_id, match)
+        saved = sum(saved for _, saved in results)
+        
+        logger.info(f"High ELO crawl ingested {len(all_matches)} unique matches; dedup saved {saved} fetches")
+        matches = list(all_matches.values())
+        self._record_crawl("high_elo", matches, start, saved)
+        return matches, saved
+    
+    def _record_crawl(self, source: str, matches: List[MatchData], start: float, saved: int):
+        """Record a finished crawl's duration, throughput and dedup savings."""
+        if not settings.metrics_enabled:
+            return
+        elapsed = time.perf_counter() - start
+        metrics.INGESTED_MATCHES.inc(len(matches), source=source)
+        metrics.INGESTION_FETCHES_SAVED.inc(saved)
+        metrics.INGESTION_SECONDS.observe(elapsed, source=source)
+        metrics.INGESTION_MATCHES_PER_SECOND.set(len(matches) / elapsed if elapsed > 0 else 0.0, source=source)
+    
+    def close(self):
+        """Finish pending match store writes and close the store."""
+        self._store_executor.shutdown()
+        self.match_store.close()
     
     def extract_composition(self, participant: Dict[str, Any]) -> List[str]:
         """Extract champion composition from participant data."""
@@ -127,69 +240,95 @@ class DataIngestionService:
         
         return items_map
     
+    def compute_stats(
+        self,
+        matches: Iterable[Union[MatchData, Dict[str, Any]]],
+        patch: str
+    ) -> Tuple[List[CompStats], List[AugmentStats]]:
+        """Compute composition and augment statistics in a single pass."""
+        return self.stats_engine.compute_stats(matches, patch)
+    
+    def _new_match_ids(self, aggregate: StatsAggregate) -> Tuple[List[str], Optional[int]]:
+        """Stored match IDs not yet folded into the aggregate, and its watermark once they are.
+        
+        Resuming from the aggregate's watermark only lists the matches stored
+        since the last update. Aggregates without one (saved before
+        watermarks, or over a store without a stable order) are checked
+        against the covered-ID log instead.
+        """
+        if aggregate.watermark is not None:
+            new_ids = self.match_store.ids_since(aggregate.watermark)
+            if new_ids is not None:
+                return new_ids, aggregate.watermark + len(new_ids)
+        
+        covered = self.stats_aggregates.covered_ids(aggregate.patch) | aggregate.covered_ids
+        stored = list(self.match_store.ids())
+        new_ids = [match_id for match_id in stored if match_id not in covered]
+        return new_ids, len(stored) if self.match_store.ordered else None
+    
+    def _fold_and_save(
+        self,
+        aggregate: StatsAggregate,
+        new_ids: List[str],
+        watermark: Optional[int]
+    ) -> int:
+        """Stream new matches into the aggregate in batches, then persist it."""
+        added = 0
+        for batch in self.match_store.scan_columns(settings.stats_batch_size, match_ids=new_ids):
+            added += self.stats_engine.fold_columns(aggregate, [batch])
+        
+        aggregate.watermark = watermark
+        self.stats_aggregates.save(aggregate)
+        logger.info(f"Folded {added} new matches into stats for patch {aggregate.patch}")
+        return added
+    
+    def update_stats_aggregate(self, patch: str) -> Tuple[StatsAggregate, int]:
+        """Fold stored matches not yet covered into the patch's aggregate.
+        
+        New matches are streamed from the store in batches of
+        ``stats_batch_size``, so memory stays bounded by one batch plus the
+        aggregate itself. Returns the persisted aggregate and the number of
+        matches added.
+        """
+        aggregate = self.stats_aggregates.load(patch)
+        new_ids, watermark = self._new_match_ids(aggregate)
+        if not new_ids and watermark == aggregate.watermark:
+            return aggregate, 0
+        
+        return aggregate, self._fold_and_save(aggregate, new_ids, watermark)
+    
+    async def update_stats_aggregate_async(self, patch: str) -> Tuple[StatsAggregate, int]:
+        """Like ``update_stats_aggregate`` but off the event loop.
+        
+        With ``stats_workers`` > 1 and at least ``stats_parallel_min_matches``
+        new matches, the new matches are sharded across a process pool and
+        the partial aggregates merged; otherwise they are folded in a thread.
+        """
+        async with self._stats_lock:
+            aggregate = await asyncio.to_thread(self.stats_aggregates.load, patch)
+            new_ids, watermark = await asyncio.to_thread(self._new_match_ids, aggregate)
+            if not new_ids and watermark == aggregate.watermark:
+                return aggregate, 0
+            
+            if (self.parallel_stats.workers <= 1
+                    or len(new_ids) < settings.stats_parallel_min_matches):
+                added = await asyncio.to_thread(self._fold_and_save, aggregate, new_ids, watermark)
+                return aggregate, added
+            
+            update = await self.parallel_stats.aggregate(self.match_store, new_ids, patch)
+            aggregate.merge(update)
+            aggregate.watermark = watermark
+            await asyncio.to_thread(self.stats_aggregates.save, aggregate)
+            logger.info(f"Folded {update.matches_seen} new matches into stats for patch {patch}")
+            return aggregate, update.matches_seen
+    
     def compute_comp_stats(
         self, 
         matches: List[MatchData], 
         patch: str
     ) -> List[CompStats]:
         """Compute statistics for team compositions."""
-        comp_data = defaultdict(lambda: {
-            "placements": [],
-            "augments": Counter(),
-            "items": defaultdict(Counter),
-            "champions": set()
-        })
-        
-        for match in matches:
-            if str(match.tft_set_number) != patch.split(".")[0]:
-                continue
-                
-            for participant in match.participants:
-                comp = tuple(self.extract_composition(participant))
-                placement = participant.get("placement", 8)
-                augments = self.extract_augments(participant)
-                items = self.extract_items(participant)
-                
-                comp_data[comp]["placements"].append(placement)
-                comp_data[comp]["augments"].update(augments)
-                comp_data[comp]["champions"].update(comp)
-                
-                for champ, item_list in items.items():
-                    comp_data[comp]["items"][champ].update(item_list)
-        
-        # Compute statistics
-        stats = []
-        for comp, data in comp_data.items():
-            if len(data["placements"]) < 5:  # Minimum sample size
-                continue
-                
-            placements = data["placements"]
-            avg_placement = sum(placements) / len(placements)
-            top4_rate = sum(1 for p in placements if p <= 4) / len(placements)
-            win_rate = sum(1 for p in placements if p == 1) / len(placements)
-            
-            # Get most common augments
-            top_augments = [aug for aug, _ in data["augments"].most_common(5)]
-            
-            # Get most common items per champion
-            key_items = {}
-            for champ, item_counter in data["items"].items():
-                key_items[champ] = [item for item, _ in item_counter.most_common(3)]
-            
-            stats.append(CompStats(
-                comp_name=f"Comp_{hash(comp) % 10000}",
-                patch=patch,
-                champions=list(data["champions"]),
-                avg_placement=avg_placement,
-                play_rate=len(placements) / len(matches),
-                top4_rate=top4_rate,
-                win_rate=win_rate,
-                sample_size=len(placements),
-                key_augments=top_augments,
-                key_items=key_items
-            ))
-        
-        return sorted(stats, key=lambda x: x.avg_placement)
+        return self.stats_engine.aggregate(matches, patch).comp_stats()
     
     def compute_augment_stats(
         self, 
@@ -197,52 +336,4 @@ class DataIngestionService:
         patch: str
     ) -> List[AugmentStats]:
         """Compute statistics for augments."""
-        augment_data = defaultdict(lambda: {
-            "placements": [],
-            "comps": Counter()
-        })
-        
-        for match in matches:
-            if str(match.tft_set_number) != patch.split(".")[0]:
-                continue
-                
-            for participant in match.participants:
-                augments = self.extract_augments(participant)
-                placement = participant.get("placement", 8)
-                comp = tuple(self.extract_composition(participant))
-                
-                for augment in augments:
-                    augment_data[augment]["placements"].append(placement)
-                    augment_data[augment]["comps"][comp] += 1
-        
-        # Compute statistics
-        total_picks = sum(len(data["placements"]) for data in augment_data.values())
-        stats = []
-        
-        for augment, data in augment_data.items():
-            if len(data["placements"]) < 10:  # Minimum sample size
-                continue
-                
-            placements = data["placements"]
-            avg_placement = sum(placements) / len(placements)
-            top4_rate = sum(1 for p in placements if p <= 4) / len(placements)
-            win_rate = sum(1 for p in placements if p == 1) / len(placements)
-            
-            # Get synergistic comps
-            synergistic_comps = [
-                f"Comp_{hash(comp) % 10000}" 
-                for comp, _ in data["comps"].most_common(3)
-            ]
-            
-            stats.append(AugmentStats(
-                augment_name=augment,
-                patch=patch,
-                pick_rate=len(placements) / total_picks if total_picks > 0 else 0,
-                avg_placement=avg_placement,
-                top4_rate=top4_rate,
-                win_rate=win_rate,
-                sample_size=len(placements),
-                synergistic_comps=synergistic_comps
-            ))
-        
-        return sorted(stats, key=lambda x: x.avg_placement)
+        return self.stats_engine.aggregate(matches, patch).augment_stats()
@@ -0,0 +1,153 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Where Chroma's embedding functions keep the name of their model
+MODEL_NAME_ATTRIBUTES = ("model_name", "_model_name", "MODEL_NAME")
+
+
+def default_namespace(embedding_function) -> str:
+    """Cache namespace of an embedding function: its class and model.
+
+    Functions that do not expose a model name are identified by their class
+    and output dimension instead, found by embedding a probe text once.
+    """
+    name = type(embedding_function).__name__
+    for attribute in MODEL_NAME_ATTRIBUTES:
+        model = getattr(embedding_function, attribute, None)
+        if isinstance(model, str) and model:
+            return f"{name}:{model}"
+
+    dimension = len(embedding_function(["dimension probe"])[0])
+    return f"{name}:dim={dimension}"
+
+
+class CachedEmbeddingFunction:
+    """Content-addressed cache around a Chroma embedding function.
+
+    Texts are keyed by a SHA-256 of the model namespace and the text, so a
+    vector is only ever computed once per distinct text. The namespace
+    defaults to ``default_namespace``, so switching models does not serve
+    the old model's vectors. Lookups go through
+    an in-memory LRU first, then a SQLite table on disk; the remaining texts
+    are embedded in a single batch by the wrapped function. Safe to call
+    from several threads.
+    """
+
+    def __init__(
+        self,
+        embedding_function,
+        path: Path,
+        memory_size: int = 10000,
+        namespace: Optional[str] = None
+    ):
+        self.embedding_function = embedding_function
+        self.path = Path(path)
+        self.memory_size = memory_size
+        self.namespace = namespace or default_namespace(embedding_function)
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode()).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _load(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in input]
+        vectors: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+            memory_hits = sum(1 for key in keys if key in vectors)
+            self.memory_hits += memory_hits
+            metrics.EMBEDDING_CACHE_REQUESTS.inc(memory_hits, result="memory_hit")
+
+            missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+            if missing:
+                stored = self._load(missing)
+                self.disk_hits += len(stored)
+                metrics.EMBEDDING_CACHE_REQUESTS.inc(len(stored), result="disk_hit")
+                for key, vector in stored.items():
+                    self._remember(key, vector)
+                vectors.update(stored)
+
+        # Embed each distinct unseen text once, outside the lock
+        pending = {key: text for key, text in zip(keys, input) if key not in vectors}
+        if pending:
+            computed = self.embedding_function(list(pending.values()))
+            new_vectors = {
+                key: np.asarray(vector, dtype=np.float32).tolist()
+                for key, vector in zip(pending, computed)
+            }
+            with self._lock:
+                self.misses += len(new_vectors)
+                metrics.EMBEDDING_CACHE_REQUESTS.inc(len(new_vectors), result="miss")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [
+                        (key, np.asarray(vector, dtype=np.float32).tobytes())
+                        for key, vector in new_vectors.items()
+                    ]
+                )
+                self._db.commit()
+                for key, vector in new_vectors.items():
+                    self._remember(key, vector)
+            vectors.update(new_vectors)
+            logger.debug(f"Embedded {len(new_vectors)} new texts, {len(keys) - len(new_vectors)} cached")
+
+        return [vectors[key] for key in keys]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,181 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from app.models.schemas import GameSnapshot, StrategicOption
+from app.services.champion_index import champion_key
+from app.services.context_builder import SAMPLE_SIZE_PRIOR
+
+logger = logging.getLogger(__name__)
+
+MAX_FAST_OPTIONS = 3
+
+# Weights of a composition's score; they sum to 1
+OVERLAP_WEIGHT = 0.45
+PLACEMENT_WEIGHT = 0.3
+TOP4_WEIGHT = 0.25
+
+# Prefix of the names StatsEngine gives compositions
+GENERATED_COMP_PREFIX = "Comp_"
+
+
+def _json_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return value
+    try:
+        parsed = json.loads(value or "[]")
+    except (TypeError, json.JSONDecodeError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def _reliability(metadata: Dict[str, Any]) -> float:
+    sample_size = metadata.get("sample_size") or 0
+    return sample_size / (sample_size + SAMPLE_SIZE_PRIOR)
+
+
+def _placement_score(avg_placement: float) -> float:
+    """Map an average placement (1 best, 8 worst) to 0..1."""
+    return min(max((8.0 - avg_placement) / 7.0, 0.0), 1.0)
+
+
+def _comp_title(comp_name: Optional[str], names: List[str]) -> str:
+    """Option title naming the comp's units; generated ``Comp_<hash>`` names mean nothing to players."""
+    if comp_name and not comp_name.startswith(GENERATED_COMP_PREFIX):
+        return f"Play {comp_name}"
+    names = sorted(names)
+    title = f"Play {', '.join(names[:3])}"
+    return title + (f" +{len(names) - 3}" if len(names) > 3 else "")
+
+
+class FastAdviceEngine:
+    """Rank strategic options from retrieved stats metadata, without an LLM.
+
+    Compositions are scored by how much of them is already on the board,
+    their average placement and top 4 rate; augments on offer by their
+    placement and top 4 rate. Both are weighted by sample size. The result
+    is deterministic and takes milliseconds, so it serves as ``mode=fast``
+    and as the fallback when the LLM is slow or unavailable.
+    """
+
+    def __init__(self, max_options: int = MAX_FAST_OPTIONS):
+        self.max_options = max_options
+
+    def advise(
+        self,
+        snapshot: GameSnapshot,
+        comp_results: List[Dict[str, Any]],
+        augment_results: List[Dict[str, Any]]
+    ) -> Tuple[List[StrategicOption], str]:
+        """Return ranked options and general advice for a snapshot."""
+        board = {champion_key(champion.name) for champion in snapshot.board}
+        candidates = [
+            self._comp_option(board, result["metadata"])
+            for result in comp_results
+            if (result.get("metadata") or {}).get("champions")
+        ]
+
+        offered = {augment.lower(): augment for augment in snapshot.available_augments}
+        augment_candidates = [
+            self._augment_option(result["metadata"])
+            for result in augment_results
+            if ((result.get("metadata") or {}).get("augment_name") or "").lower() in offered
+        ]
+
+        candidates.sort(key=lambda candidate: -candidate[0])
+        augment_candidates.sort(key=lambda candidate: -candidate[0])
+
+        # The best augment on offer is always worth a slot when there is a choice
+        chosen = candidates[:self.max_options]
+        if augment_candidates:
+            chosen = candidates[:self.max_options - 1] + augment_candidates[:1]
+            chosen.sort(key=lambda candidate: -candidate[0])
+
+        options = [
+            option.model_copy(update={"rank": rank})
+            for rank, (_, option) in enumerate(chosen, start=1)
+        ]
+        return options, self._general_advice(snapshot)
+
+    @staticmethod
+    def _comp_option(board: set, metadata: Dict[str, Any]) -> Tuple[float, StrategicOption]:
+        champions = _json_list(metadata.get("champions"))
+        keys = {champion_key(champion) for champion in champions}
+        have = sorted(champion for champion in champions if champion_key(champion) in board)
+        missing = sorted(champion for champion in champions if champion_key(champion) not in board)
+        overlap = len(keys & board) / len(keys) if keys else 0.0
+
+        avg_placement = metadata.get("avg_placement", 4.5)
+        top4_rate = metadata.get("top4_rate", 0.5)
+        reliability = _reliability(metadata)
+        quality = (
+            OVERLAP_WEIGHT * overlap
+            + PLACEMENT_WEIGHT * _placement_score(avg_placement)
+            + TOP4_WEIGHT * top4_rate
+        )
+        score = quality * (0.5 + 0.5 * reliability)
+
+        names = [champion_key(champion).title() for champion in champions]
+        key_augments = _json_list(metadata.get("key_augments"))
+        description = (
+            f"Build toward {', '.join(names[:4])}"
+            + (f" and {len(names) - 4} more" if len(names) > 4 else "")
+            + (f"; still missing {', '.join(champion_key(c).title() for c in missing[:4])}." if missing else ".")
+        )
+        reasoning = (
+            f"You already field {len(have)} of its {len(champions)} units. "
+            f"It averages {avg_placement:.2f} placement with a {top4_rate:.0%} top 4 rate "
+            f"over {metadata.get('sample_size', 0)} games."
+        )
+        if key_augments:
+            reasoning += f" Key augments: {', '.join(key_augments[:3])}."
+
+        option = StrategicOption(
+            rank=0,
+            title=_comp_title(metadata.get("comp_name"), names),
+            description=description,
+            reasoning=reasoning,
+            key_stats={
+                "avg_placement": avg_placement,
+                "top4_rate": top4_rate,
+                "sample_size": metadata.get("sample_size", 0),
+                "board_overlap": round(overlap, 2),
+            },
+            confidence=round(min(max(score, 0.0), 1.0), 2)
+        )
+        return score, option
+
+    @staticmethod
+    def _augment_option(metadata: Dict[str, Any]) -> Tuple[float, StrategicOption]:
+        avg_placement = metadata.get("avg_placement", 4.5)
+        top4_rate = metadata.get("top4_rate", 0.5)
+        quality = 0.55 * _placement_score(avg_placement) + 0.45 * top4_rate
+        score = quality * (0.5 + 0.5 * _reliability(metadata))
+
+        option = StrategicOption(
+            rank=0,
+            title=f"Take {metadata['augment_name']}",
+            description=f"Pick {metadata['augment_name']} from the augments on offer.",
+            reasoning=(
+                f"It averages {avg_placement:.2f} placement with a {top4_rate:.0%} top 4 rate "
+                f"over {metadata.get('sample_size', 0)} games."
+            ),
+            key_stats={
+                "avg_placement": avg_placement,
+                "top4_rate": top4_rate,
+                "sample_size": metadata.get("sample_size", 0),
+            },
+            confidence=round(min(max(score, 0.0), 1.0), 2)
+        )
+        return score, option
+
+    @staticmethod
+    def _general_advice(snapshot: GameSnapshot) -> str:
+        """Rule-of-thumb advice from health, gold and level."""
+        if snapshot.health <= 30:
+            return "Your health is low: spend gold now to stabilize your board before greeding economy."
+        if snapshot.gold >= 50:
+            return "You are at maximum interest: push levels or roll above 50 gold to strengthen your board."
+        if snapshot.level < 8 and snapshot.health >= 60:
+            return "You are healthy: build toward 50 gold for interest and level on the standard curve."
+        return "Hold your economy where you can and upgrade the core units of your strongest composition."
@@ -0,0 +1,82 @@
+import json
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayItemParser:
+    """Incrementally extract the objects of a JSON array from streamed text.
+
+    Feed completion tokens as they arrive; every object of the first array
+    found at the top level (``[{...}, ...]``) or directly inside the
+    top-level object (``{"options": [{...}, ...]}``) is returned as soon
+    as its closing brace has been seen. Brackets inside strings are
+    ignored. Everything after that array is only buffered, so the complete
+    text remains available through ``text``.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth: Optional[int] = None
+        self._item: Optional[List[str]] = None
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text and return the objects it completed."""
+        self._chunks.append(text)
+        items = []
+
+        for ch in text:
+            if self._item is not None:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == "[" or ch == "{":
+                if ch == "[" and self._array_depth is None and self._depth <= 1:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and not self.done and self._depth == self._array_depth:
+                    self._item = ["{"]
+                self._depth += 1
+            elif ch == "]" or ch == "}":
+                self._depth -= 1
+                if self._item is not None and self._depth == self._array_depth:
+                    item = self._finish_item()
+                    if item is not None:
+                        items.append(item)
+                elif ch == "]" and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self.done = True
+
+        return items
+
+    def _finish_item(self) -> Optional[Dict[str, Any]]:
+        raw = "".join(self._item)
+        self._item = None
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed streamed item: {raw[:100]!r}")
+            return None
+        return item if isinstance(item, dict) else None
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
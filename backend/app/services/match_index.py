@@ -0,0 +1,79 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+import logging
+
+from app.services.match_store import MatchStore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FetchAbandoned(Exception):
+    """The caller running a shared fetch was cancelled before it finished."""
+
+
+class MatchIndex:
+    """Global view of known match IDs with in-flight fetch tracking.
+
+    A match is known once it is in the match store, so membership is answered
+    by the store's own ID index rather than a second copy of it. Concurrent
+    requests for the same unknown match share a single fetch.
+    ``fetches_saved`` counts every fetch avoided by either mechanism over the
+    life of the index.
+    """
+
+    def __init__(self, match_store: MatchStore):
+        self.match_store = match_store
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.fetches_saved = 0
+
+    def record_saved(self):
+        """Count a fetch avoided because the match was already known."""
+        self.fetches_saved += 1
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self.match_store
+
+    def __len__(self) -> int:
+        return len(self.match_store)
+
+    async def fetch_once(self, match_id: str, fetch: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run ``fetch`` unless the same match is already being fetched.
+
+        Callers arriving while a fetch is in flight wait for its result
+        instead of issuing their own request; if the fetching caller is
+        cancelled, one of them starts a new fetch. Returns the result and
+        whether it came from another caller's fetch. ``fetch`` is expected
+        to store the match, which makes it known.
+        """
+        pending = self._in_flight.get(match_id)
+        while pending is not None:
+            try:
+                result = await asyncio.shield(pending)
+            except FetchAbandoned:
+                # Another caller may already have taken over the fetch
+                pending = self._in_flight.get(match_id)
+                continue
+            self.fetches_saved += 1
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[match_id] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            # Only this caller is cancelled; waiters retry with a fetch of their own
+            future.set_exception(FetchAbandoned(match_id))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._in_flight[match_id]
@@ -0,0 +1,400 @@
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+from app.core.config import settings
+from app.models.schemas import MatchData
+
+logger = logging.getLogger(__name__)
+
+# Participant fields the stats engine reads
+PARTICIPANT_COLUMNS = ("placement", "units", "augments")
+
+class MatchStore(ABC):
+    """Storage backend for raw match data."""
+
+    backend: str
+    root: Path
+    # Whether match IDs keep a stable storage order that ``ids_since`` can resume from
+    ordered = False
+
+    @abstractmethod
+    def put(self, match: MatchData):
+        """Store a match. Storing an already known match is a no-op."""
+
+    @abstractmethod
+    def get_raw(self, match_id: str) -> Optional[Dict[str, Any]]:
+        """Point lookup of a single match as a plain dict."""
+
+    @abstractmethod
+    def ids(self) -> Iterator[str]:
+        """Iterate over all stored match IDs."""
+
+    def ids_since(self, position: int) -> Optional[List[str]]:
+        """Match IDs stored after the first ``position`` matches, in storage order.
+
+        Returns None for stores without a stable order.
+        """
+        return None
+
+    @abstractmethod
+    def scan_raw(self, set_number: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate over stored matches as plain dicts, optionally for one set."""
+
+    @abstractmethod
+    def __contains__(self, match_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def put_many(self, matches: Iterable[MatchData]):
+        for match in matches:
+            self.put(match)
+
+    def get(self, match_id: str) -> Optional[MatchData]:
+        """Point lookup of a single match."""
+        data = self.get_raw(match_id)
+        return MatchData(**data) if data is not None else None
+
+    def iter_raw(self, match_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Point lookups for several matches, skipping any that are missing."""
+        for match_id in match_ids:
+            data = self.get_raw(match_id)
+            if data is not None:
+                yield data
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        match_ids: Optional[Iterable[str]] = None,
+        set_number: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Stream raw matches in lists of at most ``batch_size``.
+
+        Reads the given ``match_ids`` by point lookup, or scans the store
+        (optionally one set) when no IDs are given. Only one batch is held
+        in memory at a time.
+        """
+        if match_ids is not None:
+            source = self.iter_raw(match_ids)
+        else:
+            source = self.scan_raw(set_number)
+
+        while True:
+            batch = list(islice(source, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def scan(self, set_number: Optional[int] = None) -> Iterator[MatchData]:
+        """Iterate over stored matches, optionally for one set."""
+        for data in self.scan_raw(set_number):
+            yield MatchData(**data)
+
+    def scan_columns(
+        self,
+        batch_size: int,
+        columns: Sequence[str] = PARTICIPANT_COLUMNS,
+        match_ids: Optional[Iterable[str]] = None,
+        set_number: Optional[int] = None
+    ) -> Iterator[Dict[str, List[Any]]]:
+        """Stream matches as column-oriented batches of at most ``batch_size`` matches.
+
+        ``match_id`` and ``tft_set_number`` hold one entry per match; every
+        other column holds one entry per participant (``None`` where the
+        field is missing), and the participants of match ``i`` are rows
+        ``offsets[i]:offsets[i + 1]``. Only the requested participant
+        fields are kept. Matches are selected as in ``iter_batches``.
+        """
+        for matches in self.iter_batches(batch_size, match_ids=match_ids, set_number=set_number):
+            batch: Dict[str, List[Any]] = {"match_id": [], "tft_set_number": [], "offsets": [0]}
+            batch.update((column, []) for column in columns)
+            offset = 0
+            for data in matches:
+                participants = data["participants"]
+                batch["match_id"].append(data["match_id"])
+                batch["tft_set_number"].append(data["tft_set_number"])
+                for column in columns:
+                    batch[column].extend(participant.get(column) for participant in participants)
+                offset += len(participants)
+                batch["offsets"].append(offset)
+            yield batch
+
+    def close(self):
+        """Release any open resources."""
+
+
+class JsonMatchStore(MatchStore):
+    """Legacy store with one ``{match_id}.json`` file per match."""
+
+    backend = "json"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, match_id: str) -> Path:
+        return self.root / f"{match_id}.json"
+
+    def put(self, match: MatchData):
+        path = self._path(match.match_id)
+        if path.exists():
+            return
+        with open(path, 'w') as f:
+            json.dump(match.dict(), f)
+
+    def get_raw(self, match_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(match_id), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def ids(self) -> Iterator[str]:
+        for path in self.root.glob("*.json"):
+            yield path.stem
+
+    def scan_raw(self, set_number: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        for path in self.root.glob("*.json"):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if set_number is None or data["tft_set_number"] == set_number:
+                yield data
+
+    def __contains__(self, match_id: str) -> bool:
+        return self._path(match_id).exists()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.root.glob("*.json"))
+
+
+class SegmentMatchStore(MatchStore):
+    """Append-only store of zlib-compressed match records in segment files.
+
+    Matches are partitioned by set into ``set_{n}/`` directories, each holding
+    numbered ``segment_{k}.bin`` files that roll over at a configurable size.
+    A record is ``<id length:u16><id><payload length:u32><zlib(json)>``.
+    ``index.tsv`` maps every match ID to its partition, segment and offset
+    for point lookups; scans read segments sequentially.
+    """
+
+    backend = "segment"
+    ordered = True
+    INDEX_FILE = "index.tsv"
+    _ID_HEADER = struct.Struct(">H")
+    _PAYLOAD_HEADER = struct.Struct(">I")
+
+    def __init__(
+        self,
+        root: Path,
+        segment_max_bytes: Optional[int] = None,
+        compression_level: Optional[int] = None
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes or settings.match_store_segment_max_bytes
+        self.compression_level = (
+            compression_level if compression_level is not None
+            else settings.match_store_compression_level
+        )
+
+        # match_id -> (partition, segment, offset)
+        self._index: Dict[str, Tuple[str, int, int]] = {}
+        # Match IDs in the order they were stored
+        self._order: List[str] = []
+        self._writers: Dict[str, Tuple[int, BinaryIO]] = {}
+        self._index_file: Optional[BinaryIO] = None
+        self._load_index()
+
+    @staticmethod
+    def _partition_for(set_number: int) -> str:
+        return f"set_{set_number}"
+
+    def _segment_path(self, partition: str, segment: int) -> Path:
+        return self.root / partition / f"segment_{segment:05d}.bin"
+
+    def _load_index(self):
+        index_path = self.root / self.INDEX_FILE
+        if not index_path.exists():
+            return
+
+        with open(index_path, 'r') as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 4:
+                    continue
+                match_id, partition, segment, offset = parts
+                if match_id not in self._index:
+                    self._order.append(match_id)
+                self._index[match_id] = (partition, int(segment), int(offset))
+        logger.info(f"Loaded match store index with {len(self._index)} matches")
+
+    def _writer(self, partition: str) -> Tuple[int, BinaryIO]:
+        """Return the open segment for a partition, rolling over when full."""
+        current = self._writers.get(partition)
+        if current is not None:
+            segment, handle = current
+            if handle.tell() < self.segment_max_bytes:
+                return current
+            handle.close()
+            segment += 1
+        else:
+            partition_dir = self.root / partition
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            existing = sorted(partition_dir.glob("segment_*.bin"))
+            segment = int(existing[-1].stem.split("_")[1]) if existing else 0
+            if existing and existing[-1].stat().st_size >= self.segment_max_bytes:
+                segment += 1
+
+        handle = open(self._segment_path(partition, segment), 'ab')
+        self._writers[partition] = (segment, handle)
+        return segment, handle
+
+    def put(self, match: MatchData):
+        if match.match_id in self._index:
+            return
+
+        partition = self._partition_for(match.tft_set_number)
+        segment, handle = self._writer(partition)
+
+        key = match.match_id.encode()
+        payload = zlib.compress(json.dumps(match.dict()).encode(), self.compression_level)
+        offset = handle.tell()
+        handle.write(self._ID_HEADER.pack(len(key)) + key)
+        handle.write(self._PAYLOAD_HEADER.pack(len(payload)) + payload)
+        handle.flush()
+
+        if self._index_file is None:
+            self._index_file = open(self.root / self.INDEX_FILE, 'ab')
+        self._index_file.write(f"{match.match_id}\t{partition}\t{segment}\t{offset}\n".encode())
+        self._index_file.flush()
+
+        self._index[match.match_id] = (partition, segment, offset)
+        self._order.append(match.match_id)
+
+    def _read_record(self, handle: BinaryIO) -> Optional[Tuple[str, bytes]]:
+        """Read the record at the current position, or None at end of file."""
+        header = handle.read(self._ID_HEADER.size)
+        if len(header) < self._ID_HEADER.size:
+            return None
+        (key_length,) = self._ID_HEADER.unpack(header)
+        match_id = handle.read(key_length).decode()
+
+        header = handle.read(self._PAYLOAD_HEADER.size)
+        if len(header) < self._PAYLOAD_HEADER.size:
+            return None
+        (payload_length,) = self._PAYLOAD_HEADER.unpack(header)
+        payload = handle.read(payload_length)
+        if len(payload) < payload_length:
+            return None
+
+        return match_id, payload
+
+    def _read_at(self, handle: BinaryIO, match_id: str, offset: int) -> Optional[Dict[str, Any]]:
+        handle.seek(offset)
+        record = self._read_record(handle)
+        if record is None or record[0] != match_id:
+            logger.warning(f"Match store record for {match_id} is missing or corrupt")
+            return None
+        return json.loads(zlib.decompress(record[1]))
+
+    def get_raw(self, match_id: str) -> Optional[Dict[str, Any]]:
+        location = self._index.get(match_id)
+        if location is None:
+            return None
+
+        partition, segment, offset = location
+        with open(self._segment_path(partition, segment), 'rb') as f:
+            return self._read_at(f, match_id, offset)
+
+    def iter_raw(self, match_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Point lookups that keep the current segment open between matches."""
+        current: Optional[Tuple[str, int]] = None
+        handle: Optional[BinaryIO] = None
+        try:
+            for match_id in match_ids:
+                location = self._index.get(match_id)
+                if location is None:
+                    continue
+
+                partition, segment, offset = location
+                if (partition, segment) != current:
+                    if handle is not None:
+                        handle.close()
+                    handle = open(self._segment_path(partition, segment), 'rb')
+                    current = (partition, segment)
+
+                data = self._read_at(handle, match_id, offset)
+                if data is not None:
+                    yield data
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def ids(self) -> Iterator[str]:
+        return iter(list(self._order))
+
+    def ids_since(self, position: int) -> Optional[List[str]]:
+        return self._order[position:]
+
+    def partitions(self) -> List[str]:
+        return sorted(path.name for path in self.root.glob("set_*") if path.is_dir())
+
+    def scan_raw(self, set_number: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        if set_number is None:
+            partitions = self.partitions()
+        else:
+            partitions = [self._partition_for(set_number)]
+
+        for partition in partitions:
+            for segment_path in sorted((self.root / partition).glob("segment_*.bin")):
+                segment = int(segment_path.stem.split("_")[1])
+                with open(segment_path, 'rb') as f:
+                    while True:
+                        offset = f.tell()
+                        record = self._read_record(f)
+                        if record is None:
+                            break
+                        match_id, payload = record
+                        # Skip records that never made it into the index (e.g. interrupted writes)
+                        if self._index.get(match_id) != (partition, segment, offset):
+                            continue
+                        yield json.loads(zlib.decompress(payload))
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self):
+        for _, handle in self._writers.values():
+            handle.close()
+        self._writers.clear()
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+
+def open_match_store(backend: str, root: Path) -> MatchStore:
+    """Open a match store of the given backend at ``root``."""
+    if backend == "json":
+        return JsonMatchStore(Path(root))
+    if backend == "segment":
+        return SegmentMatchStore(Path(root))
+
+    raise ValueError(f"Unknown match store backend: {backend}")
+
+
+def create_match_store(backend: Optional[str] = None) -> MatchStore:
+    """Create the match store configured in settings."""
+    backend = backend or settings.match_store_backend
+    root = settings.match_data_cache_dir if backend == "json" else settings.match_store_dir
+    return open_match_store(backend, Path(root))
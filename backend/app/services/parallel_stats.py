@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+import logging
+
+from app.core.config import settings
+from app.services.match_store import MatchStore, open_match_store
+from app.services.stats_engine import StatsAggregate, StatsEngine
+
+logger = logging.getLogger(__name__)
+
+
+def aggregate_shard(
+    backend: str,
+    root: str,
+    match_ids: Sequence[str],
+    patch: str,
+    batch_size: int
+) -> StatsAggregate:
+    """Worker entry point: stream one shard from the match store and aggregate it."""
+    store = open_match_store(backend, Path(root))
+    engine = StatsEngine()
+    aggregate = StatsAggregate(patch=patch)
+    try:
+        for batch in store.scan_columns(batch_size, match_ids=match_ids):
+            engine.fold_columns(aggregate, [batch])
+    finally:
+        store.close()
+    return aggregate
+
+
+def resolve_worker_count(workers: int) -> int:
+    """Map the ``stats_workers`` setting to a process count (0 means one per CPU)."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class ParallelStatsRunner:
+    """Shards stats computation across a process pool and merges the partial aggregates.
+
+    Workers read their shard straight from the match store, so only match IDs
+    go to the workers and only aggregates (sized by distinct keys) come back.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = resolve_worker_count(
+            settings.stats_workers if workers is None else workers
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn rather than fork: the server process runs threads (event loop, Chroma)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @staticmethod
+    def _shard(match_ids: List[str], shards: int) -> List[List[str]]:
+        """Split into contiguous shards so segment reads stay sequential."""
+        size = -(-len(match_ids) // shards)
+        return [match_ids[i:i + size] for i in range(0, len(match_ids), size)]
+
+    async def aggregate(
+        self,
+        store: MatchStore,
+        match_ids: List[str],
+        patch: str
+    ) -> StatsAggregate:
+        """Aggregate the given stored matches across the pool."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        shards = self._shard(match_ids, self.workers)
+
+        logger.info(f"Computing stats for {len(match_ids)} matches across {len(shards)} workers")
+        partials = await asyncio.gather(*(
+            loop.run_in_executor(
+                executor,
+                aggregate_shard,
+                store.backend,
+                str(store.root),
+                shard,
+                patch,
+                settings.stats_batch_size
+            )
+            for shard in shards
+        ))
+
+        # Merge in shard order so first-seen ordering matches a serial pass
+        merged = StatsAggregate(patch=patch)
+        for partial in partials:
+            merged.merge(partial)
+        return merged
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
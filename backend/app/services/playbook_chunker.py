@@ -0,0 +1,111 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+DEFAULT_MAX_CHARS = 1500
+
+
+def playbook_source(title: str) -> str:
+    """Stable source key for a playbook title, e.g. ``"Fast 8"`` -> ``"fast_8"``."""
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+@dataclass
+class Playbook:
+    """A markdown playbook identified by its source (usually the file stem).
+
+    ``origin`` records how it was added: ``"file"`` for playbooks loaded from
+    the playbooks directory, which the loader may delete again when their
+    file is removed, or ``"api"`` for playbooks added through the API.
+    """
+    source: str
+    title: str
+    content: str
+    tags: List[str] = field(default_factory=list)
+    origin: str = "api"
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.content.encode()).hexdigest()
+
+
+@dataclass
+class PlaybookChunk:
+    """One section of a playbook, ready to be embedded."""
+    index: int
+    heading_path: List[str]
+    body: str
+
+    @property
+    def section(self) -> str:
+        return self.heading_path[-1] if self.heading_path else ""
+
+    @property
+    def text(self) -> str:
+        """Chunk text for embedding and prompts, prefixed with its heading breadcrumb."""
+        if not self.heading_path:
+            return self.body
+        return f"{' > '.join(self.heading_path)}\n{self.body}"
+
+
+def _split_long(body: str, max_chars: int) -> List[str]:
+    """Split an oversized section on paragraph, then line, boundaries."""
+    if len(body) <= max_chars:
+        return [body]
+
+    parts: List[str] = []
+    current = ""
+    for block in re.split(r"\n\s*\n", body):
+        pieces = [block] if len(block) <= max_chars else block.splitlines()
+        for piece in pieces:
+            candidate = f"{current}\n\n{piece}" if current else piece
+            if current and len(candidate) > max_chars:
+                parts.append(current)
+                current = piece
+            else:
+                current = candidate
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_markdown(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[PlaybookChunk]:
+    """Split a markdown playbook into one chunk per headed section.
+
+    Each chunk keeps the path of headings above it (e.g. ``["Early Game",
+    "Economy Management"]``). Headings without body text of their own only
+    contribute to their subsections' paths, and sections longer than
+    ``max_chars`` are split further.
+    """
+    chunks: List[PlaybookChunk] = []
+    path: List[Tuple[int, str]] = []  # (level, heading)
+    lines: List[str] = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        lines.clear()
+        if not body:
+            return
+        headings = [heading for _, heading in path]
+        for part in _split_long(body, max_chars):
+            chunks.append(PlaybookChunk(len(chunks), headings, part))
+
+    in_code = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING.match(line)
+        if match is None:
+            lines.append(line)
+            continue
+
+        flush()
+        level = len(match.group(1))
+        while path and path[-1][0] >= level:
+            path.pop()
+        path.append((level, match.group(2)))
+
+    flush()
+    return chunks
@@ -1,22 +1,117 @@
-import openai
-from typing import List, Dict, Any
+import asyncio
+import time
+from typing import TYPE_CHECKING, AsyncIterator, List, Dict, Any, Optional, Tuple
 import logging
 import json
 
+from app.core import metrics
 from app.core.config import settings
 from app.models.schemas import GameSnapshot, StrategicAdvice, StrategicOption
-from app.services.vector_store import VectorStoreService
+from app.services.advice_cache import AdviceCache
+from app.services.context_builder import (
+    PLAYBOOK_RELIABILITY,
+    BuiltContext,
+    ContextBuilder,
+    Snippet,
+    TokenCounter,
+    score_result
+)
+from app.services.fast_advice import FastAdviceEngine
+from app.services.json_stream import JsonArrayItemParser
+from app.services.vector_store import RetrievalResult, VectorStoreService
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
+MAX_OPTIONS = 5
+
+OPTIONS_FORMAT = """
+Return your response as a JSON array of options, ordered by recommendation strength.
+
+Example format:
+[
+  {
+    "rank": 1,
+    "title": "Pivot to Reroll Comp",
+    "description": "Sell high-cost units and roll down for 3-star carries",
+    "reasoning": "At stage 4-2 with 50 gold, statistics show this comp has 65% top 4 rate when executed at this timing",
+    "key_stats": {"avg_placement": 3.2, "top4_rate": 0.65},
+    "confidence": 0.85
+  }
+]
+"""
+
+# Options come first so they can be streamed before the general advice arrives
+MERGED_FORMAT = """
+Also provide brief general advice (2-3 sentences) focused on immediate priorities and key considerations for their current situation.
+
+Return your response as a JSON object with the options ordered by recommendation strength.
+
+Example format:
+{
+  "options": [
+    {
+      "rank": 1,
+      "title": "Pivot to Reroll Comp",
+      "description": "Sell high-cost units and roll down for 3-star carries",
+      "reasoning": "At stage 4-2 with 50 gold, statistics show this comp has 65% top 4 rate when executed at this timing",
+      "key_stats": {"avg_placement": 3.2, "top4_rate": 0.65},
+      "confidence": 0.85
+    }
+  ],
+  "general_advice": "Stabilize before greeding levels; your health cannot afford another loss streak."
+}
+"""
+
+CONTEXT_SECTION_TITLES = {
+    "compositions": "## Relevant Team Compositions",
+    "augments": "## Relevant Augments",
+    "playbooks": "## Strategic Playbooks",
+}
+
+FALLBACK_GENERAL_ADVICE = "Focus on economy and positioning. Make decisions based on your health and lobby strength."
+FALLBACK_OPTION = StrategicOption(
+    rank=1,
+    title="Continue Current Strategy",
+    description="Maintain your current approach based on available information.",
+    reasoning="Unable to generate specific recommendations at this time.",
+    key_stats={},
+    confidence=0.3
+)
+
 
 class RAGService:
     """Service for Retrieval-Augmented Generation of strategic advice."""
     
-    def __init__(self, vector_store: VectorStoreService = None):
+    def __init__(
+        self,
+        vector_store: VectorStoreService = None,
+        openai_client: Optional["AsyncOpenAI"] = None,
+        advice_cache: Optional[AdviceCache] = None
+    ):
         self.vector_store = vector_store or VectorStoreService()
-        openai.api_key = settings.openai_api_key
+        self._openai_client = openai_client
+        self.advice_cache = advice_cache
         self.model = settings.openai_model
+        self.context_builder = ContextBuilder(
+            settings.context_token_budget,
+            TokenCounter(self.model)
+        )
+        self.fast_engine = FastAdviceEngine()
+    
+    @property
+    def openai_client(self) -> "AsyncOpenAI":
+        """Async OpenAI client, created on first use so a missing key only fails advice calls."""
+        if self._openai_client is None:
+            from openai import AsyncOpenAI
+            
+            self._openai_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                timeout=settings.openai_timeout
+            )
+        return self._openai_client
     
     def _create_query_from_snapshot(self, snapshot: GameSnapshot) -> str:
         """Create a search query from game snapshot."""
@@ -40,55 +135,292 @@ class RAGService:
         
         return " ".join(query_parts)
     
-    async def generate_advice(self, snapshot: GameSnapshot) -> StrategicAdvice:
-        """Generate strategic advice using RAG."""
+    async def generate_advice(self, snapshot: GameSnapshot, mode: str = "llm") -> StrategicAdvice:
+        """Generate strategic advice, served from the advice cache when possible.
         
-        # Create query from snapshot
-        query = self._create_query_from_snapshot(snapshot)
+        ``mode="fast"`` skips the LLM and ranks options from the retrieved
+        stats alone.
+        """
+        start = time.perf_counter()
+        if mode == "fast":
+            retrieval, _, retrieved_context = await self._retrieve(snapshot)
+            advice = self._fast_advice(snapshot, retrieval, retrieved_context)
+            self._record_advice(mode, advice.generated_by, start)
+            return advice
         
-        # Retrieve relevant information
-        comp_results = self.vector_store.query_compositions(
-            query=query,
-            n_results=5,
-            patch_filter=snapshot.set_version.value if hasattr(snapshot.set_version, 'value') else None
-        )
+        # Resolve the key before generating, so advice built from stats that
+        # are reindexed meanwhile is not stored under the new generation
+        cache_key = None
+        if self.advice_cache is not None:
+            cache_key = await self.advice_cache.key_for(snapshot)
+        if cache_key is not None:
+            cached = await self.advice_cache.get(snapshot, cache_key)
+            if cached is not None:
+                logger.info("Serving advice from cache")
+                self._record_advice(mode, "cache", start)
+                return cached
         
-        augment_results = self.vector_store.query_augments(
-            query=query,
-            n_results=5,
-            patch_filter=snapshot.set_version.value if hasattr(snapshot.set_version, 'value') else None
-        )
+        advice = await self._generate_advice(snapshot)
+        
+        # Fallback answers come from failed or slow LLM calls and must not be cached
+        if cache_key is not None and not self._is_fallback(advice):
+            await self.advice_cache.set(snapshot, advice, cache_key)
+        self._record_advice(mode, advice.generated_by, start)
+        return advice
+    
+    @staticmethod
+    def _record_advice(mode: str, source: str, start: float):
+        metrics.ADVICE_SECONDS.observe(time.perf_counter() - start, mode=mode, source=source)
+    
+    async def stream_advice(
+        self,
+        snapshot: GameSnapshot,
+        mode: str = "llm"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Generate advice as a sequence of ``(event, data)`` pairs.
+        
+        Emits ``context`` once retrieval is done, one ``option`` per strategic
+        option as soon as it has been parsed from the token stream, then
+        ``general_advice`` and finally ``done`` with the complete advice.
+        """
+        start = time.perf_counter()
+        requested_mode = mode
+        if mode == "fast":
+            retrieval, _, retrieved_context = await self._retrieve(snapshot)
+            advice = self._fast_advice(snapshot, retrieval, retrieved_context)
+            yield "context", {"retrieved_context": retrieved_context}
+            for option in advice.options:
+                yield "option", option.model_dump()
+            yield "general_advice", {"general_advice": advice.general_advice}
+            self._record_advice(requested_mode, advice.generated_by, start)
+            yield "done", advice.model_dump(mode="json")
+            return
+        
+        cache_key = None
+        if self.advice_cache is not None:
+            cache_key = await self.advice_cache.key_for(snapshot)
+        if cache_key is not None:
+            cached = await self.advice_cache.get(snapshot, cache_key)
+            if cached is not None:
+                logger.info("Serving streamed advice from cache")
+                yield "context", {"retrieved_context": cached.retrieved_context}
+                for option in cached.options:
+                    yield "option", option.model_dump()
+                yield "general_advice", {"general_advice": cached.general_advice}
+                self._record_advice(requested_mode, "cache", start)
+                yield "done", cached.model_dump(mode="json")
+                return
+        
+        retrieval, context, retrieved_context = await self._retrieve(snapshot)
+        yield "context", {"retrieved_context": retrieved_context}
         
-        playbook_results = self.vector_store.query_playbooks(
-            query=query,
-            n_results=3
+        mode = settings.advice_generation_mode
+        merged = mode == "merged"
+        general_task = None
+        if mode == "concurrent":
+            general_task = asyncio.create_task(self._generate_general_advice(snapshot, context))
+        
+        try:
+            options: List[StrategicOption] = []
+            parser = JsonArrayItemParser()
+            try:
+                async for opt_data in self._stream_options(snapshot, context, merged, parser):
+                    option = self._parse_option(opt_data, len(options))
+                    options.append(option)
+                    yield "option", option.model_dump()
+            except Exception as e:
+                logger.error(f"Error streaming options: {e}")
+            
+            generated_by = "llm"
+            if not options:
+                metrics.ADVICE_FALLBACKS.inc(reason="llm_error")
+                options, _ = self._fast_fallback(snapshot, retrieval)
+                generated_by = "fast"
+                for option in options:
+                    yield "option", option.model_dump()
+            
+            if merged:
+                general_advice = self._merged_general_advice(parser.text)
+            elif general_task is not None:
+                general_advice = await general_task
+            else:
+                general_advice = await self._generate_general_advice(snapshot, context)
+            if general_advice == FALLBACK_GENERAL_ADVICE:
+                metrics.ADVICE_FALLBACKS.inc(reason="llm_error")
+                _, general_advice = self._fast_fallback(snapshot, retrieval)
+                generated_by = "fast"
+            yield "general_advice", {"general_advice": general_advice}
+        finally:
+            # The client may disconnect before the general advice is needed
+            if general_task is not None and not general_task.done():
+                general_task.cancel()
+        
+        advice = StrategicAdvice(
+            snapshot=snapshot,
+            options=options,
+            general_advice=general_advice,
+            retrieved_context=retrieved_context,
+            generated_by=generated_by
         )
+        if cache_key is not None and not self._is_fallback(advice):
+            await self.advice_cache.set(snapshot, advice, cache_key)
+        self._record_advice(requested_mode, generated_by, start)
+        yield "done", advice.model_dump(mode="json")
+    
+    async def _stream_options(
+        self,
+        snapshot: GameSnapshot,
+        context: str,
+        merged: bool,
+        parser: JsonArrayItemParser
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the options completion, yielding each option object once complete."""
+        label = "merged" if merged else "options"
+        start = time.perf_counter()
+        first_token = None
+        count = 0
         
-        # Build context for LLM
-        context = self._build_context(
-            snapshot, 
-            comp_results, 
-            augment_results, 
-            playbook_results
+        stream = await self.openai_client.chat.completions.create(
+            model=self.model,
+            stream=True,
+            **self._options_request(snapshot, context, merged=merged)
         )
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                for item in parser.feed(delta):
+                    if count < MAX_OPTIONS:
+                        count += 1
+                        yield item
+        finally:
+            elapsed = time.perf_counter() - start
+            ttft = first_token - start if first_token is not None else elapsed
+            metrics.ADVICE_STAGE_SECONDS.observe(elapsed, stage=f"llm_{label}_stream")
+            metrics.ADVICE_STAGE_SECONDS.observe(ttft, stage=f"llm_{label}_first_token")
+            logger.info(f"LLM stream {label} took {elapsed * 1000:.0f}ms (first token after {ttft * 1000:.0f}ms)")
+    
+    @staticmethod
+    def _merged_general_advice(text: str) -> str:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing merged advice: {e}")
+            return FALLBACK_GENERAL_ADVICE
+        general_advice = data.get("general_advice") if isinstance(data, dict) else None
+        return (general_advice or FALLBACK_GENERAL_ADVICE).strip()
+    
+    async def _generate_advice(self, snapshot: GameSnapshot) -> StrategicAdvice:
+        """Generate strategic advice using RAG."""
+        retrieval, context, retrieved_context = await self._retrieve(snapshot)
         
-        # Generate advice using LLM
-        options = await self._generate_options(snapshot, context)
-        general_advice = await self._generate_general_advice(snapshot, context)
+        # Generate advice using LLM, answering from the stats alone when it
+        # takes longer than the latency budget
+        budget = settings.llm_latency_budget
+        try:
+            options, general_advice = await asyncio.wait_for(
+                self._generate(snapshot, context),
+                timeout=budget or None
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM exceeded the {budget:.1f}s latency budget; answering from stats")
+            metrics.ADVICE_FALLBACKS.inc(reason="latency_budget")
+            return self._fast_advice(snapshot, retrieval, retrieved_context)
         
-        # Collect retrieved context for transparency
-        retrieved_context = [
-            f"Composition: {r['document'][:100]}..." for r in comp_results[:3]
-        ] + [
-            f"Augment: {r['document'][:100]}..." for r in augment_results[:3]
-        ]
+        # Replace the parts the LLM failed to produce
+        generated_by = "llm"
+        if options == [FALLBACK_OPTION]:
+            metrics.ADVICE_FALLBACKS.inc(reason="llm_error")
+            options, _ = self._fast_fallback(snapshot, retrieval)
+            generated_by = "fast"
+        if general_advice == FALLBACK_GENERAL_ADVICE:
+            metrics.ADVICE_FALLBACKS.inc(reason="llm_error")
+            _, general_advice = self._fast_fallback(snapshot, retrieval)
+            generated_by = "fast"
         
         return StrategicAdvice(
             snapshot=snapshot,
             options=options,
             general_advice=general_advice,
-            retrieved_context=retrieved_context
+            retrieved_context=retrieved_context,
+            generated_by=generated_by
+        )
+    
+    def _fast_fallback(
+        self,
+        snapshot: GameSnapshot,
+        retrieval: RetrievalResult
+    ) -> Tuple[List[StrategicOption], str]:
+        """Stats-only options and general advice, or the generic fallback without stats."""
+        options, general_advice = self.fast_engine.advise(
+            snapshot,
+            retrieval.compositions,
+            retrieval.augments
         )
+        return options or self._fallback_options(), general_advice
+    
+    def _fast_advice(
+        self,
+        snapshot: GameSnapshot,
+        retrieval: RetrievalResult,
+        retrieved_context: List[str]
+    ) -> StrategicAdvice:
+        start = time.perf_counter()
+        options, general_advice = self._fast_fallback(snapshot, retrieval)
+        elapsed = time.perf_counter() - start
+        metrics.ADVICE_STAGE_SECONDS.observe(elapsed, stage="fast")
+        logger.info(f"Fast advice took {elapsed * 1000:.1f}ms")
+        return StrategicAdvice(
+            snapshot=snapshot,
+            options=options,
+            general_advice=general_advice,
+            retrieved_context=retrieved_context,
+            generated_by="fast"
+        )
+    
+    async def _retrieve(self, snapshot: GameSnapshot) -> Tuple[RetrievalResult, str, List[str]]:
+        """Retrieve stats and playbooks; return them with the LLM context and a summary of the sources."""
+        
+        # Create query from snapshot
+        query = self._create_query_from_snapshot(snapshot)
+        
+        # Retrieve relevant information: the query is embedded once and the
+        # three collections are searched concurrently on the vector store's threads
+        with metrics.ADVICE_STAGE_SECONDS.time(stage="retrieval"):
+            retrieval = await self.vector_store.aretrieve(
+                query=query,
+                n_compositions=settings.context_candidates,
+                n_augments=settings.context_candidates,
+                n_playbooks=settings.context_candidates,
+                patch_filter=snapshot.set_version.value if hasattr(snapshot.set_version, 'value') else None,
+                board=[champion.name for champion in snapshot.board]
+            )
+        comp_results = retrieval.compositions
+        augment_results = retrieval.augments
+        playbook_results = retrieval.playbooks
+        
+        # Build context for LLM
+        with metrics.ADVICE_STAGE_SECONDS.time(stage="context_build"):
+            built = self._build_context(
+                snapshot, 
+                comp_results, 
+                augment_results, 
+                playbook_results
+            )
+        
+        # Collect the stats that made it into the prompt for transparency
+        retrieved_context = [
+            f"Composition: {snippet.text[2:102]}..." for snippet in built.section_snippets("compositions")[:3]
+        ] + [
+            f"Augment: {snippet.text[2:102]}..." for snippet in built.section_snippets("augments")[:3]
+        ]
+        
+        return retrieval, built.text, retrieved_context
     
     def _build_context(
         self,
@@ -96,8 +428,8 @@ class RAGService:
         comp_results: List[Dict[str, Any]],
         augment_results: List[Dict[str, Any]],
         playbook_results: List[Dict[str, Any]]
-    ) -> str:
-        """Build context string for LLM prompt."""
+    ) -> BuiltContext:
+        """Build the LLM prompt context within ``settings.context_token_budget``."""
         context_parts = []
         
         # Current game state
@@ -115,34 +447,73 @@ class RAGService:
         if snapshot.active_traits:
             context_parts.append(f"Active Traits: {', '.join(snapshot.active_traits)}")
         
-        # Retrieved composition stats
-        if comp_results:
-            context_parts.append("\n## Relevant Team Compositions")
-            for result in comp_results[:3]:
-                context_parts.append(f"- {result['document']}")
-        
-        # Retrieved augment stats
-        if augment_results:
-            context_parts.append("\n## Relevant Augments")
-            for result in augment_results[:3]:
-                context_parts.append(f"- {result['document']}")
+        # Retrieved stats are weighted by similarity and sample size, playbook
+        # sections by similarity; the best-scoring ones are packed into the budget
+        sections = {
+            "compositions": [
+                Snippet("compositions", f"- {r['document']}", score_result(r), r.get("metadata") or {})
+                for r in comp_results
+            ],
+            "augments": [
+                Snippet("augments", f"- {r['document']}", score_result(r), r.get("metadata") or {})
+                for r in augment_results
+            ],
+            "playbooks": [
+                Snippet("playbooks", r['document'], score_result(r, PLAYBOOK_RELIABILITY), r.get("metadata") or {})
+                for r in playbook_results
+            ],
+        }
+        built = self.context_builder.build(context_parts, sections, CONTEXT_SECTION_TITLES)
+        metrics.CONTEXT_TOKENS.observe(built.total_tokens)
         
-        # Strategic playbooks
-        if playbook_results:
-            context_parts.append("\n## Strategic Playbooks")
-            for result in playbook_results:
-                context_parts.append(f"- {result['document'][:200]}")
+        logger.info(
+            f"Context uses {built.total_tokens}/{self.context_builder.token_budget} tokens "
+            f"({'exact' if self.context_builder.counter.exact else 'estimated'}): "
+            + ", ".join(f"{name} {tokens}" for name, tokens in built.tokens_by_section.items())
+            + f"; {built.dropped} results dropped"
+        )
+        return built
+    
+    async def _complete(self, label: str, **kwargs) -> str:
+        """Run one chat completion and record its latency and token usage."""
+        start = time.perf_counter()
+        try:
+            response = await self.openai_client.chat.completions.create(model=self.model, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.ADVICE_STAGE_SECONDS.observe(elapsed, stage=f"llm_{label}")
+            logger.info(f"LLM call {label} took {elapsed * 1000:.0f}ms")
         
-        return "\n".join(context_parts)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            metrics.LLM_TOKENS.inc(usage.prompt_tokens or 0, model=self.model, kind="prompt")
+            metrics.LLM_TOKENS.inc(usage.completion_tokens or 0, model=self.model, kind="completion")
+        return response.choices[0].message.content
     
-    async def _generate_options(
-        self, 
-        snapshot: GameSnapshot, 
+    async def _generate(
+        self,
+        snapshot: GameSnapshot,
         context: str
-    ) -> List[StrategicOption]:
-        """Generate strategic options using LLM."""
+    ) -> Tuple[List[StrategicOption], str]:
+        """Generate options and general advice according to ``advice_generation_mode``."""
+        mode = settings.advice_generation_mode
+        
+        if mode == "merged":
+            return await self._generate_merged(snapshot, context)
+        
+        if mode == "concurrent":
+            options, general_advice = await asyncio.gather(
+                self._generate_options(snapshot, context),
+                self._generate_general_advice(snapshot, context)
+            )
+            return options, general_advice
         
-        prompt = f"""You are a TFT strategic advisor. Based on the current game state and retrieved statistics, provide 3-5 ranked strategic options for the player.
+        options = await self._generate_options(snapshot, context)
+        general_advice = await self._generate_general_advice(snapshot, context)
+        return options, general_advice
+    
+    def _options_instructions(self, snapshot: GameSnapshot, context: str) -> str:
+        return f"""You are a TFT strategic advisor. Based on the current game state and retrieved statistics, provide 3-5 ranked strategic options for the player.
 
 {context}
 
@@ -154,67 +525,81 @@ For each option, provide:
 3. Reasoning based on the statistics and game state
 4. Key stats supporting this option
 5. Confidence level (0.0 to 1.0)
-
-Return your response as a JSON array of options, ordered by recommendation strength.
-
-Example format:
-[
-  {{
-    "rank": 1,
-    "title": "Pivot to Reroll Comp",
-    "description": "Sell high-cost units and roll down for 3-star carries",
-    "reasoning": "At stage 4-2 with 50 gold, statistics show this comp has 65% top 4 rate when executed at this timing",
-    "key_stats": {{"avg_placement": 3.2, "top4_rate": 0.65}},
-    "confidence": 0.85
-  }}
-]
 """
+    
+    def _options_request(
+        self,
+        snapshot: GameSnapshot,
+        context: str,
+        merged: bool = False
+    ) -> Dict[str, Any]:
+        """Completion arguments for the options (or merged options and advice) call."""
+        prompt = self._options_instructions(snapshot, context)
+        if merged:
+            prompt += MERGED_FORMAT
+        else:
+            prompt += OPTIONS_FORMAT
+        
+        return dict(
+            messages=[
+                {"role": "system", "content": "You are a professional TFT coach providing strategic advice based on data."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=1700 if merged else 1500
+        )
+    
+    @staticmethod
+    def _parse_option(opt_data: Dict[str, Any], index: int) -> StrategicOption:
+        return StrategicOption(
+            rank=opt_data.get("rank", index + 1),
+            title=opt_data.get("title", "Strategic Option"),
+            description=opt_data.get("description", ""),
+            reasoning=opt_data.get("reasoning", ""),
+            key_stats=opt_data.get("key_stats", {}),
+            confidence=opt_data.get("confidence", 0.5)
+        )
+    
+    def _parse_options(self, options_data: Any) -> List[StrategicOption]:
+        """Build options from the parsed JSON of a completion."""
+        # Handle both array and object with "options" key
+        if isinstance(options_data, dict) and "options" in options_data:
+            options_data = options_data["options"]
+        
+        return [
+            self._parse_option(opt_data, i)
+            for i, opt_data in enumerate(options_data[:MAX_OPTIONS])
+        ]
+    
+    @staticmethod
+    def _fallback_options() -> List[StrategicOption]:
+        return [FALLBACK_OPTION.model_copy()]
+    
+    @staticmethod
+    def _is_fallback(advice: StrategicAdvice) -> bool:
+        return (
+            advice.generated_by != "llm"
+            or advice.general_advice == FALLBACK_GENERAL_ADVICE
+            or advice.options == [FALLBACK_OPTION]
+        )
+    
+    async def _generate_options(
+        self, 
+        snapshot: GameSnapshot, 
+        context: str
+    ) -> List[StrategicOption]:
+        """Generate strategic options using LLM."""
         
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a professional TFT coach providing strategic advice based on data."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            content = response.choices[0].message.content
-            options_data = json.loads(content)
-            
-            # Handle both array and object with "options" key
-            if isinstance(options_data, dict) and "options" in options_data:
-                options_data = options_data["options"]
+            content = await self._complete("options", **self._options_request(snapshot, context))
             
-            options = []
-            for i, opt_data in enumerate(options_data[:5]):
-                options.append(StrategicOption(
-                    rank=opt_data.get("rank", i + 1),
-                    title=opt_data.get("title", "Strategic Option"),
-                    description=opt_data.get("description", ""),
-                    reasoning=opt_data.get("reasoning", ""),
-                    key_stats=opt_data.get("key_stats", {}),
-                    confidence=opt_data.get("confidence", 0.5)
-                ))
-            
-            return options
+            return self._parse_options(json.loads(content))
             
         except Exception as e:
             logger.error(f"Error generating options: {e}")
             # Return fallback option
-            return [
-                StrategicOption(
-                    rank=1,
-                    title="Continue Current Strategy",
-                    description="Maintain your current approach based on available information.",
-                    reasoning="Unable to generate specific recommendations at this time.",
-                    key_stats={},
-                    confidence=0.3
-                )
-            ]
+            return self._fallback_options()
     
     async def _generate_general_advice(
         self, 
@@ -230,8 +615,8 @@ Example format:
 Focus on immediate priorities and key considerations for their current situation."""
         
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
+            content = await self._complete(
+                "general_advice",
                 messages=[
                     {"role": "system", "content": "You are a concise TFT coach."},
                     {"role": "user", "content": prompt}
@@ -240,8 +625,28 @@ Focus on immediate priorities and key considerations for their current situation
                 max_tokens=200
             )
             
-            return response.choices[0].message.content.strip()
+            return content.strip()
             
         except Exception as e:
             logger.error(f"Error generating general advice: {e}")
-            return "Focus on economy and positioning. Make decisions based on your health and lobby strength."
+            return FALLBACK_GENERAL_ADVICE
+    
+    async def _generate_merged(
+        self,
+        snapshot: GameSnapshot,
+        context: str
+    ) -> Tuple[List[StrategicOption], str]:
+        """Generate options and general advice in a single structured completion."""
+        
+        try:
+            content = await self._complete(
+                "merged",
+                **self._options_request(snapshot, context, merged=True)
+            )
+            
+            options = self._parse_options(json.loads(content))
+            return options, self._merged_general_advice(content)
+            
+        except Exception as e:
+            logger.error(f"Error generating merged advice: {e}")
+            return self._fallback_options(), FALLBACK_GENERAL_ADVICE
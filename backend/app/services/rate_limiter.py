@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Mapping, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+RateLimits = List[Tuple[int, float]]
+
+
+def parse_rate_limit_header(value: Optional[str]) -> RateLimits:
+    """Parse a Riot rate limit header such as ``"20:1,100:120"``.
+
+    Returns a list of ``(limit, window_seconds)`` pairs. Malformed entries
+    are ignored.
+    """
+    limits = []
+    if not value:
+        return limits
+
+    for part in value.split(","):
+        try:
+            limit, seconds = part.strip().split(":")
+            limits.append((int(limit), float(seconds)))
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit entry: {part!r}")
+
+    return limits
+
+
+class RateLimitWindow:
+    """Sliding window allowing at most ``limit`` requests per ``seconds``."""
+
+    def __init__(self, limit: int, seconds: float, margin: float = 0.0):
+        self.limit = limit
+        self.seconds = seconds
+        self.margin = margin
+        self._timestamps: Deque[float] = deque()
+
+    def _prune(self, now: float):
+        horizon = now - self.seconds - self.margin
+        while self._timestamps and self._timestamps[0] <= horizon:
+            self._timestamps.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one more request fits in the window."""
+        self._prune(now)
+        if len(self._timestamps) < self.limit:
+            return 0.0
+        return self._timestamps[0] + self.seconds + self.margin - now
+
+    def record(self, now: float):
+        self._timestamps.append(now)
+
+    def count(self, now: float) -> int:
+        """Requests recorded in the current window."""
+        self._prune(now)
+        return len(self._timestamps)
+
+
+class RateLimitBucket:
+    """A stack of windows that must all have capacity, e.g. 20/1s plus 100/2min."""
+
+    def __init__(self, limits: Optional[RateLimits] = None, margin: float = 0.0):
+        self.margin = margin
+        self.windows: List[RateLimitWindow] = []
+        self.blocked_until = 0.0
+        self.known = limits is not None
+        self.probing = False
+        self._unwindowed: List[float] = []
+        self.set_limits(limits or [])
+
+    @property
+    def limits(self) -> RateLimits:
+        return [(w.limit, w.seconds) for w in self.windows]
+
+    def set_limits(self, limits: RateLimits):
+        """Replace the windows, carrying every recorded request over to the new ones.
+
+        Every window records every request, so the longest history holds all
+        requests still inside any window; each new window starts from it and
+        prunes what falls outside its own duration on first use.
+        """
+        history = max((w._timestamps for w in self.windows), key=len, default=self._unwindowed)
+        windows = []
+        for limit, seconds in limits:
+            window = RateLimitWindow(limit, seconds, self.margin)
+            window._timestamps = deque(history)
+            windows.append(window)
+        self.windows = windows
+        if windows:
+            self._unwindowed = []
+
+    def wait_time(self, now: float) -> float:
+        wait = self.blocked_until - now
+        for window in self.windows:
+            wait = max(wait, window.wait_time(now))
+        return max(wait, 0.0)
+
+    def record(self, now: float):
+        if not self.known:
+            # Remember requests made before limits are known so they count
+            # against the windows once the limits arrive in a header
+            self._unwindowed.append(now)
+        for window in self.windows:
+            window.record(now)
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RiotRateLimiter:
+    """Application- and method-level rate limiter for one Riot routing host.
+
+    Every request must fit in the application bucket and in the bucket of
+    the method it calls. Limits start from the configured application limit
+    and are adjusted from the ``X-App-Rate-Limit``/``X-Method-Rate-Limit``
+    headers of each response. Until a method's limits have been learned,
+    only one probe request for that method is in flight at a time.
+    """
+
+    def __init__(self, app_limits: RateLimits, margin: float = 0.0):
+        self.margin = margin
+        self.app = RateLimitBucket(app_limits, margin)
+        self.methods: Dict[str, RateLimitBucket] = {}
+        self._lock = asyncio.Lock()
+        self._method_ready: Dict[str, asyncio.Event] = {}
+
+    def _method_bucket(self, method: str) -> RateLimitBucket:
+        bucket = self.methods.get(method)
+        if bucket is None:
+            bucket = RateLimitBucket(None, self.margin)
+            self.methods[method] = bucket
+            self._method_ready[method] = asyncio.Event()
+        return bucket
+
+    async def acquire(self, method: str):
+        """Wait until a request to ``method`` is allowed, then reserve it."""
+        while True:
+            bucket = self._method_bucket(method)
+            async with self._lock:
+                # Checked under the lock so that only one probe is ever recorded
+                probe_pending = not bucket.known and bucket.probing
+                if not probe_pending:
+                    now = time.monotonic()
+                    wait = max(self.app.wait_time(now), bucket.wait_time(now))
+                    if wait <= 0:
+                        self.app.record(now)
+                        bucket.record(now)
+                        if not bucket.known:
+                            bucket.probing = True
+                        return
+
+            if probe_pending:
+                await self._method_ready[method].wait()
+            else:
+                await asyncio.sleep(wait)
+
+    def update_from_headers(self, method: str, headers: Optional[Mapping[str, str]]):
+        """Adjust limits from a response's rate limit headers.
+
+        Must be called once per acquired request. Pass ``None`` if the
+        request failed before a response arrived so that a pending method
+        probe is released without marking the method's limits as known.
+        """
+        bucket = self._method_bucket(method)
+
+        if headers is not None:
+            app_limits = parse_rate_limit_header(headers.get("X-App-Rate-Limit"))
+            if app_limits and app_limits != self.app.limits:
+                logger.info(f"Application rate limit updated to {app_limits}")
+                self.app.set_limits(app_limits)
+
+            method_limits = parse_rate_limit_header(headers.get("X-Method-Rate-Limit"))
+            if method_limits and method_limits != bucket.limits:
+                logger.info(f"Method rate limit for {method} updated to {method_limits}")
+                bucket.set_limits(method_limits)
+
+            # A response without a method limit header means the method has none
+            bucket.known = True
+
+        bucket.probing = False
+        ready = self._method_ready[method]
+        ready.set()
+        ready.clear()
+
+    def on_rate_limited(
+        self,
+        method: str,
+        headers: Mapping[str, str],
+        default_retry_after: float = 1.0
+    ) -> float:
+        """Handle a 429 response and return how long to back off.
+
+        Application and method limits block every request sharing that
+        bucket until ``Retry-After`` has elapsed; service limits only back
+        off the failing request.
+        """
+        try:
+            retry_after = float(headers.get("Retry-After", default_retry_after))
+        except ValueError:
+            retry_after = default_retry_after
+
+        limit_type = headers.get("X-Rate-Limit-Type", "")
+        if limit_type == "application":
+            self.app.block_for(retry_after)
+        elif limit_type == "method":
+            self._method_bucket(method).block_for(retry_after)
+
+        logger.warning(
+            f"Rate limited on {method} ({limit_type or 'unknown'}); "
+            f"retrying after {retry_after:.1f}s"
+        )
+        return retry_after
@@ -2,16 +2,34 @@ import httpx
 import asyncio
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from pathlib import Path
 import logging
 
+from app.core import metrics
 from app.core.config import settings
 from app.models.schemas import MatchData
+from app.services.rate_limiter import RiotRateLimiter, parse_rate_limit_header
+from app.services.riot_replay import FixtureArchive, RecordingTransport, RiotStandIn
 
 logger = logging.getLogger(__name__)
 
 
 class RiotAPIClient:
-    """Client for interacting with Riot TFT API."""
+    """Client for interacting with Riot TFT API.
+    
+    One pooled ``httpx.AsyncClient`` is kept per routing host so that
+    keep-alive connections are reused across calls. Call ``aclose()`` on
+    shutdown to release them.
+    
+    Every request goes through a per-host ``RiotRateLimiter`` and 429
+    responses are retried after ``Retry-After``.
+    
+    ``transport`` replaces the network for every host, e.g. an
+    ``httpx.ASGITransport`` around a ``RiotStandIn``. Without one,
+    ``riot_fixture_mode`` can record responses to ``riot_fixture_path`` or
+    replay them from an in-process stand-in, and ``riot_api_base_url``
+    sends all requests to one host such as a localhost stand-in.
+    """
     
     BASE_URLS = {
         "americas": "https://americas.api.riotgames.com",
@@ -25,27 +43,157 @@ class RiotAPIClient:
         "kr": "https://kr.api.riotgames.com",
     }
     
-    def __init__(self, api_key: Optional[str] = None, region: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        region: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         self.api_key = api_key or settings.riot_api_key
         self.region = region or settings.riot_api_region
         self.base_url = self.BASE_URLS.get(self.region, self.BASE_URLS["americas"])
         self.headers = {"X-Riot-Token": self.api_key}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._rate_limiters: Dict[str, RiotRateLimiter] = {}
+        self.transport = transport
+        self._archive: Optional[FixtureArchive] = None
+        self._stand_in: Optional[RiotStandIn] = None
+    
+    def _fixture_transport(self, http2: bool, limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+        """Transport for ``riot_fixture_mode``, or None to use the network directly."""
+        mode = settings.riot_fixture_mode
+        if mode == "off":
+            return None
         
-    async def get_summoner_by_name(self, summoner_name: str, platform: str = "na1") -> Dict[str, Any]:
-        """Get summoner information by name."""
-        url = f"{self.PLATFORM_URLS[platform]}/tft/summoner/v1/summoners/by-name/{summoner_name}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
+        if self._archive is None:
+            self._archive = FixtureArchive(Path(settings.riot_fixture_path))
+        if mode == "record":
+            return RecordingTransport(self._archive, httpx.AsyncHTTPTransport(http2=http2, limits=limits))
+        
+        if self._stand_in is None:
+            self._stand_in = RiotStandIn(
+                self._archive,
+                latency=settings.riot_replay_latency,
+                app_rate_limit=settings.riot_app_rate_limit
+            )
+        return httpx.ASGITransport(app=self._stand_in)
+    
+    def _build_client(self, host_url: str) -> httpx.AsyncClient:
+        """Create a pooled client for a single routing host."""
+        http2 = settings.riot_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("riot_http2 is enabled but 'h2' is not installed; using HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.riot_http_max_connections,
+            max_keepalive_connections=settings.riot_http_max_keepalive_connections,
+            keepalive_expiry=settings.riot_http_keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            base_url=host_url,
+            headers=self.headers,
+            http2=http2,
+            limits=limits,
+            transport=self.transport or self._fixture_transport(http2, limits),
+            timeout=httpx.Timeout(
+                settings.riot_http_timeout,
+                connect=settings.riot_http_connect_timeout,
+            ),
+        )
+    
+    def _get_client(self, host_url: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the pooled client for a routing host."""
+        client = self._clients.get(host_url)
+        if client is None or client.is_closed:
+            client = self._build_client(host_url)
+            self._clients[host_url] = client
+        return client
+    
+    def _get_rate_limiter(self, host_url: str) -> RiotRateLimiter:
+        """Get (or lazily create) the rate limiter for a routing host."""
+        limiter = self._rate_limiters.get(host_url)
+        if limiter is None:
+            limiter = RiotRateLimiter(
+                parse_rate_limit_header(settings.riot_app_rate_limit),
+                margin=settings.riot_rate_limit_margin
+            )
+            self._rate_limiters[host_url] = limiter
+        return limiter
+    
+    async def _get(
+        self,
+        host_url: str,
+        path: str,
+        method: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Issue a rate-limited GET against a routing host and return the decoded JSON body."""
+        host_url = settings.riot_api_base_url or host_url
+        client = self._get_client(host_url)
+        limiter = self._get_rate_limiter(host_url)
+        
+        for attempt in range(settings.riot_max_retries + 1):
+            with metrics.RIOT_RATE_LIMIT_WAIT_SECONDS.time(method=method):
+                await limiter.acquire(method)
+            headers = None
+            try:
+                with metrics.RIOT_REQUEST_SECONDS.time(method=method):
+                    response = await client.get(path, params=params)
+                headers = response.headers
+            finally:
+                limiter.update_from_headers(method, headers)
+            
+            metrics.RIOT_REQUESTS.inc(method=method, status=response.status_code)
+            if response.status_code == 429:
+                metrics.RIOT_RATE_LIMITED.inc(
+                    method=method,
+                    type=response.headers.get("X-Rate-Limit-Type", "unknown")
+                )
+            
+            if response.status_code == 429 and attempt < settings.riot_max_retries:
+                retry_after = limiter.on_rate_limited(
+                    method,
+                    response.headers,
+                    default_retry_after=settings.riot_retry_after_default
+                )
+                await asyncio.sleep(retry_after)
+                continue
+            
             response.raise_for_status()
             return response.json()
     
+    async def aclose(self):
+        """Close all pooled connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+    
+    async def __aenter__(self) -> "RiotAPIClient":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+        
+    async def get_summoner_by_name(self, summoner_name: str, platform: str = "na1") -> Dict[str, Any]:
+        """Get summoner information by name."""
+        return await self._get(
+            self.PLATFORM_URLS[platform],
+            f"/tft/summoner/v1/summoners/by-name/{summoner_name}",
+            "summoner-v1.by-name"
+        )
+    
     async def get_summoner_by_puuid(self, puuid: str, platform: str = "na1") -> Dict[str, Any]:
         """Get summoner information by PUUID."""
-        url = f"{self.PLATFORM_URLS[platform]}/tft/summoner/v1/summoners/by-puuid/{puuid}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(
+            self.PLATFORM_URLS[platform],
+            f"/tft/summoner/v1/summoners/by-puuid/{puuid}",
+            "summoner-v1.by-puuid"
+        )
     
     async def get_match_ids_by_puuid(
         self, 
@@ -54,63 +202,54 @@ class RiotAPIClient:
         start: int = 0
     ) -> List[str]:
         """Get match IDs for a player."""
-        url = f"{self.base_url}/tft/match/v1/matches/by-puuid/{puuid}/ids"
         params = {"start": start, "count": count}
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(
+            self.base_url,
+            f"/tft/match/v1/matches/by-puuid/{puuid}/ids",
+            "match-v1.ids-by-puuid",
+            params=params
+        )
     
     async def get_match_details(self, match_id: str) -> MatchData:
         """Get detailed match information."""
-        url = f"{self.base_url}/tft/match/v1/matches/{match_id}"
+        data = await self._get(
+            self.base_url,
+            f"/tft/match/v1/matches/{match_id}",
+            "match-v1.match"
+        )
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            return MatchData(
-                match_id=data["metadata"]["match_id"],
-                game_datetime=data["info"]["game_datetime"],
-                game_length=data["info"]["game_length"],
-                tft_set_number=data["info"]["tft_set_number"],
-                participants=data["info"]["participants"]
-            )
+        return MatchData(
+            match_id=data["metadata"]["match_id"],
+            game_datetime=data["info"]["game_datetime"],
+            game_length=data["info"]["game_length"],
+            tft_set_number=data["info"]["tft_set_number"],
+            participants=data["info"]["participants"]
+        )
     
     async def get_challenger_players(self, platform: str = "na1") -> List[Dict[str, Any]]:
         """Get list of challenger players."""
-        url = f"{self.PLATFORM_URLS[platform]}/tft/league/v1/challenger"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("entries", [])
+        data = await self._get(
+            self.PLATFORM_URLS[platform],
+            "/tft/league/v1/challenger",
+            "league-v1.challenger"
+        )
+        return data.get("entries", [])
     
     async def get_grandmaster_players(self, platform: str = "na1") -> List[Dict[str, Any]]:
         """Get list of grandmaster players."""
-        url = f"{self.PLATFORM_URLS[platform]}/tft/league/v1/grandmaster"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("entries", [])
+        data = await self._get(
+            self.PLATFORM_URLS[platform],
+            "/tft/league/v1/grandmaster",
+            "league-v1.grandmaster"
+        )
+        return data.get("entries", [])
     
     async def get_master_players(self, platform: str = "na1") -> List[Dict[str, Any]]:
         """Get list of master players."""
-        url = f"{self.PLATFORM_URLS[platform]}/tft/league/v1/master"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("entries", [])
-    
-    async def rate_limit_safe_request(self, coro, delay: float = 1.2):
-        """Execute request with rate limiting."""
-        result = await coro
-        await asyncio.sleep(delay)
-        return result
+        data = await self._get(
+            self.PLATFORM_URLS[platform],
+            "/tft/league/v1/master",
+            "league-v1.master"
+        )
+        return data.get("entries", [])
+
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+import logging
+
+import httpx
+
+from app.services.rate_limiter import RateLimitWindow, parse_rate_limit_header
+
+logger = logging.getLogger(__name__)
+
+# Rate limit method names, matching the ones RiotAPIClient acquires
+ROUTES = [
+    (re.compile(r"^/tft/match/v1/matches/by-puuid/[^/]+/ids$"), "match-v1.ids-by-puuid"),
+    (re.compile(r"^/tft/match/v1/matches/[^/]+$"), "match-v1.match"),
+    (re.compile(r"^/tft/summoner/v1/summoners/by-name/"), "summoner-v1.by-name"),
+    (re.compile(r"^/tft/summoner/v1/summoners/by-puuid/"), "summoner-v1.by-puuid"),
+    (re.compile(r"^/tft/league/v1/(challenger|grandmaster|master)$"), "league-v1.{0}"),
+]
+
+NOT_FOUND_BODY = json.dumps({"status": {"message": "Data not found", "status_code": 404}})
+
+
+def route_method(path: str) -> str:
+    """Rate limit method of a Riot API path, or the path itself when unknown."""
+    for pattern, method in ROUTES:
+        match = pattern.match(path)
+        if match:
+            return method.format(*match.groups())
+    return path
+
+
+def _query(query: str) -> str:
+    return urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+
+
+class FixtureArchive:
+    """Recorded Riot API responses, stored as JSON lines.
+
+    Entries are keyed on host, path and (sorted) query string. Lookups
+    fall back to path and query alone, so an archive recorded against the
+    Riot hosts can be replayed from a stand-in on any host. Request
+    headers (and with them the API key) are never stored.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_path: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+            logger.info(f"Loaded {len(self._entries)} recorded responses from {self.path}")
+
+    @staticmethod
+    def key(host: str, path: str, query: str = "") -> Tuple[str, str]:
+        path_key = f"{path}?{_query(query)}"
+        return f"{host}{path_key}", path_key
+
+    def _index(self, entry: Dict[str, Any]):
+        self._entries[entry["key"]] = entry
+        self._by_path[entry["path_key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, host: str, path: str, query: str, status: int, body: str, content_type: str = "application/json"):
+        """Store a response, replacing any earlier one for the same request."""
+        key, path_key = self.key(host, path, query)
+        entry = {"key": key, "path_key": path_key, "status": status, "content_type": content_type, "body": body}
+        with self._lock:
+            self._index(entry)
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+
+    def add_json(self, host: str, path: str, data: Any, query: str = "", status: int = 200):
+        self.add(host, path, query, status, json.dumps(data))
+
+    def get(self, host: str, path: str, query: str = "") -> Optional[Dict[str, Any]]:
+        key, path_key = self.key(host, path, query)
+        return self._entries.get(key) or self._by_path.get(path_key)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport that passes requests through and records the responses.
+
+    429 responses are not recorded, since they describe the rate limit at
+    recording time rather than the resource.
+    """
+
+    def __init__(self, archive: FixtureArchive, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.archive = archive
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+
+        if response.status_code != 429:
+            # Archive the decoded body; the client still gets the raw bytes
+            decoded = httpx.Response(response.status_code, headers=response.headers, stream=httpx.ByteStream(raw))
+            decoded.read()
+            self.archive.add(
+                request.url.host,
+                request.url.path,
+                request.url.query.decode(),
+                response.status_code,
+                decoded.text,
+                response.headers.get("content-type", "application/json")
+            )
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=httpx.ByteStream(raw),
+            extensions=response.extensions,
+            request=request
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class RiotStandIn:
+    """ASGI stand-in for the Riot API that serves a ``FixtureArchive``.
+
+    Use it in-process through ``httpx.ASGITransport`` or serve it on
+    localhost with uvicorn (see ``app/utils/riot_stand_in.py``). Every
+    response carries ``X-App-Rate-Limit``/``X-Method-Rate-Limit`` headers
+    with their counts, requests beyond those limits get a 429 like the
+    real API, and ``throttle_probability`` injects extra service 429s.
+    ``latency`` (plus up to ``jitter``) is added to every response.
+    """
+
+    def __init__(
+        self,
+        archive: FixtureArchive,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_probability: float = 0.0,
+        retry_after: float = 1.0,
+        app_rate_limit: Optional[str] = "20:1,100:120",
+        method_rate_limit: Optional[str] = None,
+        seed: int = 0
+    ):
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_probability = throttle_probability
+        self.retry_after = retry_after
+        self.app_limits = parse_rate_limit_header(app_rate_limit)
+        self.method_limits = parse_rate_limit_header(method_rate_limit)
+        self.rng = random.Random(seed)
+        self._windows: Dict[Tuple[str, str], List[RateLimitWindow]] = {}
+        self.stats = {"requests": 0, "ok": 0, "not_found": 0, "throttled": 0, "rate_limited": 0}
+
+    def _bucket(self, host: str, scope: str, limits) -> List[RateLimitWindow]:
+        windows = self._windows.get((host, scope))
+        if windows is None:
+            windows = self._windows[(host, scope)] = [RateLimitWindow(limit, seconds) for limit, seconds in limits]
+        return windows
+
+    @staticmethod
+    def _header(windows: List[RateLimitWindow], now: float) -> Tuple[str, str]:
+        limits = ",".join(f"{w.limit}:{w.seconds:g}" for w in windows)
+        counts = ",".join(f"{w.count(now)}:{w.seconds:g}" for w in windows)
+        return limits, counts
+
+    def respond(self, host: str, path: str, query: str = "") -> Tuple[int, Dict[str, str], str]:
+        """Status, headers and body for one GET request."""
+        self.stats["requests"] += 1
+        now = time.monotonic()
+        method = route_method(path)
+        app_windows = self._bucket(host, "", self.app_limits)
+        method_windows = self._bucket(host, method, self.method_limits)
+
+        rejected_by = None
+        wait = 0.0
+        for limit_type, windows in (("application", app_windows), ("method", method_windows)):
+            wait = max((w.wait_time(now) for w in windows), default=0.0)
+            if wait > 0:
+                rejected_by = limit_type
+                break
+        if rejected_by is None:
+            # Rejected requests do not use up the windows
+            for window in app_windows + method_windows:
+                window.record(now)
+
+        headers = {"content-type": "application/json"}
+        for name, windows in (("App", app_windows), ("Method", method_windows)):
+            if windows:
+                headers[f"X-{name}-Rate-Limit"], headers[f"X-{name}-Rate-Limit-Count"] = self._header(windows, now)
+
+        if rejected_by is not None:
+            self.stats["rate_limited"] += 1
+            headers.update({"Retry-After": f"{wait:.3f}", "X-Rate-Limit-Type": rejected_by})
+            return 429, headers, ""
+
+        if self.throttle_probability and self.rng.random() < self.throttle_probability:
+            self.stats["throttled"] += 1
+            headers.update({"Retry-After": f"{self.retry_after:g}", "X-Rate-Limit-Type": "service"})
+            return 429, headers, ""
+
+        entry = self.archive.get(host, path, query)
+        if entry is None:
+            self.stats["not_found"] += 1
+            return 404, headers, NOT_FOUND_BODY
+
+        self.stats["ok"] += 1
+        headers["content-type"] = entry["content_type"]
+        return entry["status"], headers, entry["body"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+
+        request_headers = dict(scope["headers"])
+        host = request_headers.get(b"host", b"").decode().split(":")[0]
+        status, headers, body = self.respond(host, scope["path"], scope["query_string"].decode())
+
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        })
+        await send({"type": "http.response.body", "body": body.encode()})
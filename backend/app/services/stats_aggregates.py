@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Optional, Set
+import logging
+
+from app.core.config import settings
+from app.services.stats_engine import StatsAggregate
+
+logger = logging.getLogger(__name__)
+
+_PATCH_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class StatsAggregateStore:
+    """Persists one mergeable ``StatsAggregate`` per patch as gzipped JSON.
+
+    The IDs of the matches folded into each aggregate are kept in an
+    append-only ``{patch}.covered`` log next to it, so saving an update
+    only writes the matches it added.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.stats_aggregate_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, patch: str) -> Path:
+        if not _PATCH_PATTERN.match(patch):
+            raise ValueError(f"Invalid patch identifier: {patch!r}")
+        return self.root / f"{patch}.json.gz"
+
+    def _covered_path(self, patch: str) -> Path:
+        return self._path(patch).with_name(f"{patch}.covered")
+
+    def _append_covered(self, patch: str, match_ids: Iterable[str]):
+        with open(self._covered_path(patch), 'a') as f:
+            f.writelines(f"{match_id}\n" for match_id in match_ids)
+
+    def load(self, patch: str) -> StatsAggregate:
+        """Load the aggregate for a patch, or an empty one if none exists."""
+        path = self._path(patch)
+        if not path.exists():
+            return StatsAggregate(patch=patch)
+
+        with gzip.open(path, 'rt') as f:
+            data = json.load(f)
+
+        # Aggregates saved before the covered log kept their IDs inline
+        if "covered_ids" in data and not self._covered_path(patch).exists():
+            self._append_covered(patch, data["covered_ids"])
+        return StatsAggregate.from_dict(data)
+
+    def covered_ids(self, patch: str) -> Set[str]:
+        """IDs of every match folded into the saved aggregate for a patch."""
+        try:
+            with open(self._covered_path(patch), 'r') as f:
+                return {line.rstrip("\n") for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def save(self, aggregate: StatsAggregate):
+        """Atomically write the aggregate for its patch.
+
+        Covered IDs are logged first: a crash in between can leave matches
+        logged but not counted, never counted twice.
+        """
+        path = self._path(aggregate.patch)
+        self._append_covered(aggregate.patch, sorted(aggregate.covered_ids))
+        tmp_path = path.with_suffix(".tmp")
+
+        with gzip.open(tmp_path, 'wt') as f:
+            json.dump(aggregate.to_dict(), f)
+        os.replace(tmp_path, path)
+        logger.info(
+            f"Saved stats aggregate for patch {aggregate.patch} "
+            f"({aggregate.matches_seen} matches)"
+        )
+
+    def delete(self, patch: str):
+        self._path(patch).unlink(missing_ok=True)
+        self._covered_path(patch).unlink(missing_ok=True)
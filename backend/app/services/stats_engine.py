@@ -0,0 +1,432 @@
+import hashlib
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import logging
+
+import numpy as np
+
+from app.models.schemas import MatchData, CompStats, AugmentStats
+
+logger = logging.getLogger(__name__)
+
+COMP_MIN_SAMPLE_SIZE = 5
+AUGMENT_MIN_SAMPLE_SIZE = 10
+NUM_PLACEMENTS = 8
+
+Comp = Tuple[str, ...]
+MatchLike = Union[MatchData, Dict[str, Any]]
+
+
+def comp_id(comp: Comp) -> str:
+    """Deterministic ID of a composition, the same in every process."""
+    return hashlib.sha1("\x1f".join(sorted(comp)).encode()).hexdigest()[:10]
+
+
+def comp_name(comp: Comp) -> str:
+    """Display name for a composition."""
+    return f"Comp_{comp_id(comp)}"
+
+
+def _placement_summary(histogram: List[int]) -> Tuple[int, float, float, float]:
+    """Return sample size, average placement, top 4 rate and win rate."""
+    sample_size = sum(histogram)
+    total = sum((i + 1) * count for i, count in enumerate(histogram))
+    return (
+        sample_size,
+        total / sample_size,
+        sum(histogram[:4]) / sample_size,
+        histogram[0] / sample_size,
+    )
+
+
+@dataclass(slots=True)
+class CompAggregate:
+    """Placement histogram plus augment and item counters for one composition."""
+    placements: List[int] = field(default_factory=lambda: [0] * NUM_PLACEMENTS)
+    augments: Counter = field(default_factory=Counter)
+    items: Dict[str, Counter] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class AugmentAggregate:
+    """Placement histogram plus composition counter for one augment."""
+    placements: List[int] = field(default_factory=lambda: [0] * NUM_PLACEMENTS)
+    comps: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class StatsAggregate:
+    """Mergeable comp, augment and item aggregates for one patch.
+
+    Keys are kept in order of first appearance so that materialized stats
+    (including ``most_common`` tie-breaking) match a row-by-row computation.
+    ``covered_ids`` records every match folded in since the aggregate was
+    created or loaded, whatever its set, so a match is never counted twice;
+    ``StatsAggregateStore`` persists it as an append-only log rather than
+    with the aggregate. ``watermark`` is the number of match store positions
+    already folded in (see ``MatchStore.ids_since``), or None when unknown.
+    """
+    patch: str
+    matches_seen: int = 0
+    comps: Dict[Comp, CompAggregate] = field(default_factory=dict)
+    augments: Dict[str, AugmentAggregate] = field(default_factory=dict)
+    covered_ids: Set[str] = field(default_factory=set)
+    watermark: Optional[int] = 0
+
+    def merge(self, other: "StatsAggregate"):
+        """Fold another aggregate of the same patch into this one."""
+        if other.patch != self.patch:
+            raise ValueError(f"Cannot merge patch {other.patch} into {self.patch}")
+        if not self.covered_ids.isdisjoint(other.covered_ids):
+            raise ValueError("Cannot merge aggregates covering the same matches")
+
+        self.matches_seen += other.matches_seen
+        self.covered_ids |= other.covered_ids
+
+        for comp, data in other.comps.items():
+            target = self.comps.get(comp)
+            if target is None:
+                self.comps[comp] = data
+                continue
+            target.placements = [a + b for a, b in zip(target.placements, data.placements)]
+            target.augments.update(data.augments)
+            for champ, item_counter in data.items.items():
+                target.items.setdefault(champ, Counter()).update(item_counter)
+
+        for augment, data in other.augments.items():
+            target = self.augments.get(augment)
+            if target is None:
+                self.augments[augment] = data
+                continue
+            target.placements = [a + b for a, b in zip(target.placements, data.placements)]
+            target.comps.update(data.comps)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to JSON-compatible data, preserving key order."""
+        return {
+            "patch": self.patch,
+            "matches_seen": self.matches_seen,
+            "comps": [
+                {
+                    "comp": list(comp),
+                    "placements": data.placements,
+                    "augments": list(data.augments.items()),
+                    "items": [[champ, list(counter.items())] for champ, counter in data.items.items()],
+                }
+                for comp, data in self.comps.items()
+            ],
+            "augments": [
+                {
+                    "augment": augment,
+                    "placements": data.placements,
+                    "comps": [[list(comp), count] for comp, count in data.comps.items()],
+                }
+                for augment, data in self.augments.items()
+            ],
+            "watermark": self.watermark,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatsAggregate":
+        aggregate = cls(
+            patch=data["patch"],
+            matches_seen=data["matches_seen"],
+            # Aggregates saved before watermarks have none
+            watermark=data.get("watermark")
+        )
+        for entry in data["comps"]:
+            aggregate.comps[tuple(entry["comp"])] = CompAggregate(
+                placements=entry["placements"],
+                augments=Counter(dict(entry["augments"])),
+                items={champ: Counter(dict(counts)) for champ, counts in entry["items"]}
+            )
+        for entry in data["augments"]:
+            aggregate.augments[entry["augment"]] = AugmentAggregate(
+                placements=entry["placements"],
+                comps=Counter({tuple(comp): count for comp, count in entry["comps"]})
+            )
+        return aggregate
+
+    def comp_stats(self) -> List[CompStats]:
+        """Materialize composition statistics."""
+        stats = []
+        for comp, data in self.comps.items():
+            if sum(data.placements) < COMP_MIN_SAMPLE_SIZE:
+                continue
+
+            sample_size, avg_placement, top4_rate, win_rate = _placement_summary(data.placements)
+
+            stats.append(CompStats(
+                comp_name=comp_name(comp),
+                patch=self.patch,
+                champions=list(set(comp)),
+                avg_placement=avg_placement,
+                play_rate=sample_size / self.matches_seen,
+                top4_rate=top4_rate,
+                win_rate=win_rate,
+                sample_size=sample_size,
+                key_augments=[aug for aug, _ in data.augments.most_common(5)],
+                key_items={
+                    champ: [item for item, _ in item_counter.most_common(3)]
+                    for champ, item_counter in data.items.items()
+                }
+            ))
+
+        return sorted(stats, key=lambda x: x.avg_placement)
+
+    def augment_stats(self) -> List[AugmentStats]:
+        """Materialize augment statistics."""
+        total_picks = sum(sum(data.placements) for data in self.augments.values())
+        stats = []
+
+        for augment, data in self.augments.items():
+            if sum(data.placements) < AUGMENT_MIN_SAMPLE_SIZE:
+                continue
+
+            sample_size, avg_placement, top4_rate, win_rate = _placement_summary(data.placements)
+
+            stats.append(AugmentStats(
+                augment_name=augment,
+                patch=self.patch,
+                pick_rate=sample_size / total_picks if total_picks > 0 else 0,
+                avg_placement=avg_placement,
+                top4_rate=top4_rate,
+                win_rate=win_rate,
+                sample_size=sample_size,
+                synergistic_comps=[comp_name(comp) for comp, _ in data.comps.most_common(3)]
+            ))
+
+        return sorted(stats, key=lambda x: x.avg_placement)
+
+
+class StatsEngine:
+    """Single-pass stats engine over flattened participant arrays.
+
+    Matches, or column batches straight from the match store, are flattened
+    once into dictionary-encoded participant, augment and item rows; comp,
+    augment and item aggregates are then computed with grouped NumPy
+    reductions instead of per-key Python lists.
+    """
+
+    def aggregate(
+        self,
+        matches: Iterable[MatchLike],
+        patch: str,
+        skip_ids: Optional[Set[str]] = None
+    ) -> StatsAggregate:
+        """Aggregate matches of the patch's set. Accepts MatchData or raw dicts.
+
+        Matches whose ID is in ``skip_ids``, or that repeat within ``matches``,
+        are ignored.
+        """
+        covered_ids: Set[str] = set()
+        rows = self._match_rows(matches, patch.split(".")[0], skip_ids or set(), covered_ids)
+        return self._aggregate_rows(rows, patch, covered_ids)
+
+    def aggregate_columns(
+        self,
+        batches: Iterable[Dict[str, List[Any]]],
+        patch: str,
+        skip_ids: Optional[Set[str]] = None
+    ) -> StatsAggregate:
+        """Like ``aggregate``, over batches from ``MatchStore.scan_columns``."""
+        covered_ids: Set[str] = set()
+        rows = self._column_rows(batches, patch.split(".")[0], skip_ids or set(), covered_ids)
+        return self._aggregate_rows(rows, patch, covered_ids)
+
+    @staticmethod
+    def _match_rows(
+        matches: Iterable[MatchLike],
+        set_number: str,
+        skip_ids: Set[str],
+        covered_ids: Set[str]
+    ) -> Iterator[Tuple[Any, Any, Any]]:
+        """Yield ``(placement, units, augments)`` per participant, recording covered matches."""
+        for match in matches:
+            if isinstance(match, dict):
+                match_id, match_set, participants = (
+                    match["match_id"], match["tft_set_number"], match["participants"]
+                )
+            else:
+                match_id, match_set, participants = (
+                    match.match_id, match.tft_set_number, match.participants
+                )
+            if match_id in skip_ids or match_id in covered_ids:
+                continue
+            covered_ids.add(match_id)
+            if str(match_set) != set_number:
+                continue
+
+            for participant in participants:
+                yield participant.get("placement"), participant.get("units"), participant.get("augments")
+
+    @staticmethod
+    def _column_rows(
+        batches: Iterable[Dict[str, List[Any]]],
+        set_number: str,
+        skip_ids: Set[str],
+        covered_ids: Set[str]
+    ) -> Iterator[Tuple[Any, Any, Any]]:
+        """Yield ``(placement, units, augments)`` per participant of column batches."""
+        for batch in batches:
+            offsets, placements, units, augments = (
+                batch["offsets"], batch["placement"], batch["units"], batch["augments"]
+            )
+            for i, (match_id, match_set) in enumerate(zip(batch["match_id"], batch["tft_set_number"])):
+                if match_id in skip_ids or match_id in covered_ids:
+                    continue
+                covered_ids.add(match_id)
+                if str(match_set) != set_number:
+                    continue
+
+                start, end = offsets[i], offsets[i + 1]
+                yield from zip(placements[start:end], units[start:end], augments[start:end])
+
+    def _aggregate_rows(
+        self,
+        rows: Iterable[Tuple[Any, Any, Any]],
+        patch: str,
+        covered_ids: Set[str]
+    ) -> StatsAggregate:
+        """Encode participant rows and reduce them into an aggregate.
+
+        ``covered_ids`` is filled while ``rows`` is consumed; every covered
+        match counts as seen, whatever its set.
+        """
+        # Dictionary encoders: value -> dense code in first-seen order
+        comp_codes: Dict[Comp, int] = {}
+        augment_codes: Dict[str, int] = {}
+        champion_codes: Dict[str, int] = {}
+        item_codes: Dict[str, int] = {}
+
+        participant_comp = array('q')
+        participant_placement = array('q')
+        augment_participant = array('q')
+        augment_code = array('q')
+        item_comp = array('q')
+        item_champion = array('q')
+        item_code = array('q')
+
+        # Hot loop: bind lookups to locals
+        add_comp, add_placement = participant_comp.append, participant_placement.append
+        add_augment_row, add_augment = augment_participant.append, augment_code.append
+        add_item_comp, add_item_champion, add_item = item_comp.append, item_champion.append, item_code.append
+        encode_comp, encode_augment = comp_codes.setdefault, augment_codes.setdefault
+        encode_champion, encode_item = champion_codes.setdefault, item_codes.setdefault
+
+        # Flatten: one pass over the participant rows
+        for placement, units, augments in rows:
+            units = units or []
+            comp = encode_comp(
+                tuple(sorted([unit.get("character_id", "") for unit in units])),
+                len(comp_codes)
+            )
+            row = len(participant_comp)
+            add_comp(comp)
+            add_placement(8 if placement is None else placement)
+
+            for augment in augments or []:
+                add_augment_row(row)
+                add_augment(encode_augment(augment, len(augment_codes)))
+
+            # Last unit wins for duplicated champions, as in extract_items
+            items_map = {}
+            for unit in units:
+                champion = unit.get("character_id", "")
+                unit_items = unit.get("itemNames", [])
+                if champion and unit_items:
+                    items_map[champion] = unit_items
+            for champion, unit_items in items_map.items():
+                champion_code = encode_champion(champion, len(champion_codes))
+                for item in unit_items:
+                    add_item_comp(comp)
+                    add_item_champion(champion_code)
+                    add_item(encode_item(item, len(item_codes)))
+
+        aggregate = StatsAggregate(patch=patch, matches_seen=len(covered_ids), covered_ids=covered_ids)
+        if not participant_comp:
+            return aggregate
+
+        comp_values, augment_values = list(comp_codes), list(augment_codes)
+        champion_values, item_values = list(champion_codes), list(item_codes)
+        n_comps, n_augments = len(comp_values), len(augment_values)
+        n_champions, n_items = len(champion_values), len(item_values)
+
+        placement_bin = np.clip(np.frombuffer(participant_placement, dtype=np.int64) - 1, 0, NUM_PLACEMENTS - 1)
+        participant_comp_np = np.frombuffer(participant_comp, dtype=np.int64)
+
+        # Comp placement histograms
+        comp_hist = np.bincount(
+            participant_comp_np * NUM_PLACEMENTS + placement_bin,
+            minlength=n_comps * NUM_PLACEMENTS
+        ).reshape(n_comps, NUM_PLACEMENTS)
+        for code, comp in enumerate(comp_values):
+            aggregate.comps[comp] = CompAggregate(placements=comp_hist[code].tolist())
+
+        # Augment placement histograms and (comp, augment) co-occurrence
+        if augment_code:
+            augment_rows = np.frombuffer(augment_participant, dtype=np.int64)
+            augment_np = np.frombuffer(augment_code, dtype=np.int64)
+            augment_comp = participant_comp_np[augment_rows]
+
+            augment_hist = np.bincount(
+                augment_np * NUM_PLACEMENTS + placement_bin[augment_rows],
+                minlength=n_augments * NUM_PLACEMENTS
+            ).reshape(n_augments, NUM_PLACEMENTS)
+            for code, augment in enumerate(augment_values):
+                aggregate.augments[augment] = AugmentAggregate(placements=augment_hist[code].tolist())
+
+            pairs, first_seen, counts = np.unique(
+                augment_comp * n_augments + augment_np,
+                return_index=True,
+                return_counts=True
+            )
+            order = np.argsort(first_seen, kind="stable")
+            for pair, count in zip(pairs[order].tolist(), counts[order].tolist()):
+                comp, augment = comp_values[pair // n_augments], augment_values[pair % n_augments]
+                aggregate.comps[comp].augments[augment] = count
+                aggregate.augments[augment].comps[comp] = count
+
+        # Item counts per (comp, champion)
+        if item_code:
+            triples, first_seen, counts = np.unique(
+                (np.frombuffer(item_comp, dtype=np.int64) * n_champions
+                 + np.frombuffer(item_champion, dtype=np.int64)) * n_items
+                + np.frombuffer(item_code, dtype=np.int64),
+                return_index=True,
+                return_counts=True
+            )
+            order = np.argsort(first_seen, kind="stable")
+            for triple, count in zip(triples[order].tolist(), counts[order].tolist()):
+                comp_champion, item = divmod(triple, n_items)
+                comp, champion = divmod(comp_champion, n_champions)
+                comp_items = aggregate.comps[comp_values[comp]].items
+                comp_items.setdefault(champion_values[champion], Counter())[item_values[item]] = count
+
+        return aggregate
+
+    def fold(self, aggregate: StatsAggregate, matches: Iterable[MatchLike]) -> int:
+        """Fold matches not yet covered into an existing aggregate.
+
+        Returns the number of matches added.
+        """
+        update = self.aggregate(matches, aggregate.patch, skip_ids=aggregate.covered_ids)
+        aggregate.merge(update)
+        return update.matches_seen
+
+    def fold_columns(self, aggregate: StatsAggregate, batches: Iterable[Dict[str, List[Any]]]) -> int:
+        """Like ``fold``, over batches from ``MatchStore.scan_columns``."""
+        update = self.aggregate_columns(batches, aggregate.patch, skip_ids=aggregate.covered_ids)
+        aggregate.merge(update)
+        return update.matches_seen
+
+    def compute_stats(
+        self,
+        matches: Iterable[MatchLike],
+        patch: str
+    ) -> Tuple[List[CompStats], List[AugmentStats]]:
+        """Compute comp and augment statistics in a single pass."""
+        aggregate = self.aggregate(matches, patch)
+        return aggregate.comp_stats(), aggregate.augment_stats()
@@ -1,20 +1,79 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 import json
 from pathlib import Path
 import logging
 
+import numpy as np
+
+from app.core import metrics
 from app.core.config import settings
 from app.models.schemas import CompStats, AugmentStats
+from app.services.champion_index import ChampionIndex
+from app.services.embedding_cache import CachedEmbeddingFunction
+from app.services.playbook_chunker import Playbook, playbook_source, split_markdown
+
+if TYPE_CHECKING:
+    from chromadb.api.types import EmbeddingFunction
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+Embedding = Sequence[float]
+
+UPSERT_BATCH_SIZE = 256
+
+# Share of a composition's retrieval score that comes from exact board
+# overlap; the rest is semantic similarity to the query
+BOARD_OVERLAP_WEIGHT = 0.5
+
+
+def stable_key(*parts: str) -> str:
+    """Short deterministic key for an entity, stable across processes."""
+    return hashlib.sha1("\x1f".join(parts).encode()).hexdigest()[:16]
+
+
+def document_hash(document: str) -> str:
+    """Hash of a document's text, used to skip re-embedding unchanged documents."""
+    return hashlib.sha1(document.encode()).hexdigest()
+
+
+@dataclass
+class RetrievalResult:
+    """Results of one retrieval across all collections, with stage timings in ms."""
+    compositions: List[Dict[str, Any]]
+    augments: List[Dict[str, Any]]
+    playbooks: List[Dict[str, Any]]
+    timings: Dict[str, float] = field(default_factory=dict)
+
 
 class VectorStoreService:
-    """Service for managing vector database for RAG."""
+    """Service for managing vector database for RAG.
     
-    def __init__(self):
+    Chroma calls (and the embedding they trigger) are synchronous. Async
+    callers should use the ``a*`` variants, which run them on a dedicated,
+    bounded thread pool so the event loop is never blocked.
+    """
+    
+    def __init__(self, embedding_function: Optional["EmbeddingFunction"] = None):
+        # chromadb (and the embedding model it loads) is imported here rather
+        # than at module level so importing the app stays fast
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+        from chromadb.utils import embedding_functions
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.vector_store_threads,
+            thread_name_prefix="vector-store"
+        )
+
         self.persist_directory = Path(settings.chroma_persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
@@ -23,139 +82,415 @@ class VectorStoreService:
             settings=ChromaSettings(anonymized_telemetry=False)
         )
         
+        # All collections share one embedding function so a query embedded
+        # once can be used against every collection
+        embedding_function = embedding_function or embedding_functions.DefaultEmbeddingFunction()
+        if settings.embedding_cache_enabled:
+            # Unchanged documents and repeated queries skip model inference
+            embedding_function = CachedEmbeddingFunction(
+                embedding_function,
+                Path(settings.embedding_cache_path),
+                memory_size=settings.embedding_cache_memory_size
+            )
+        self.embedding_function = embedding_function
+        
         # Create collections
         self.comp_collection = self.client.get_or_create_collection(
             name="compositions",
-            metadata={"description": "Team composition statistics"}
+            metadata={"description": "Team composition statistics"},
+            embedding_function=self.embedding_function
         )
         
         self.augment_collection = self.client.get_or_create_collection(
             name="augments",
-            metadata={"description": "Augment statistics"}
+            metadata={"description": "Augment statistics"},
+            embedding_function=self.embedding_function
         )
         
         self.playbook_collection = self.client.get_or_create_collection(
             name="playbooks",
-            metadata={"description": "Strategic playbooks"}
+            metadata={"description": "Strategic playbooks"},
+            embedding_function=self.embedding_function
         )
-    
-    def add_comp_stats(self, comp_stats: List[CompStats]):
-        """Add composition statistics to vector store."""
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for i, comp in enumerate(comp_stats):
-            # Create a text representation for embedding
-            doc_text = (
-                f"Team composition: {', '.join(comp.champions)}. "
-                f"Patch {comp.patch}. "
-                f"Average placement: {comp.avg_placement:.2f}. "
-                f"Top 4 rate: {comp.top4_rate:.1%}. "
-                f"Win rate: {comp.win_rate:.1%}. "
-                f"Key augments: {', '.join(comp.key_augments)}. "
-                f"Sample size: {comp.sample_size} games."
-            )
-            
-            documents.append(doc_text)
-            metadatas.append({
-                "comp_name": comp.comp_name,
-                "patch": comp.patch,
-                "avg_placement": comp.avg_placement,
-                "top4_rate": comp.top4_rate,
-                "win_rate": comp.win_rate,
-                "champions": json.dumps(comp.champions),
-                "key_augments": json.dumps(comp.key_augments)
-            })
-            ids.append(f"comp_{comp.patch}_{i}")
         
-        if documents:
-            self.comp_collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            logger.info(f"Added {len(documents)} composition stats to vector store")
+        # Built from the stored composition metadata on first use and
+        # dropped whenever composition stats change
+        self._comp_index: Optional[ChampionIndex] = None
+        self._comp_index_lock = threading.Lock()
     
-    def add_augment_stats(self, augment_stats: List[AugmentStats]):
-        """Add augment statistics to vector store."""
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for i, augment in enumerate(augment_stats):
-            doc_text = (
-                f"Augment: {augment.augment_name}. "
-                f"Patch {augment.patch}. "
-                f"Pick rate: {augment.pick_rate:.1%}. "
-                f"Average placement: {augment.avg_placement:.2f}. "
-                f"Top 4 rate: {augment.top4_rate:.1%}. "
-                f"Win rate: {augment.win_rate:.1%}. "
-                f"Works well with: {', '.join(augment.synergistic_comps)}. "
-                f"Sample size: {augment.sample_size} games."
-            )
-            
-            documents.append(doc_text)
-            metadatas.append({
-                "augment_name": augment.augment_name,
-                "patch": augment.patch,
-                "pick_rate": augment.pick_rate,
-                "avg_placement": augment.avg_placement,
-                "top4_rate": augment.top4_rate,
-                "win_rate": augment.win_rate
-            })
-            ids.append(f"augment_{augment.patch}_{i}")
+    @staticmethod
+    def _comp_entry(comp: CompStats) -> Tuple[str, str, Dict[str, Any]]:
+        """Stable ID, document and metadata for a composition."""
+        # Create a text representation for embedding
+        doc_text = (
+            f"Team composition: {', '.join(comp.champions)}. "
+            f"Patch {comp.patch}. "
+            f"Average placement: {comp.avg_placement:.2f}. "
+            f"Top 4 rate: {comp.top4_rate:.1%}. "
+            f"Win rate: {comp.win_rate:.1%}. "
+            f"Key augments: {', '.join(comp.key_augments)}. "
+            f"Sample size: {comp.sample_size} games."
+        )
+        metadata = {
+            "comp_name": comp.comp_name,
+            "patch": comp.patch,
+            "avg_placement": comp.avg_placement,
+            "top4_rate": comp.top4_rate,
+            "win_rate": comp.win_rate,
+            "sample_size": comp.sample_size,
+            "champions": json.dumps(comp.champions),
+            "key_augments": json.dumps(comp.key_augments)
+        }
+        # champions is deduplicated, so comps differing only in repeated
+        # units are told apart by comp_name, which hashes the full comp
+        doc_id = f"comp_{comp.patch}_{stable_key(comp.comp_name, *sorted(comp.champions))}"
+        return doc_id, doc_text, metadata
+    
+    @staticmethod
+    def _augment_entry(augment: AugmentStats) -> Tuple[str, str, Dict[str, Any]]:
+        """Stable ID, document and metadata for an augment."""
+        doc_text = (
+            f"Augment: {augment.augment_name}. "
+            f"Patch {augment.patch}. "
+            f"Pick rate: {augment.pick_rate:.1%}. "
+            f"Average placement: {augment.avg_placement:.2f}. "
+            f"Top 4 rate: {augment.top4_rate:.1%}. "
+            f"Win rate: {augment.win_rate:.1%}. "
+            f"Works well with: {', '.join(augment.synergistic_comps)}. "
+            f"Sample size: {augment.sample_size} games."
+        )
+        metadata = {
+            "augment_name": augment.augment_name,
+            "patch": augment.patch,
+            "pick_rate": augment.pick_rate,
+            "avg_placement": augment.avg_placement,
+            "top4_rate": augment.top4_rate,
+            "win_rate": augment.win_rate,
+            "sample_size": augment.sample_size
+        }
+        doc_id = f"augment_{augment.patch}_{stable_key(augment.augment_name)}"
+        return doc_id, doc_text, metadata
+    
+    def _upsert_changed(
+        self,
+        collection,
+        entries: List[Tuple[str, str, Dict[str, Any]]],
+        stored: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        """Write only the entries that changed.
         
-        if documents:
-            self.augment_collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            logger.info(f"Added {len(documents)} augment stats to vector store")
+        Each entry's metadata gets a ``doc_hash`` of its text. Entries whose
+        text changed are upserted (and embedded) in batches; entries where
+        only the metadata changed get a metadata update without
+        re-embedding; the rest are skipped. ``stored`` maps already-fetched
+        IDs to their metadata. Returns the upserted/updated/unchanged counts.
+        """
+        unique = {doc_id: (doc_id, doc, metadata) for doc_id, doc, metadata in entries}
+        if len(unique) < len(entries):
+            logger.warning(f"{len(entries) - len(unique)} entries share a document ID; only the last of each is kept")
+        entries = list(unique.values())
+        if stored is None:
+            stored = self._stored_metadata(collection, ids=[doc_id for doc_id, _, _ in entries])
+        
+        ids, documents, metadatas = [], [], []
+        update_ids, update_metadatas = [], []
+        for doc_id, doc, metadata in entries:
+            metadata = dict(metadata, doc_hash=document_hash(doc))
+            previous = stored.get(doc_id)
+            if previous is None or previous.get("doc_hash") != metadata["doc_hash"]:
+                ids.append(doc_id)
+                documents.append(doc)
+                metadatas.append(metadata)
+            elif previous != metadata:
+                update_ids.append(doc_id)
+                update_metadatas.append(metadata)
+        
+        # Batched so each upsert embeds a bounded number of documents at once
+        for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+            end = start + UPSERT_BATCH_SIZE
+            collection.upsert(ids=ids[start:end], documents=documents[start:end], metadatas=metadatas[start:end])
+        if update_ids:
+            collection.update(ids=update_ids, metadatas=update_metadatas)
+        
+        return {
+            "upserted": len(ids),
+            "updated": len(update_ids),
+            "unchanged": len(entries) - len(ids) - len(update_ids)
+        }
     
-    def add_playbook(self, title: str, content: str, tags: List[str] = None):
-        """Add a strategic playbook to vector store."""
-        tags = tags or []
+    @staticmethod
+    def _stored_metadata(
+        collection,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        if ids is not None and not ids:
+            return {}
+        existing = collection.get(ids=ids, where=where, include=["metadatas"])
+        return {
+            doc_id: metadata or {}
+            for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+        }
+    
+    def _reindex(
+        self,
+        collection,
+        kind: str,
+        patch: str,
+        entries: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> Dict[str, int]:
+        """Make a patch's documents in ``collection`` match ``entries`` exactly."""
+        stored = self._stored_metadata(collection, where={"patch": patch})
+        changes = self._upsert_changed(collection, entries, stored)
         
-        self.playbook_collection.add(
-            documents=[content],
-            metadatas=[{
-                "title": title,
-                "tags": json.dumps(tags)
-            }],
-            ids=[f"playbook_{title.lower().replace(' ', '_')}"]
+        current = {doc_id for doc_id, _, _ in entries}
+        stale = [doc_id for doc_id in stored if doc_id not in current]
+        if stale:
+            collection.delete(ids=stale)
+        changes["deleted"] = len(stale)
+        
+        logger.info(
+            f"Reindexed {kind} for patch {patch}: "
+            + ", ".join(f"{count} {change}" for change, count in changes.items())
+        )
+        return changes
+    
+    def add_comp_stats(self, comp_stats: List[CompStats]):
+        """Add or update composition statistics in vector store."""
+        changes = self._upsert_changed(
+            self.comp_collection, [self._comp_entry(comp) for comp in comp_stats]
+        )
+        if changes["upserted"] or changes["updated"]:
+            self._comp_index = None
+        if changes["upserted"]:
+            logger.info(f"Added {changes['upserted']} composition stats to vector store")
+    
+    def add_augment_stats(self, augment_stats: List[AugmentStats]):
+        """Add or update augment statistics in vector store."""
+        changes = self._upsert_changed(
+            self.augment_collection, [self._augment_entry(augment) for augment in augment_stats]
+        )
+        if changes["upserted"]:
+            logger.info(f"Added {changes['upserted']} augment stats to vector store")
+    
+    def reindex_comp_stats(self, patch: str, comp_stats: List[CompStats]) -> Dict[str, int]:
+        """Replace a patch's composition stats, touching only changed documents."""
+        changes = self._reindex(
+            self.comp_collection, "compositions", patch,
+            [self._comp_entry(comp) for comp in comp_stats]
+        )
+        if changes["upserted"] or changes["updated"] or changes["deleted"]:
+            self._comp_index = None
+        return changes
+    
+    def reindex_augment_stats(self, patch: str, augment_stats: List[AugmentStats]) -> Dict[str, int]:
+        """Replace a patch's augment stats, touching only changed documents."""
+        return self._reindex(
+            self.augment_collection, "augments", patch,
+            [self._augment_entry(augment) for augment in augment_stats]
         )
+    
+    def add_playbook(self, title: str, content: str, tags: List[str] = None):
+        """Add or update a strategic playbook in vector store."""
+        self.add_playbooks([Playbook(playbook_source(title), title, content, tags or [])])
         logger.info(f"Added playbook: {title}")
     
+    def add_playbooks(self, playbooks: List[Playbook]) -> Dict[str, int]:
+        """Index playbooks as heading-level chunks.
+        
+        Chunks are upserted in batches and only when changed; chunks left
+        over from a previous, longer version of a playbook are deleted.
+        """
+        if not playbooks:
+            return {"upserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        
+        entries = []
+        for playbook in playbooks:
+            for chunk in split_markdown(playbook.content):
+                entries.append((
+                    f"playbook_{playbook.origin}_{playbook.source}_{chunk.index:03d}",
+                    chunk.text,
+                    {
+                        "source": playbook.source,
+                        "title": playbook.title,
+                        "section": chunk.section,
+                        "heading_path": " > ".join(chunk.heading_path),
+                        "chunk_index": chunk.index,
+                        "tags": json.dumps(playbook.tags),
+                        "content_hash": playbook.content_hash,
+                        "origin": playbook.origin
+                    }
+                ))
+        
+        # A file and an API playbook may share a source; only touch chunks of
+        # the same origin (untagged chunks predate origins and are replaced)
+        wanted = {(playbook.source, playbook.origin) for playbook in playbooks}
+        sources = [playbook.source for playbook in playbooks]
+        stored = {
+            doc_id: metadata
+            for doc_id, metadata in self._stored_metadata(
+                self.playbook_collection, where={"source": {"$in": sources}}
+            ).items()
+            if "origin" not in metadata or (metadata["source"], metadata["origin"]) in wanted
+        }
+        changes = self._upsert_changed(self.playbook_collection, entries, stored)
+        
+        current = {doc_id for doc_id, _, _ in entries}
+        stale = [doc_id for doc_id in stored if doc_id not in current]
+        # Whole-file documents written before playbooks were chunked
+        legacy_ids = [f"playbook_{playbook.title.lower().replace(' ', '_')}" for playbook in playbooks]
+        stale += [
+            doc_id for doc_id in self.playbook_collection.get(ids=legacy_ids, include=[])["ids"]
+            if doc_id not in current
+        ]
+        if stale:
+            self.playbook_collection.delete(ids=stale)
+        changes["deleted"] = len(stale)
+        return changes
+    
+    def playbook_hashes(self, origin: Optional[str] = None) -> Dict[str, str]:
+        """Content hash of every indexed playbook (or only those of ``origin``), by source."""
+        where = {"origin": origin} if origin else None
+        stored = self.playbook_collection.get(where=where, include=["metadatas"])
+        return {
+            metadata["source"]: metadata.get("content_hash", "")
+            for metadata in stored["metadatas"]
+            if metadata and "source" in metadata
+        }
+    
+    def remove_playbooks(self, sources: List[str], origin: str = "file") -> int:
+        """Delete every chunk of the given playbooks of ``origin``."""
+        if not sources:
+            return 0
+        where = {"$and": [{"source": {"$in": list(sources)}}, {"origin": origin}]}
+        ids = self.playbook_collection.get(where=where, include=[])["ids"]
+        if ids:
+            self.playbook_collection.delete(ids=ids)
+        return len(ids)
+    
+    def embed_query(self, query: str) -> Embedding:
+        """Embed a query with the collections' embedding function."""
+        return self.embedding_function([query])[0]
+    
+    @staticmethod
+    def _query_args(query: str, query_embedding: Optional[Embedding]) -> Dict[str, Any]:
+        if query_embedding is not None:
+            return {"query_embeddings": [list(query_embedding)]}
+        return {"query_texts": [query]}
+    
     def query_compositions(
         self, 
         query: str, 
         n_results: int = 5,
-        patch_filter: Optional[str] = None
+        patch_filter: Optional[str] = None,
+        query_embedding: Optional[Embedding] = None
     ) -> List[Dict[str, Any]]:
         """Query for relevant compositions."""
         where_filter = {"patch": patch_filter} if patch_filter else None
         
         results = self.comp_collection.query(
-            query_texts=[query],
+            **self._query_args(query, query_embedding),
             n_results=n_results,
             where=where_filter
         )
         
         return self._format_results(results)
     
+    def comp_index(self) -> ChampionIndex:
+        """Champion index over every stored composition, built on first use."""
+        with self._comp_index_lock:
+            if self._comp_index is None:
+                start = time.perf_counter()
+                stored = self._stored_metadata(self.comp_collection)
+                self._comp_index = ChampionIndex(
+                    (doc_id, json.loads(metadata.get("champions") or "[]"), metadata.get("patch"))
+                    for doc_id, metadata in stored.items()
+                )
+                logger.info(
+                    f"Built champion index of {len(self._comp_index)} compositions "
+                    f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+                )
+            return self._comp_index
+    
+    def query_compositions_by_board(
+        self,
+        board: Sequence[str],
+        n_results: int = 5,
+        patch_filter: Optional[str] = None,
+        query_embedding: Optional[Embedding] = None
+    ) -> List[Dict[str, Any]]:
+        """Compositions sharing the most units with ``board``, by exact Jaccard overlap.
+        
+        With ``query_embedding``, results also carry their distance to the
+        query so they can be ranked together with semantic results.
+        """
+        hits = self.comp_index().search(board, k=n_results, patch=patch_filter)
+        if not hits:
+            return []
+        
+        include = ["documents", "metadatas"]
+        if query_embedding is not None:
+            include.append("embeddings")
+        stored = self.comp_collection.get(ids=[doc_id for doc_id, _ in hits], include=include)
+        rows = {doc_id: i for i, doc_id in enumerate(stored["ids"])}
+        
+        if query_embedding is not None and stored["ids"]:
+            # Squared L2, the distance Chroma reports for the default space
+            diff = np.asarray(stored["embeddings"], dtype=np.float32) - np.asarray(query_embedding, dtype=np.float32)
+            distances = np.einsum("ij,ij->i", diff, diff)
+        else:
+            distances = None
+        
+        results = []
+        for doc_id, overlap in hits:
+            row = rows.get(doc_id)
+            if row is None:
+                continue
+            results.append({
+                "id": doc_id,
+                "document": stored["documents"][row],
+                "metadata": stored["metadatas"][row] or {},
+                "distance": float(distances[row]) if distances is not None else None,
+                "overlap": overlap
+            })
+        return results
+    
+    def _rerank_compositions(
+        self,
+        board: Sequence[str],
+        semantic: List[Dict[str, Any]],
+        exact: List[Dict[str, Any]],
+        n_results: int
+    ) -> List[Dict[str, Any]]:
+        """Merge semantic and board-overlap results, ranked on both signals."""
+        index = self._comp_index
+        overlaps = index.scores(board, (result["id"] for result in semantic)) if index else {}
+        
+        merged: Dict[str, Dict[str, Any]] = {}
+        for result in semantic:
+            merged[result["id"]] = {**result, "overlap": overlaps.get(result["id"], 0.0)}
+        for result in exact:
+            merged.setdefault(result["id"], result)
+        
+        def score(result: Dict[str, Any]) -> float:
+            distance = result.get("distance")
+            similarity = 1.0 / (1.0 + distance) if distance is not None else 0.0
+            return BOARD_OVERLAP_WEIGHT * result["overlap"] + (1 - BOARD_OVERLAP_WEIGHT) * similarity
+        
+        return sorted(merged.values(), key=score, reverse=True)[:n_results]
+    
     def query_augments(
         self, 
         query: str, 
         n_results: int = 5,
-        patch_filter: Optional[str] = None
+        patch_filter: Optional[str] = None,
+        query_embedding: Optional[Embedding] = None
     ) -> List[Dict[str, Any]]:
         """Query for relevant augments."""
         where_filter = {"patch": patch_filter} if patch_filter else None
         
         results = self.augment_collection.query(
-            query_texts=[query],
+            **self._query_args(query, query_embedding),
             n_results=n_results,
             where=where_filter
         )
@@ -165,16 +500,107 @@ class VectorStoreService:
     def query_playbooks(
         self, 
         query: str, 
-        n_results: int = 3
+        n_results: int = 3,
+        query_embedding: Optional[Embedding] = None
     ) -> List[Dict[str, Any]]:
         """Query for relevant playbooks."""
         results = self.playbook_collection.query(
-            query_texts=[query],
+            **self._query_args(query, query_embedding),
             n_results=n_results
         )
         
         return self._format_results(results)
     
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking vector store call on the dedicated thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+    
+    async def aquery_compositions(
+        self,
+        query: str,
+        n_results: int = 5,
+        patch_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.run(self.query_compositions, query, n_results, patch_filter)
+    
+    async def aquery_augments(
+        self,
+        query: str,
+        n_results: int = 5,
+        patch_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.run(self.query_augments, query, n_results, patch_filter)
+    
+    async def aquery_playbooks(self, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
+        return await self.run(self.query_playbooks, query, n_results)
+    
+    async def _timed(self, timings: Dict[str, float], stage: str, fn: Callable[..., T], *args, **kwargs) -> T:
+        start = time.perf_counter()
+        result = await self.run(fn, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        timings[stage] = elapsed * 1000
+        metrics.VECTOR_STORE_SECONDS.observe(elapsed, operation=stage)
+        return result
+    
+    async def aretrieve(
+        self,
+        query: str,
+        n_compositions: int = 5,
+        n_augments: int = 5,
+        n_playbooks: int = 3,
+        patch_filter: Optional[str] = None,
+        board: Optional[Sequence[str]] = None
+    ) -> RetrievalResult:
+        """Embed ``query`` once and look it up in all three collections concurrently.
+        
+        With ``board``, compositions sharing its units are also looked up in
+        the champion index, and both sets are reranked on board overlap and
+        similarity together.
+        """
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        
+        embedding = await self._timed(timings, "embed", self.embed_query, query)
+        board_lookup = None
+        if board:
+            board_lookup = asyncio.ensure_future(self._timed(
+                timings, "board_index", self.query_compositions_by_board,
+                board, n_compositions, patch_filter, query_embedding=embedding
+            ))
+        compositions, augments, playbooks = await asyncio.gather(
+            self._timed(
+                timings, "compositions", self.query_compositions,
+                query, n_compositions, patch_filter, query_embedding=embedding
+            ),
+            self._timed(
+                timings, "augments", self.query_augments,
+                query, n_augments, patch_filter, query_embedding=embedding
+            ),
+            self._timed(
+                timings, "playbooks", self.query_playbooks,
+                query, n_playbooks, query_embedding=embedding
+            )
+        )
+        if board_lookup is not None:
+            compositions = self._rerank_compositions(
+                board, compositions, await board_lookup, n_compositions
+            )
+        elapsed = time.perf_counter() - start
+        timings["total"] = elapsed * 1000
+        metrics.VECTOR_STORE_SECONDS.observe(elapsed, operation="retrieve")
+        
+        logger.info(
+            "Retrieval timings: " + ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in timings.items())
+        )
+        return RetrievalResult(compositions, augments, playbooks, timings)
+    
+    def close(self):
+        """Stop the thread pool and close the embedding cache."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if isinstance(self.embedding_function, CachedEmbeddingFunction):
+            self.embedding_function.close()
+    
     def _format_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Format ChromaDB results into a list of dictionaries."""
         formatted = []
@@ -182,12 +608,14 @@ class VectorStoreService:
         if not results or not results.get("documents"):
             return formatted
         
+        ids = results["ids"][0]
         documents = results["documents"][0]
         metadatas = results["metadatas"][0]
         distances = results.get("distances", [[]])[0]
         
         for i, doc in enumerate(documents):
             formatted.append({
+                "id": ids[i],
                 "document": doc,
                 "metadata": metadatas[i] if i < len(metadatas) else {},
                 "distance": distances[i] if i < len(distances) else None
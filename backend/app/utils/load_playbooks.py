@@ -1,39 +1,82 @@
 #!/usr/bin/env python3
 """
 Utility script to initialize the TFT Strategic Advisor with playbooks.
+
+Playbooks are indexed as heading-level chunks. Files whose content hash
+matches what is already indexed are skipped, and playbooks whose file was
+removed are deleted from the index. Only playbooks loaded from files are
+ever deleted; those added through the API are left alone.
 """
 
 import asyncio
 import sys
 from pathlib import Path
+from typing import Dict, Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app.services.playbook_chunker import Playbook
 from app.services.vector_store import VectorStoreService
 
+PLAYBOOKS_DIR = Path(__file__).parent.parent / "data" / "playbooks"
+
 
-async def load_playbooks():
-    """Load all playbooks from the playbooks directory."""
-    vector_store = VectorStoreService()
-    playbooks_dir = Path(__file__).parent.parent / "data" / "playbooks"
-    
+async def load_playbooks(
+    playbooks_dir: Path = PLAYBOOKS_DIR,
+    vector_store: Optional[VectorStoreService] = None
+) -> Dict[str, int]:
+    """Load new or changed playbooks from the playbooks directory."""
     if not playbooks_dir.exists():
         print(f"Playbooks directory not found: {playbooks_dir}")
-        return
-    
-    for playbook_file in playbooks_dir.glob("*.md"):
-        print(f"Loading playbook: {playbook_file.name}")
-        
+        return {}
+
+    owned = vector_store is None
+    vector_store = vector_store or VectorStoreService()
+    try:
+        return _load_playbooks(playbooks_dir, vector_store)
+    finally:
+        if owned:
+            vector_store.close()
+
+
+def _load_playbooks(playbooks_dir: Path, vector_store: VectorStoreService) -> Dict[str, int]:
+    indexed = vector_store.playbook_hashes(origin="file")
+    changed = []
+    found = set()
+
+    for playbook_file in sorted(playbooks_dir.glob("*.md")):
         with open(playbook_file, 'r') as f:
             content = f.read()
-        
-        title = playbook_file.stem.replace('_', ' ').title()
-        vector_store.add_playbook(title, content, tags=[playbook_file.stem])
-        
-        print(f"  ✓ Loaded: {title}")
-    
-    print("\nPlaybooks loaded successfully!")
+
+        playbook = Playbook(
+            source=playbook_file.stem,
+            title=playbook_file.stem.replace('_', ' ').title(),
+            content=content,
+            tags=[playbook_file.stem],
+            origin="file"
+        )
+        found.add(playbook.source)
+
+        if indexed.get(playbook.source) == playbook.content_hash:
+            print(f"  - Unchanged: {playbook.title}")
+            continue
+
+        changed.append(playbook)
+        print(f"  ✓ Loading: {playbook.title}")
+
+    result = vector_store.add_playbooks(changed)
+    removed = [source for source in indexed if source not in found]
+    result["removed_chunks"] = vector_store.remove_playbooks(removed, origin="file")
+    for source in removed:
+        print(f"  ✗ Removed: {source}")
+
+    print(
+        f"\nPlaybooks loaded successfully! {len(changed)} changed, "
+        f"{len(found) - len(changed)} unchanged, {len(removed)} removed "
+        f"({result.get('upserted', 0)} chunks embedded)"
+    )
+    return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Migrate the legacy one-JSON-file-per-match cache into the segment match store.
+
+Usage:
+    python app/utils/migrate_match_cache.py [--source DIR] [--target DIR] [--delete]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.core.config import settings
+from app.services.match_store import JsonMatchStore, SegmentMatchStore
+
+
+def migrate_match_cache(source: Path, target: Path, delete: bool = False):
+    """Copy every cached JSON match into a segment store."""
+    legacy = JsonMatchStore(source)
+    store = SegmentMatchStore(target)
+
+    print(f"Migrating matches from {source} to {target}...")
+
+    migrated = 0
+    skipped = 0
+    try:
+        for match in legacy.scan():
+            if match.match_id in store:
+                skipped += 1
+                continue
+
+            store.put(match)
+            migrated += 1
+            if migrated % 1000 == 0:
+                print(f"  ... {migrated} matches migrated")
+    finally:
+        store.close()
+
+    print(f"  ✓ Migrated {migrated} matches ({skipped} already present)")
+
+    if delete:
+        for path in source.glob("*.json"):
+            path.unlink()
+        print(f"  ✓ Removed legacy JSON files from {source}")
+
+    print("\n✅ Migration complete!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the JSON match cache to the segment store")
+    parser.add_argument("--source", default=settings.match_data_cache_dir, help="Legacy JSON cache directory")
+    parser.add_argument("--target", default=settings.match_store_dir, help="Segment store directory")
+    parser.add_argument("--delete", action="store_true", help="Delete JSON files after migrating")
+    args = parser.parse_args()
+
+    migrate_match_cache(Path(args.source), Path(args.target), delete=args.delete)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Serve recorded Riot API responses from a localhost stand-in server.
+
+Usage:
+    python app/utils/riot_stand_in.py [--archive FILE] [--port 8100] [--latency 0.05] [--throttle 0.02]
+
+Point the backend at it with RIOT_API_BASE_URL=http://127.0.0.1:8100.
+Record an archive first with RIOT_FIXTURE_MODE=record.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.core.config import settings
+from app.services.riot_replay import FixtureArchive, RiotStandIn
+
+
+def serve(archive_path: Path, host: str, port: int, **options):
+    """Run the stand-in until interrupted."""
+    import uvicorn
+
+    archive = FixtureArchive(archive_path)
+    if not len(archive):
+        print(f"Warning: no recorded responses in {archive_path}; every request will get a 404")
+
+    print(f"Serving {len(archive)} recorded responses on http://{host}:{port}")
+    uvicorn.run(RiotStandIn(archive, **options), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded Riot API responses on localhost")
+    parser.add_argument("--archive", default=settings.riot_fixture_path, help="Recorded responses (JSON lines)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Probability of an injected 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of injected 429s")
+    parser.add_argument("--app-rate-limit", default=settings.riot_app_rate_limit, help="Enforced application limit")
+    parser.add_argument("--method-rate-limit", default=None, help="Enforced limit per method")
+    args = parser.parse_args()
+
+    serve(
+        Path(args.archive),
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_probability=args.throttle,
+        retry_after=args.retry_after,
+        app_rate_limit=args.app_rate_limit,
+        method_rate_limit=args.method_rate_limit
+    )
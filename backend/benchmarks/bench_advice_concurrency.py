@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Throughput of concurrent advice requests with blocking vs off-loop I/O.
+
+    python -m benchmarks.bench_advice_concurrency --requests 50 --llm-latency 0.2
+
+"blocking" runs the Chroma queries and LLM calls on the event loop, as the
+synchronous clients used to; "async" uses the vector store's thread pool and
+a non-blocking LLM client. Latencies are injected by the fakes.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.rag_service import RAGService
+from benchmarks.fakes import FakeChatClient, FakeVectorStore, make_snapshot
+
+
+class InlineVectorStore(FakeVectorStore):
+    """Runs queries directly on the calling thread, blocking the loop."""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+async def run_mode(mode: str, n_requests: int, query_latency: float, llm_latency: float, threads: int):
+    blocking = mode == "blocking"
+    store_cls = InlineVectorStore if blocking else FakeVectorStore
+    vector_store = store_cls(query_latency=query_latency, threads=threads)
+    rag = RAGService(vector_store, FakeChatClient(llm_latency, blocking=blocking))
+    snapshot = make_snapshot()
+
+    async def timed():
+        start = time.perf_counter()
+        await rag.generate_advice(snapshot)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    vector_store.close()
+
+    print(
+        f"  {mode:>8}: {elapsed:6.2f}s total  {n_requests / elapsed:6.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.0f}ms  max {max(latencies) * 1000:7.0f}ms"
+    )
+
+
+async def main(n_requests: int, query_latency: float, llm_latency: float, threads: int):
+    print(
+        f"{n_requests} concurrent requests, {query_latency * 1000:.0f}ms per query, "
+        f"{llm_latency * 1000:.0f}ms per LLM call, {threads} vector store threads"
+    )
+    for mode in ("blocking", "async"):
+        await run_mode(mode, n_requests, query_latency, llm_latency, threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--query-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.query_latency, args.llm_latency, args.threads))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Advice latency per LLM generation mode (sequential, concurrent, merged).
+
+    python -m benchmarks.bench_advice_generation --requests 20 --llm-latency 0.5
+
+Retrieval and completions are faked with fixed latencies; each request is
+timed on its own so the numbers reflect per-request latency, not throughput.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.rag_service import RAGService
+from benchmarks.fakes import FakeChatClient, FakeVectorStore, make_snapshot
+
+MODES = ("sequential", "concurrent", "merged")
+
+
+async def run_mode(mode: str, n_requests: int, query_latency: float, llm_latency: float):
+    settings.advice_generation_mode = mode
+    vector_store = FakeVectorStore(query_latency=query_latency)
+    llm = FakeChatClient(llm_latency)
+    rag = RAGService(vector_store, llm)
+    snapshot = make_snapshot()
+
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        await rag.generate_advice(snapshot)
+        latencies.append(time.perf_counter() - start)
+    vector_store.close()
+
+    print(
+        f"  {mode:>10}: p50 {statistics.median(latencies) * 1000:6.0f}ms  "
+        f"max {max(latencies) * 1000:6.0f}ms  {llm.calls / n_requests:.0f} LLM calls/request"
+    )
+
+
+async def main(n_requests: int, query_latency: float, llm_latency: float):
+    print(f"{n_requests} requests, {llm_latency * 1000:.0f}ms per LLM call")
+    for mode in MODES:
+        await run_mode(mode, n_requests, query_latency, llm_latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--query-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.query_latency, args.llm_latency))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Board-overlap comp lookup: champion index vs a Python set scan.
+
+    python -m benchmarks.bench_champion_index --comps 100000 --queries 200
+
+Comps and boards come from the synthetic match generator, so most boards
+share units with a large share of the comps, which is the expensive case
+for the index.
+"""
+
+import argparse
+import statistics
+import time
+
+from app.services.champion_index import ChampionIndex, champion_key
+from benchmarks.synthetic import SyntheticMatchGenerator
+
+
+def scan(comps, board, k):
+    """Reference lookup: Jaccard against every comp's champion set."""
+    board_keys = {champion_key(champion) for champion in board}
+    scored = []
+    for i, (_, champions) in enumerate(comps):
+        shared = len(board_keys & champions)
+        if shared:
+            scored.append((-shared / len(board_keys | champions), i))
+    scored.sort()
+    return [comps[i][0] for _, i in scored[:k]]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main(n_comps: int, n_queries: int, k: int, skip_scan: bool):
+    generator = SyntheticMatchGenerator(seed=0)
+    entries = [(f"comp_{i}", generator.random_board(), "12") for i in range(n_comps)]
+    boards = [generator.random_board()[:generator.rng.randint(3, 8)] for _ in range(n_queries)]
+
+    start = time.perf_counter()
+    index = ChampionIndex(entries)
+    print(f"{n_comps} comps indexed in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    search_times = []
+    for board in boards:
+        start = time.perf_counter()
+        hits = index.search(board, k=k)
+        search_times.append(time.perf_counter() - start)
+    p50, p95 = percentiles(search_times)
+    print(f"  index search:   p50 {p50 * 1e6:9.0f}us  p95 {p95 * 1e6:9.0f}us")
+
+    rerank_keys = [key for key, _, _ in entries[:20]]
+    rerank_times = []
+    for board in boards:
+        start = time.perf_counter()
+        index.scores(board, rerank_keys)
+        rerank_times.append(time.perf_counter() - start)
+    p50, p95 = percentiles(rerank_times)
+    print(f"  rerank 20 keys: p50 {p50 * 1e6:9.0f}us  p95 {p95 * 1e6:9.0f}us")
+
+    if skip_scan:
+        return
+
+    comps = [(key, {champion_key(champion) for champion in champions}) for key, champions, _ in entries]
+    scan_times = []
+    for board in boards[:max(1, n_queries // 10)]:
+        start = time.perf_counter()
+        expected = scan(comps, board, k)
+        scan_times.append(time.perf_counter() - start)
+        assert [key for key, _ in index.search(board, k=k)] == expected
+    p50, p95 = percentiles(scan_times)
+    print(f"  set scan:       p50 {p50 * 1e6:9.0f}us  p95 {p95 * 1e6:9.0f}us  (results match)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--comps", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--skip-scan", action="store_true")
+    args = parser.parse_args()
+    main(args.comps, args.queries, args.k, args.skip_scan)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingestion throughput, retries and rate limiting against a Riot API stand-in.
+
+    python -m benchmarks.bench_ingestion_replay --players 50 --matches-per-player 20
+    python -m benchmarks.bench_ingestion_replay --latency 0.05 --throttle 0.05 --server
+
+Runs ``DataIngestionService.crawl_high_elo_matches`` against a
+``RiotStandIn`` serving a synthetic archive (or a recorded one with
+``--archive``), in-process through ``httpx.ASGITransport`` or, with
+``--server``, over localhost through uvicorn. Nothing touches the network
+or needs an API key. ``--write-archive`` saves the synthetic archive so it
+can be served with ``app/utils/riot_stand_in.py``.
+"""
+
+import argparse
+import asyncio
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import uvicorn
+
+from app.core.config import settings
+from app.services.data_ingestion import DataIngestionService
+from app.services.riot_client import RiotAPIClient
+from app.services.riot_replay import FixtureArchive, RiotStandIn
+from benchmarks.synthetic import SyntheticMatchGenerator
+
+PLATFORM = "na1"
+
+
+def build_riot_archive(
+    players: int,
+    matches_per_player: int,
+    seed: int = 0,
+    path: Optional[Path] = None
+) -> FixtureArchive:
+    """Archive of league, summoner, match-id and match responses for a synthetic crawl.
+
+    Each player's history shares half of its matches with the previous
+    player, like high ELO players meeting in the same lobbies.
+    """
+    if path is not None and path.exists():
+        path.unlink()
+    archive = FixtureArchive(path)
+    platform_host = httpx.URL(RiotAPIClient.PLATFORM_URLS[PLATFORM]).host
+    regional_host = httpx.URL(RiotAPIClient.BASE_URLS[settings.riot_api_region]).host
+
+    generator = SyntheticMatchGenerator(seed=seed)
+    stride = max(1, matches_per_player // 2)
+    matches = generator.generate(stride * (players - 1) + matches_per_player)
+    for match in matches:
+        archive.add_json(regional_host, f"/tft/match/v1/matches/{match.match_id}", {
+            "metadata": {
+                "match_id": match.match_id,
+                "participants": [participant["puuid"] for participant in match.participants],
+            },
+            "info": {
+                "game_datetime": match.game_datetime,
+                "game_length": match.game_length,
+                "tft_set_number": match.tft_set_number,
+                "participants": match.participants,
+            },
+        })
+
+    entries = []
+    for i in range(players):
+        summoner_id = f"summoner-{seed}-{i}"
+        puuid = f"puuid-{seed}-{i}"
+        entries.append({"summonerId": summoner_id, "leaguePoints": 1000 - i})
+        archive.add_json(platform_host, f"/tft/summoner/v1/summoners/by-puuid/{summoner_id}", {
+            "id": summoner_id,
+            "puuid": puuid,
+        })
+        history = [match.match_id for match in matches[i * stride:i * stride + matches_per_player]]
+        archive.add_json(
+            regional_host,
+            f"/tft/match/v1/matches/by-puuid/{puuid}/ids",
+            history,
+            query=f"start=0&count={matches_per_player}"
+        )
+
+    tiers = {"challenger": entries[:len(entries) // 3], "grandmaster": entries[len(entries) // 3:], "master": []}
+    for tier, tier_entries in tiers.items():
+        archive.add_json(platform_host, f"/tft/league/v1/{tier}", {"tier": tier.upper(), "entries": tier_entries})
+    return archive
+
+
+def start_server(stand_in: RiotStandIn) -> str:
+    """Serve the stand-in on a free localhost port and return its URL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    server = uvicorn.Server(uvicorn.Config(stand_in, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run(args, archive: FixtureArchive, workdir: Path):
+    stand_in = RiotStandIn(
+        archive,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_probability=args.throttle,
+        retry_after=args.retry_after,
+        app_rate_limit=args.app_rate_limit,
+        method_rate_limit=args.method_rate_limit
+    )
+    settings.riot_app_rate_limit = args.app_rate_limit
+    settings.riot_retry_after_default = args.retry_after
+    settings.match_store_dir = str(workdir / "matches")
+    settings.ingestion_match_concurrency = args.concurrency
+
+    transport = None
+    if args.server:
+        settings.riot_api_base_url = start_server(stand_in)
+        print(f"Stand-in at {settings.riot_api_base_url}")
+    else:
+        transport = httpx.ASGITransport(app=stand_in)
+
+    client = RiotAPIClient(api_key="bench", transport=transport)
+    ingestion = DataIngestionService(riot_client=client)
+    try:
+        start = time.perf_counter()
+        matches, saved = await ingestion.crawl_high_elo_matches(
+            PLATFORM,
+            matches_per_player=args.matches_per_player,
+            max_players=args.players
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.aclose()
+        ingestion.close()
+
+    stats = stand_in.stats
+    print(f"  {len(matches)} unique matches in {elapsed:.2f}s ({len(matches) / elapsed:.1f} matches/s)")
+    print(f"  {stats['requests']} requests ({stats['requests'] / elapsed:.1f} req/s), "
+          f"{saved} fetches saved by dedup")
+    print(f"  retries: {stats['throttled']} injected 429s, {stats['rate_limited']} over the enforced limit; "
+          f"{stats['not_found']} not found")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--matches-per-player", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=settings.ingestion_match_concurrency)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--archive", type=Path, help="replay a recorded archive instead of a synthetic one")
+    parser.add_argument("--write-archive", type=Path, help="save the synthetic archive here")
+    parser.add_argument("--server", action="store_true", help="serve the stand-in on localhost instead of in-process")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle", type=float, default=0.0, help="probability of an injected 429")
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--app-rate-limit", default="500:1,30000:600", help="limit enforced by the stand-in")
+    parser.add_argument("--method-rate-limit", default=None)
+    args = parser.parse_args()
+
+    if args.archive:
+        archive = FixtureArchive(args.archive)
+    else:
+        archive = build_riot_archive(args.players, args.matches_per_player, args.seed, args.write_archive)
+    print(f"{len(archive)} responses, {args.players} players x {args.matches_per_player} matches")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(args, archive, Path(tmp)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Peak memory of compute-stats: load-everything vs streaming batches.
+
+Writes synthetic corpora of increasing size to a temporary segment store and
+measures peak traced memory (tracemalloc) for
+  * the old path: build a full List[MatchData], then compute stats;
+  * the streaming path: fold column batches into a StatsAggregate.
+
+For the streaming path the memory retained by the aggregate itself (which
+grows with the number of distinct comps/augments, not with raw match data)
+is reported separately; the working set on top of it should stay flat.
+
+    python -m benchmarks.bench_memory --sizes 1000 4000 16000
+"""
+
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from app.models.schemas import MatchData
+from app.services.match_store import SegmentMatchStore
+from app.services.stats_engine import StatsAggregate, StatsEngine
+from benchmarks import legacy_stats
+from benchmarks.synthetic import SyntheticMatchGenerator
+
+PATCH = "12.1"
+
+
+def traced_mib(fn):
+    """Run ``fn`` and return (peak MiB, MiB still held by its result)."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+        return peak / 2 ** 20, current / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def load_everything(store: SegmentMatchStore):
+    matches = [MatchData(**data) for data in store.scan_raw()]
+    legacy_stats.compute_comp_stats(matches, PATCH)
+    legacy_stats.compute_augment_stats(matches, PATCH)
+
+
+def streaming(store: SegmentMatchStore, batch_size: int):
+    engine = StatsEngine()
+    aggregate = StatsAggregate(patch=PATCH)
+    for batch in store.scan_columns(batch_size):
+        engine.fold_columns(aggregate, [batch])
+    aggregate.comp_stats()
+    aggregate.augment_stats()
+    return aggregate
+
+
+def main(sizes, batch_size: int):
+    print(f"{'matches':>8} {'load-all MiB':>14} {'streaming MiB':>14} {'aggregate MiB':>14} {'working MiB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentMatchStore(Path(tmp))
+        generator = SyntheticMatchGenerator(seed=0)
+        for size in sorted(sizes):
+            for match in generator.iter_matches(size - len(store)):
+                store.put(match)
+
+            full, _ = traced_mib(lambda: load_everything(store))
+            streamed, retained = traced_mib(lambda: streaming(store, batch_size))
+            print(f"{size:>8} {full:>14.1f} {streamed:>14.1f} {retained:>14.1f} {streamed - retained:>12.1f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    main(args.sizes, args.batch_size)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of metric updates with metrics disabled and enabled.
+
+    python -m benchmarks.bench_metrics --calls 1000000
+"""
+
+import argparse
+import time
+
+from app.core import metrics
+from app.core.config import settings
+
+
+def per_call_ns(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def timer_block():
+    with metrics.ADVICE_STAGE_SECONDS.time(stage="bench"):
+        pass
+
+
+def main(calls: int):
+    cases = {
+        "counter.inc": lambda: metrics.RIOT_REQUESTS.inc(method="bench", status="200"),
+        "histogram.observe": lambda: metrics.ADVICE_STAGE_SECONDS.observe(0.01, stage="bench"),
+        "histogram.time": timer_block,
+    }
+    baseline = per_call_ns(lambda: None, calls)
+    print(f"{calls} calls each; empty call {baseline:.0f}ns")
+    for enabled in (False, True):
+        settings.metrics_enabled = enabled
+        for name, fn in cases.items():
+            cost = per_call_ns(fn, calls) - baseline
+            print(f"  {'enabled ' if enabled else 'disabled'} {name:<18} {cost:7.0f}ns")
+    metrics.REGISTRY.reset()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    main(args.calls)
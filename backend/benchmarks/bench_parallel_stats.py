@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Scaling of sharded stats computation across worker processes.
+
+    python -m benchmarks.bench_parallel_stats --matches 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.match_store import SegmentMatchStore
+from app.services.parallel_stats import ParallelStatsRunner, aggregate_shard
+from benchmarks.synthetic import SyntheticMatchGenerator
+
+PATCH = "12.1"
+
+
+async def time_workers(store: SegmentMatchStore, workers: int, batch_size: int) -> float:
+    match_ids = list(store.ids())
+    start = time.perf_counter()
+    if workers == 1:
+        aggregate_shard(store.backend, str(store.root), match_ids, PATCH, batch_size)
+    else:
+        runner = ParallelStatsRunner(workers)
+        # Start the pool first so process spawn time is not measured
+        await runner.aggregate(store, match_ids[:workers], PATCH)
+        start = time.perf_counter()
+        await runner.aggregate(store, match_ids, PATCH)
+        runner.shutdown()
+    return time.perf_counter() - start
+
+
+async def main(n_matches: int, worker_counts, batch_size: int):
+    print(f"{n_matches} matches, {os.cpu_count()} CPUs available")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentMatchStore(Path(tmp))
+        for match in SyntheticMatchGenerator(seed=0).iter_matches(n_matches):
+            store.put(match)
+
+        baseline = None
+        for workers in worker_counts:
+            elapsed = await time_workers(store, workers, batch_size)
+            baseline = baseline or elapsed
+            print(f"  {workers:>2} workers: {elapsed:7.2f}s  speedup {baseline / elapsed:4.1f}x")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.matches, args.workers, args.batch_size))
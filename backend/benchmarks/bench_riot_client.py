@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark Riot API client throughput against a local stub server.
+
+Compares the old one-``AsyncClient``-per-call pattern with the pooled,
+keep-alive ``RiotAPIClient``.
+
+    python -m benchmarks.bench_riot_client --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.core.config import settings
+from app.services.riot_client import RiotAPIClient
+
+MATCH_BODY = json.dumps({
+    "metadata": {"match_id": "NA1_0"},
+    "info": {
+        "game_datetime": 0,
+        "game_length": 2100.0,
+        "tft_set_number": 12,
+        "participants": [],
+    },
+}).encode()
+
+
+async def stub_app(scope, receive, send):
+    """Minimal ASGI app answering every request with a fixed match payload."""
+    if scope["type"] != "http":
+        return
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": MATCH_BODY})
+
+
+def start_stub_server() -> str:
+    """Start the stub server on a free localhost port and return its URL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(stub_app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_unpooled(base_url: str, total: int, concurrency: int) -> float:
+    """Old behaviour: a fresh AsyncClient (and connection) per request."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{base_url}/tft/match/v1/matches/NA1_{i}")
+                response.raise_for_status()
+                response.json()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def run_pooled(base_url: str, total: int, concurrency: int) -> float:
+    """New behaviour: shared pooled RiotAPIClient."""
+    # Measure connection handling, not the Riot rate limit
+    settings.riot_app_rate_limit = f"{total}:1"
+    semaphore = asyncio.Semaphore(concurrency)
+    client = RiotAPIClient(api_key="bench")
+    client.base_url = base_url
+
+    async def one(i: int):
+        async with semaphore:
+            await client.get_match_details(f"NA1_{i}")
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return total / (time.perf_counter() - start)
+    finally:
+        await client.aclose()
+
+
+async def main(total: int, concurrency: int):
+    base_url = start_stub_server()
+    print(f"Stub server at {base_url}; {total} requests, concurrency {concurrency}")
+
+    unpooled = await run_unpooled(base_url, total, concurrency)
+    print(f"  per-call AsyncClient: {unpooled:8.1f} req/s")
+
+    pooled = await run_pooled(base_url, total, concurrency)
+    print(f"  pooled RiotAPIClient: {pooled:8.1f} req/s ({pooled / unpooled:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
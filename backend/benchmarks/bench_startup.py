@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+App startup cost: import time, lifespan startup and first-request latency.
+
+    python -m benchmarks.bench_startup --runs 5 [--warm-up]
+
+Each run starts a fresh interpreter with its own empty Chroma directory,
+imports ``app.main``, runs the lifespan startup and sends two health
+checks through an in-process ASGI transport. Heavy modules already
+loaded right after the import are listed, since anything there slows
+down every process start.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HEAVY_MODULES = ("chromadb", "onnxruntime", "openai", "redis", "tiktoken")
+
+CHILD = """
+import asyncio, json, sys, time
+
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+loaded = [name for name in {heavy!r} if name in sys.modules]
+
+import httpx
+
+async def main():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get("/api/health")
+            first = time.perf_counter()
+            await client.get("/api/health")
+            second = time.perf_counter()
+    print(json.dumps({{
+        "import": imported - start,
+        "startup": started - imported,
+        "first_request": first - started,
+        "second_request": second - first,
+        "loaded_at_import": loaded,
+    }}))
+
+asyncio.run(main())
+"""
+
+
+def run_once(warm_up: bool) -> dict:
+    backend = Path(__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            CHROMA_PERSIST_DIRECTORY=str(Path(tmp) / "chroma"),
+            EMBEDDING_CACHE_PATH=str(Path(tmp) / "embeddings.sqlite3"),
+            WARM_UP_ON_STARTUP=str(warm_up).lower(),
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.format(heavy=HEAVY_MODULES)],
+            cwd=tmp,
+            env={**env, "PYTHONPATH": str(backend)},
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs: int, warm_up: bool):
+    results = [run_once(warm_up) for _ in range(runs)]
+    print(f"{runs} runs, warm-up {'on' if warm_up else 'off'}")
+    for stage in ("import", "startup", "first_request", "second_request"):
+        values = [result[stage] * 1000 for result in results]
+        print(f"  {stage:>15}: median {statistics.median(values):7.0f}ms  max {max(values):7.0f}ms")
+    print(f"  heavy modules loaded at import: {', '.join(results[0]['loaded_at_import']) or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm-up", action="store_true")
+    args = parser.parse_args()
+    main(args.runs, args.warm_up)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark stats computation: legacy per-participant Python loops vs StatsEngine.
+
+    python -m benchmarks.bench_stats --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+from app.services.stats_engine import StatsEngine
+from benchmarks import legacy_stats
+from benchmarks.synthetic import generate_matches
+
+
+def run(n_participants: int, patch: str = "12.1", skip_legacy: bool = False):
+    matches = generate_matches(0, n_participants=n_participants)
+    raw = [match.dict() for match in matches]
+
+    if not skip_legacy:
+        start = time.perf_counter()
+        legacy_stats.compute_comp_stats(matches, patch)
+        legacy_stats.compute_augment_stats(matches, patch)
+        legacy = time.perf_counter() - start
+        print(f"  legacy (comp + augment):  {legacy:8.3f}s")
+
+    engine = StatsEngine()
+    start = time.perf_counter()
+    comp_stats, augment_stats = engine.compute_stats(raw, patch)
+    elapsed = time.perf_counter() - start
+    print(f"  StatsEngine single pass:  {elapsed:8.3f}s "
+          f"({len(comp_stats)} comps, {len(augment_stats)} augments)")
+
+    if not skip_legacy:
+        print(f"  speedup: {legacy / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the stats engine")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(f"{size:,} participants")
+        run(size, skip_legacy=args.skip_legacy)
@@ -0,0 +1,183 @@
+"""
+Latency-injecting stand-ins for Chroma and OpenAI.
+
+``FakeVectorStore`` sleeps in its synchronous query methods like a real
+Chroma query would, so it exercises the vector store's thread pool.
+``FakeChatClient`` mimics ``AsyncOpenAI().chat.completions.create``, including
+``stream=True``; with ``blocking=True`` it sleeps synchronously like the old
+module-level client. ``HashEmbeddingFunction`` replaces the embedding model
+when only Chroma's own indexing and query cost should be measured.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from app.models.schemas import Champion, GameSnapshot
+from app.services.champion_index import ChampionIndex
+from app.services.vector_store import VectorStoreService
+
+OPTIONS_RESPONSE = json.dumps({"options": [
+    {
+        "rank": 1,
+        "title": "Roll for Upgrades",
+        "description": "Roll down at 4-1 to stabilize.",
+        "reasoning": "The board is strong enough to top 4 once upgraded.",
+        "key_stats": {"avg_placement": 3.4},
+        "confidence": 0.7,
+    },
+    {
+        "rank": 2,
+        "title": "Greed to Level 8",
+        "description": "Keep econ and push levels.",
+        "reasoning": "Health is high enough to take a few losses.",
+        "key_stats": {},
+        "confidence": 0.5,
+    },
+], "general_advice": "Roll at 4-1, then push levels once stable."})
+GENERAL_ADVICE_RESPONSE = "Stabilize your board before greeding econ."
+CHAMPION_POOL = ["Ahri", "Jinx", "Vi", "Ekko", "Zac", "Sona", "Nami", "Lux"]
+
+
+def make_snapshot(**overrides) -> GameSnapshot:
+    data = dict(
+        set_version="12",
+        stage="4-1",
+        level=7,
+        gold=40,
+        health=60,
+        board=[Champion(name=name, stars=2) for name in ("Ahri", "Jinx", "Vi")],
+        active_traits=["Arcana", "Rebel"],
+    )
+    data.update(overrides)
+    return GameSnapshot(**data)
+
+
+class HashEmbeddingFunction:
+    """Deterministic bag-of-words embedding, so indexing can be timed without a model."""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def __call__(self, input):
+        embeddings = []
+        for text in input:
+            vector = [0.0] * self.dimensions
+            for word in text.lower().split():
+                vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+            embeddings.append(vector)
+        return embeddings
+
+
+class FakeVectorStore(VectorStoreService):
+    """Vector store whose queries sleep instead of touching Chroma."""
+
+    def __init__(self, query_latency: float = 0.02, threads: int = 8, embed_latency: float = 0.01):
+        self.query_latency = query_latency
+        self.embed_latency = embed_latency
+        self.queries = 0
+        self.embeddings = 0
+        self.embedding_function = None
+        self._comp_index = ChampionIndex()
+        self._comp_index_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="vector-store")
+
+    def _results(self, kind: str, n_results: int) -> List[Dict[str, Any]]:
+        time.sleep(self.query_latency)
+        self.queries += 1
+        return [
+            {
+                "id": f"{kind}_{i}",
+                "document": f"{kind} document {i} with average placement {3 + i / 10:.1f}",
+                "metadata": self._metadata(kind, i),
+                "distance": i / 10,
+            }
+            for i in range(n_results)
+        ]
+
+    @staticmethod
+    def _metadata(kind: str, i: int) -> Dict[str, Any]:
+        """Stats metadata shaped like the real collections' entries."""
+        metadata: Dict[str, Any] = {"patch": "12"}
+        if kind == "comp":
+            champions = CHAMPION_POOL[i % 4:i % 4 + 4] + CHAMPION_POOL[4 + i % 4:8]
+            metadata.update(
+                comp_name=f"Comp_{i}",
+                champions=json.dumps([f"TFT12_{champion}" for champion in champions]),
+                key_augments=json.dumps([f"Augment {i}"]),
+                avg_placement=3.5 + i / 10,
+                top4_rate=0.6 - i / 50,
+                win_rate=0.15,
+                sample_size=200 // (i + 1),
+            )
+        elif kind == "augment":
+            metadata.update(
+                augment_name=f"Augment {i}",
+                avg_placement=4.0 + i / 10,
+                top4_rate=0.55 - i / 50,
+                win_rate=0.12,
+                sample_size=100,
+            )
+        return metadata
+
+    def embed_query(self, query: str):
+        time.sleep(self.embed_latency)
+        self.embeddings += 1
+        return [float(len(query)), 0.0, 1.0]
+
+    def query_compositions(self, query, n_results=5, patch_filter=None, query_embedding=None):
+        return self._results("comp", n_results)
+
+    def query_augments(self, query, n_results=5, patch_filter=None, query_embedding=None):
+        return self._results("augment", n_results)
+
+    def query_playbooks(self, query, n_results=3, query_embedding=None):
+        return self._results("playbook", n_results)
+
+
+class FakeChatClient:
+    """Chat completions client returning canned responses after a delay."""
+
+    def __init__(self, latency: float = 0.2, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        if kwargs.get("response_format", {}).get("type") == "json_object":
+            content = OPTIONS_RESPONSE
+        else:
+            content = GENERAL_ADVICE_RESPONSE
+
+        if kwargs.get("stream"):
+            self.calls += 1
+            return self._stream(content)
+
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        self.calls += 1
+
+        message = SimpleNamespace(content=content)
+        usage = SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) for m in kwargs.get("messages", ())) // 4,
+            completion_tokens=len(content) // 4
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    async def _stream(self, content: str, n_chunks: int = 40):
+        """Stream ``content`` in small deltas spread over the call's latency."""
+        # A fifth of the latency goes to the first token, the rest to generation
+        await asyncio.sleep(self.latency * 0.2)
+        size = max(1, len(content) // n_chunks)
+        for start in range(0, len(content), size):
+            await asyncio.sleep(self.latency * 0.8 / n_chunks)
+            delta = SimpleNamespace(content=content[start:start + size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
@@ -0,0 +1,158 @@
+"""
+Reference pure-Python stats computation, as it was before the NumPy stats engine.
+
+Used as the "before" side of ``bench_stats`` and as the oracle the engine's
+output is checked against.
+"""
+
+from collections import defaultdict, Counter
+from typing import Any, Dict, List
+
+from app.models.schemas import MatchData, CompStats, AugmentStats
+# Comp naming is shared with the engine so the two outputs stay comparable
+from app.services.stats_engine import comp_name
+
+
+def extract_composition(participant: Dict[str, Any]) -> List[str]:
+    """Extract champion composition from participant data."""
+    units = participant.get("units", [])
+    return sorted([unit.get("character_id", "") for unit in units])
+
+
+def extract_augments(participant: Dict[str, Any]) -> List[str]:
+    """Extract augments from participant data."""
+    return participant.get("augments", [])
+
+
+def extract_items(participant: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Extract items per champion."""
+    units = participant.get("units", [])
+    items_map = {}
+
+    for unit in units:
+        champion = unit.get("character_id", "")
+        items = unit.get("itemNames", [])
+        if champion and items:
+            items_map[champion] = items
+
+    return items_map
+
+
+def compute_comp_stats(
+    matches: List[MatchData],
+    patch: str
+) -> List[CompStats]:
+    """Compute statistics for team compositions."""
+    comp_data = defaultdict(lambda: {
+        "placements": [],
+        "augments": Counter(),
+        "items": defaultdict(Counter),
+        "champions": set()
+    })
+
+    for match in matches:
+        if str(match.tft_set_number) != patch.split(".")[0]:
+            continue
+
+        for participant in match.participants:
+            comp = tuple(extract_composition(participant))
+            placement = participant.get("placement", 8)
+            augments = extract_augments(participant)
+            items = extract_items(participant)
+
+            comp_data[comp]["placements"].append(placement)
+            comp_data[comp]["augments"].update(augments)
+            comp_data[comp]["champions"].update(comp)
+
+            for champ, item_list in items.items():
+                comp_data[comp]["items"][champ].update(item_list)
+
+    # Compute statistics
+    stats = []
+    for comp, data in comp_data.items():
+        if len(data["placements"]) < 5:  # Minimum sample size
+            continue
+
+        placements = data["placements"]
+        avg_placement = sum(placements) / len(placements)
+        top4_rate = sum(1 for p in placements if p <= 4) / len(placements)
+        win_rate = sum(1 for p in placements if p == 1) / len(placements)
+
+        # Get most common augments
+        top_augments = [aug for aug, _ in data["augments"].most_common(5)]
+
+        # Get most common items per champion
+        key_items = {}
+        for champ, item_counter in data["items"].items():
+            key_items[champ] = [item for item, _ in item_counter.most_common(3)]
+
+        stats.append(CompStats(
+            comp_name=comp_name(comp),
+            patch=patch,
+            champions=list(data["champions"]),
+            avg_placement=avg_placement,
+            play_rate=len(placements) / len(matches),
+            top4_rate=top4_rate,
+            win_rate=win_rate,
+            sample_size=len(placements),
+            key_augments=top_augments,
+            key_items=key_items
+        ))
+
+    return sorted(stats, key=lambda x: x.avg_placement)
+
+
+def compute_augment_stats(
+    matches: List[MatchData],
+    patch: str
+) -> List[AugmentStats]:
+    """Compute statistics for augments."""
+    augment_data = defaultdict(lambda: {
+        "placements": [],
+        "comps": Counter()
+    })
+
+    for match in matches:
+        if str(match.tft_set_number) != patch.split(".")[0]:
+            continue
+
+        for participant in match.participants:
+            augments = extract_augments(participant)
+            placement = participant.get("placement", 8)
+            comp = tuple(extract_composition(participant))
+
+            for augment in augments:
+                augment_data[augment]["placements"].append(placement)
+                augment_data[augment]["comps"][comp] += 1
+
+    # Compute statistics
+    total_picks = sum(len(data["placements"]) for data in augment_data.values())
+    stats = []
+
+    for augment, data in augment_data.items():
+        if len(data["placements"]) < 10:  # Minimum sample size
+            continue
+
+        placements = data["placements"]
+        avg_placement = sum(placements) / len(placements)
+        top4_rate = sum(1 for p in placements if p <= 4) / len(placements)
+        win_rate = sum(1 for p in placements if p == 1) / len(placements)
+
+        # Get synergistic comps
+        synergistic_comps = [
+            comp_name(comp)
+            for comp, _ in data["comps"].most_common(3)
+        ]
+
+        stats.append(AugmentStats(
+            augment_name=augment,
+            patch=patch,
+            pick_rate=len(placements) / total_picks if total_picks > 0 else 0,
+            avg_placement=avg_placement,
+            top4_rate=top4_rate,
+            win_rate=win_rate,
+            sample_size=len(placements),
+            synergistic_comps=synergistic_comps
+        ))
+
+    return sorted(stats, key=lambda x: x.avg_placement)
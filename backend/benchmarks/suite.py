@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: stats, match store, vector indexing, retrieval and context building.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --compare results.json
+
+Every case runs on a seeded synthetic corpus, so runs of the same size on
+different commits are comparable. Results are written as JSON together
+with the commit, Python version and sizes used. With ``--compare``, each
+timing is checked against a previous results file and the run fails if
+any got slower by more than ``--threshold``.
+
+Vector indexing and retrieval use a hashing embedding function, so they
+measure Chroma and the retrieval pipeline rather than model inference.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.match_store import SegmentMatchStore
+from app.services.rag_service import RAGService
+from app.services.stats_engine import StatsEngine
+from app.services.vector_store import VectorStoreService
+from benchmarks.fakes import HashEmbeddingFunction
+from benchmarks.synthetic import SyntheticMatchGenerator
+
+PATCH = "12.1"
+
+SIZES = {
+    "full": {"matches": 20000, "queries": 200, "batch_size": 500},
+    "quick": {"matches": 2000, "queries": 30, "batch_size": 500},
+}
+
+
+def timings(samples: List[float]) -> Dict[str, float]:
+    """Summary of per-call latencies, in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "min_ms": ordered[0] * 1000,
+    }
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+class Suite:
+    """Shared corpus and services for the benchmark cases."""
+
+    def __init__(self, workdir: Path, matches: int, queries: int, batch_size: int, seed: int = 0):
+        self.workdir = workdir
+        self.queries = queries
+        self.batch_size = batch_size
+        self.generator = SyntheticMatchGenerator(seed=seed)
+        self.matches = self.generator.generate(matches)
+        self.raw = [match.dict() for match in self.matches]
+        self.snapshots = [self.generator.random_snapshot() for _ in range(queries)]
+        self.comp_stats, self.augment_stats = StatsEngine().compute_stats(self.raw, PATCH)
+        self._vector_store: Optional[VectorStoreService] = None
+
+    @property
+    def vector_store(self) -> VectorStoreService:
+        if self._vector_store is None:
+            self._saved_settings = (settings.chroma_persist_directory, settings.embedding_cache_enabled)
+            settings.chroma_persist_directory = str(self.workdir / "chroma")
+            settings.embedding_cache_enabled = False
+            self._vector_store = VectorStoreService(embedding_function=HashEmbeddingFunction())
+        return self._vector_store
+
+    def close(self):
+        if self._vector_store is not None:
+            self._vector_store.close()
+            settings.chroma_persist_directory, settings.embedding_cache_enabled = self._saved_settings
+
+    def stats_compute(self) -> Dict[str, float]:
+        engine = StatsEngine()
+        samples = [timed(lambda: engine.compute_stats(self.raw, PATCH)) for _ in range(3)]
+        return {
+            **timings(samples),
+            "matches_per_s": len(self.raw) / statistics.median(samples),
+            "comps": len(self.comp_stats),
+            "augments": len(self.augment_stats),
+        }
+
+    def match_store_load(self) -> Dict[str, float]:
+        store = SegmentMatchStore(self.workdir / "matches")
+        write = timed(lambda: [store.put(match) for match in self.matches])
+
+        scans = [timed(lambda: sum(len(batch) for batch in store.iter_batches(self.batch_size))) for _ in range(3)]
+        ids = list(store.ids())[::max(1, len(self.raw) // 1000)]
+        lookups = [timed(lambda: store.get_raw(match_id)) for match_id in ids]
+        store.close()
+        return {
+            "write_ms": write * 1000,
+            "scan_ms": statistics.median(scans) * 1000,
+            "scan_matches_per_s": len(self.raw) / statistics.median(scans),
+            "lookup_p50_ms": statistics.median(lookups) * 1000,
+        }
+
+    def vector_index(self) -> Dict[str, float]:
+        store = self.vector_store
+        initial = timed(lambda: (
+            store.reindex_comp_stats(PATCH, self.comp_stats),
+            store.reindex_augment_stats(PATCH, self.augment_stats)
+        ))
+        unchanged = timed(lambda: (
+            store.reindex_comp_stats(PATCH, self.comp_stats),
+            store.reindex_augment_stats(PATCH, self.augment_stats)
+        ))
+        return {
+            "documents": len(self.comp_stats) + len(self.augment_stats),
+            "initial_ms": initial * 1000,
+            "unchanged_reindex_ms": unchanged * 1000,
+        }
+
+    def retrieval(self) -> Dict[str, float]:
+        rag = RAGService(self.vector_store)
+        store = self.vector_store
+        if not store.comp_collection.count():
+            self.vector_index()
+
+        async def run() -> List[float]:
+            # The first lookup builds the champion index
+            await rag._retrieve(self.snapshots[0])
+            samples = []
+            for snapshot in self.snapshots:
+                start = time.perf_counter()
+                await rag._retrieve(snapshot)
+                samples.append(time.perf_counter() - start)
+            return samples
+
+        return timings(asyncio.run(run()))
+
+    def context_build(self) -> Dict[str, float]:
+        rag = RAGService(self.vector_store)
+        if not self.vector_store.comp_collection.count():
+            self.vector_index()
+
+        async def retrieve():
+            return [
+                await self.vector_store.aretrieve(
+                    rag._create_query_from_snapshot(snapshot),
+                    n_compositions=settings.context_candidates,
+                    n_augments=settings.context_candidates,
+                    n_playbooks=settings.context_candidates,
+                    board=[champion.name for champion in snapshot.board]
+                )
+                for snapshot in self.snapshots
+            ]
+
+        retrievals = asyncio.run(retrieve())
+        samples = []
+        tokens = []
+        for snapshot, retrieval in zip(self.snapshots, retrievals):
+            start = time.perf_counter()
+            built = rag._build_context(snapshot, retrieval.compositions, retrieval.augments, retrieval.playbooks)
+            samples.append(time.perf_counter() - start)
+            tokens.append(built.total_tokens)
+        return {**timings(samples), "tokens_p50": statistics.median(tokens)}
+
+
+CASES = ("stats_compute", "match_store_load", "vector_index", "retrieval", "context_build")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    cases=CASES,
+    matches: int = SIZES["full"]["matches"],
+    queries: int = SIZES["full"]["queries"],
+    batch_size: int = SIZES["full"]["batch_size"],
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Run the selected cases and return the results document."""
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        suite = Suite(Path(tmp), matches, queries, batch_size, seed)
+        try:
+            for case in cases:
+                start = time.perf_counter()
+                results[case] = getattr(suite, case)()
+                print(f"  {case:<18} {(time.perf_counter() - start):6.1f}s  {format_metrics(results[case])}")
+        finally:
+            suite.close()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"matches": matches, "queries": queries, "batch_size": batch_size, "seed": seed},
+        "results": results,
+    }
+
+
+def format_metrics(metrics: Dict[str, float]) -> str:
+    return "  ".join(f"{name} {value:.4g}" for name, value in metrics.items())
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Timings (``*_ms`` metrics) more than ``threshold`` slower than the baseline."""
+    if baseline.get("params") != current.get("params"):
+        print("  warning: baseline was run with different sizes, ratios are not comparable")
+
+    regressions = []
+    for case, metrics in current["results"].items():
+        for name, value in metrics.items():
+            before = baseline.get("results", {}).get(case, {}).get(name)
+            if not name.endswith("_ms") or not before:
+                continue
+            ratio = value / before
+            marker = ""
+            if ratio > 1 + threshold:
+                marker = "  REGRESSION"
+                regressions.append(f"{case}.{name}")
+            print(f"  {case}.{name:<22} {before:10.3f} -> {value:10.3f}ms  x{ratio:.2f}{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="small corpus for a fast check")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--matches", type=int)
+    parser.add_argument("--queries", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 for 20%%")
+    args = parser.parse_args()
+
+    sizes = dict(SIZES["quick" if args.quick else "full"])
+    if args.matches:
+        sizes["matches"] = args.matches
+    if args.queries:
+        sizes["queries"] = args.queries
+
+    print(f"{sizes['matches']} matches, {sizes['queries']} queries")
+    document = run_suite(args.cases, seed=args.seed, **sizes)
+
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), document, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Seeded synthetic TFT match generator.
+
+Participants play one of a fixed set of archetype compositions (popularity
+follows a Zipf-like curve) with a few units swapped out, so common comps
+repeat often enough to pass the stats sample-size thresholds. Stronger
+archetypes place better on average, augments and items are drawn from
+skewed pools, and carries hold most of the items.
+"""
+
+import random
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.models.schemas import Champion, GameSnapshot, MatchData
+
+PARTICIPANTS_PER_MATCH = 8
+
+
+class SyntheticMatchGenerator:
+    """Generate reproducible ``MatchData`` corpora of any size."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        set_number: int = 12,
+        n_champions: int = 60,
+        n_archetypes: int = 40,
+        n_augments: int = 150,
+        n_items: int = 45,
+        swap_probability: float = 0.3
+    ):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.set_number = set_number
+        self.swap_probability = swap_probability
+
+        self.champions = [f"TFT{set_number}_Champion{i:02d}" for i in range(n_champions)]
+        self.augments = [f"TFT{set_number}_Augment_{i:03d}" for i in range(n_augments)]
+        self.items = [f"TFT_Item_{i:02d}" for i in range(n_items)]
+
+        self.archetypes = [
+            self.rng.sample(self.champions, self.rng.randint(7, 9))
+            for _ in range(n_archetypes)
+        ]
+        self.archetype_weights = [1.0 / (rank + 1) for rank in range(n_archetypes)]
+        self.archetype_strength = [self.rng.gauss(0.0, 1.0) for _ in range(n_archetypes)]
+        self.augment_weights = [1.0 / (rank + 1) ** 0.8 for rank in range(n_augments)]
+        self.item_weights = [1.0 / (rank + 1) ** 0.6 for rank in range(n_items)]
+        self._next_id = 0
+
+    def _board(self, archetype: List[str]) -> List[str]:
+        board = list(archetype)
+        while self.rng.random() < self.swap_probability:
+            board[self.rng.randrange(len(board))] = self.rng.choice(self.champions)
+        return board
+
+    def random_board(self) -> List[str]:
+        """Champions of one participant's board, drawn like ``generate_match`` does."""
+        archetype = self.rng.choices(self.archetypes, weights=self.archetype_weights)[0]
+        return self._board(archetype)
+
+    def random_snapshot(self) -> GameSnapshot:
+        """A mid-game snapshot whose board is a partly built archetype."""
+        board = self.random_board()[:self.rng.randint(4, 8)]
+        return GameSnapshot(
+            set_version=str(self.set_number),
+            stage=f"{self.rng.randint(2, 5)}-{self.rng.randint(1, 7)}",
+            level=min(10, max(4, len(board))),
+            gold=self.rng.randint(0, 80),
+            health=self.rng.randint(10, 100),
+            board=[Champion(name=name, stars=self.rng.choice((1, 2, 2, 3))) for name in board],
+            available_augments=self.rng.choices(self.augments, weights=self.augment_weights, k=3),
+        )
+
+    def _units(self, board: List[str]) -> List[Dict[str, Any]]:
+        carries = set(self.rng.sample(range(len(board)), min(3, len(board))))
+        units = []
+        for i, champion in enumerate(board):
+            n_items = self.rng.randint(1, 3) if i in carries else int(self.rng.random() < 0.2)
+            units.append({
+                "character_id": champion,
+                "tier": self.rng.choices((1, 2, 3), weights=(30, 60, 10))[0],
+                "itemNames": self.rng.choices(self.items, weights=self.item_weights, k=n_items),
+            })
+        return units
+
+    def generate_match(self) -> MatchData:
+        """Generate one match with eight participants."""
+        # Seed-prefixed IDs keep corpora from different seeds disjoint
+        match_id = f"NA1_{self.seed:03d}{self._next_id:010d}"
+        self._next_id += 1
+
+        picks = self.rng.choices(
+            range(len(self.archetypes)),
+            weights=self.archetype_weights,
+            k=PARTICIPANTS_PER_MATCH
+        )
+        # Stronger archetypes (plus noise) finish higher
+        order = sorted(
+            range(PARTICIPANTS_PER_MATCH),
+            key=lambda i: -(self.archetype_strength[picks[i]] + self.rng.gauss(0.0, 1.5))
+        )
+        placements = {participant: rank + 1 for rank, participant in enumerate(order)}
+
+        participants = []
+        for i, archetype in enumerate(picks):
+            board = self._board(self.archetypes[archetype])
+            participants.append({
+                "puuid": f"player-{self.rng.getrandbits(48):012x}",
+                "placement": placements[i],
+                "level": min(10, max(6, len(board))),
+                "augments": self.rng.choices(self.augments, weights=self.augment_weights, k=3),
+                "units": self._units(board),
+            })
+
+        return MatchData(
+            match_id=match_id,
+            game_datetime=1_700_000_000_000 + self._next_id * 60_000,
+            game_length=self.rng.uniform(1500.0, 2400.0),
+            tft_set_number=self.set_number,
+            participants=participants
+        )
+
+    def iter_matches(self, n_matches: int) -> Iterator[MatchData]:
+        for _ in range(n_matches):
+            yield self.generate_match()
+
+    def generate(self, n_matches: int) -> List[MatchData]:
+        return list(self.iter_matches(n_matches))
+
+
+def generate_matches(
+    n_matches: int,
+    seed: int = 0,
+    set_number: int = 12,
+    n_participants: Optional[int] = None
+) -> List[MatchData]:
+    """Generate a corpus, sized by matches or (if given) by participants."""
+    if n_participants is not None:
+        n_matches = max(1, n_participants // PARTICIPANTS_PER_MATCH)
+    return SyntheticMatchGenerator(seed=seed, set_number=set_number).generate(n_matches)
@@ -0,0 +1,111 @@
+import pytest
+
+from app.models.schemas import Champion
+from app.services.advice_cache import AdviceCache, MemoryAdviceCacheBackend, snapshot_digest
+from app.services.rag_service import RAGService
+from benchmarks.fakes import FakeChatClient, FakeVectorStore, make_snapshot
+
+
+def test_equivalent_snapshots_share_a_key():
+    """Board order, positions, items and gold within a bucket do not change the key."""
+    a = make_snapshot(
+        gold=41,
+        board=[Champion(name="Ahri", stars=2, items=["Blue Buff"]), Champion(name="Vi", stars=1)],
+        available_augments=["Jeweled Lotus", "Cybernetic Uplink"]
+    )
+    b = make_snapshot(
+        gold=48,
+        board=[Champion(name="Vi", stars=1), Champion(name="Ahri", stars=2)],
+        available_augments=["Cybernetic Uplink", "Jeweled Lotus"]
+    )
+    assert snapshot_digest(a) == snapshot_digest(b)
+
+    assert snapshot_digest(a) != snapshot_digest(make_snapshot(gold=51, board=b.board))
+    upgraded = [Champion(name="Vi", stars=2), Champion(name="Ahri", stars=2)]
+    assert snapshot_digest(b) != snapshot_digest(b.model_copy(update={"board": upgraded}))
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_lru_and_ttl(monkeypatch):
+    """Entries expire after their TTL and the least recently used is evicted."""
+    backend = MemoryAdviceCacheBackend(max_entries=2)
+    await backend.set("a", "1", ttl=60)
+    await backend.set("b", "2", ttl=60)
+    assert await backend.get("a") == "1"
+    await backend.set("c", "3", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+
+    await backend.set("d", "4", ttl=0)
+    assert await backend.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_rag_service_caches_until_invalidated():
+    """A repeated snapshot skips retrieval and LLM calls until stats are reindexed."""
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    llm = FakeChatClient(latency=0)
+    cache = AdviceCache(MemoryAdviceCacheBackend(), ttl=60)
+    rag = RAGService(vector_store, llm, advice_cache=cache)
+
+    first = await rag.generate_advice(make_snapshot(gold=40))
+    calls = llm.calls
+    second = await rag.generate_advice(make_snapshot(gold=42))
+
+    assert llm.calls == calls
+    assert vector_store.embeddings == 1
+    assert second.snapshot.gold == 42
+    assert second.options == first.options
+
+    await cache.invalidate("12.1")
+    await rag.generate_advice(make_snapshot(gold=42))
+    assert llm.calls == 2 * calls
+
+    # Other sets keep their entries
+    await cache.invalidate("11.3")
+    await rag.generate_advice(make_snapshot(gold=42))
+    assert llm.calls == 2 * calls
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_fallback_advice_is_not_cached():
+    """Advice produced after an LLM failure is recomputed on the next request."""
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    llm = FakeChatClient(latency=0)
+
+    async def failing(**kwargs):
+        raise RuntimeError("upstream unavailable")
+
+    llm.chat.completions.create = failing
+    cache = AdviceCache(MemoryAdviceCacheBackend(), ttl=60)
+    rag = RAGService(vector_store, llm, advice_cache=cache)
+
+    await rag.generate_advice(make_snapshot())
+    assert len(cache.backend) == 0
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_advice_generated_across_invalidation_is_not_served():
+    """Advice built before a reindex is not served under the new generation."""
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    llm = FakeChatClient(latency=0)
+    cache = AdviceCache(MemoryAdviceCacheBackend(), ttl=60)
+    rag = RAGService(vector_store, llm, advice_cache=cache)
+    generate = rag._generate_advice
+
+    async def generate_during_reindex(snapshot):
+        advice = await generate(snapshot)
+        await cache.invalidate("12.1")
+        return advice
+
+    rag._generate_advice = generate_during_reindex
+    await rag.generate_advice(make_snapshot())
+    calls = llm.calls
+
+    rag._generate_advice = generate
+    await rag.generate_advice(make_snapshot())
+    assert llm.calls == 2 * calls
+    vector_store.close()
@@ -0,0 +1,19 @@
+from benchmarks.suite import CASES, compare, run_suite
+
+
+def test_suite_runs_every_case():
+    """A tiny suite run produces timings for every case."""
+    document = run_suite(matches=200, queries=3, batch_size=50)
+
+    assert set(document["results"]) == set(CASES)
+    assert document["params"]["matches"] == 200
+    assert document["results"]["stats_compute"]["comps"] > 0
+    assert document["results"]["retrieval"]["p50_ms"] > 0
+
+
+def test_compare_flags_slowdowns():
+    """Only timings beyond the threshold count as regressions."""
+    baseline = {"params": {}, "results": {"retrieval": {"p50_ms": 10.0, "p95_ms": 20.0, "comps": 5}}}
+    current = {"params": {}, "results": {"retrieval": {"p50_ms": 11.0, "p95_ms": 30.0, "comps": 50}}}
+
+    assert compare(baseline, current, threshold=0.2) == ["retrieval.p95_ms"]
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from app.services.champion_index import ChampionIndex, champion_key
+
+ENTRIES = [
+    ("a", ["TFT12_Ahri", "TFT12_Jinx", "TFT12_Vi"], "12"),
+    ("b", ["TFT12_Ahri", "TFT12_Zac"], "12"),
+    ("c", ["TFT12_Sona", "TFT12_Nami", "TFT12_Lux", "TFT12_Zac"], "12"),
+    ("d", ["TFT11_Ahri", "TFT11_Jinx", "TFT11_Vi"], "11"),
+]
+
+
+def test_search_scores_jaccard_overlap():
+    """Board names match Riot character IDs and scores are exact Jaccard."""
+    index = ChampionIndex(ENTRIES)
+
+    hits = index.search(["Ahri", "Jinx", "Ekko"], k=10, patch="12")
+
+    assert hits == [("a", 0.5), ("b", 0.25)]
+    assert index.search(["Ekko"]) == []
+    assert index.search(["Ahri"], patch="9") == []
+
+
+def test_containment_and_min_shared():
+    """Containment scores the share of each comp already on the board."""
+    index = ChampionIndex(ENTRIES)
+
+    hits = index.search(["Ahri", "Zac", "Sona", "Nami"], k=10, metric="containment", min_shared=2)
+
+    assert hits == [("b", 1.0), ("c", 0.75)]
+    with pytest.raises(ValueError):
+        index.search(["Ahri"], metric="cosine")
+
+
+def test_scores_rerank_known_keys():
+    """Bitset scores for given keys agree with search and skip unknown keys."""
+    index = ChampionIndex(ENTRIES)
+    board = ["Ahri", "Jinx", "Ekko"]
+
+    assert index.scores(board, ["b", "a", "missing"]) == {"b": 0.25, "a": 0.5}
+    assert dict(index.search(board, k=10)) == {
+        key: score for key, score in index.scores(board, index.keys).items() if score > 0
+    }
+
+
+def test_search_matches_brute_force():
+    """Top-k results equal a set-based scan over random comps."""
+    rng = random.Random(0)
+    pool = [f"TFT12_Champion{i:02d}" for i in range(40)]
+    entries = [(f"comp{i}", rng.sample(pool, rng.randint(6, 9)), "12") for i in range(2000)]
+    index = ChampionIndex(entries)
+
+    for _ in range(20):
+        board = rng.sample(pool, 7)
+        board_keys = {champion_key(champion) for champion in board}
+        expected = sorted(
+            (
+                (-len(board_keys & keys) / len(board_keys | keys), i)
+                for i, (_, champions, _) in enumerate(entries)
+                for keys in [{champion_key(champion) for champion in champions}]
+                if board_keys & keys
+            )
+        )[:10]
+
+        hits = index.search(board, k=10)
+
+        assert [key for key, _ in hits] == [entries[i][0] for _, i in expected]
+        assert [score for _, score in hits] == pytest.approx([-score for score, _ in expected])
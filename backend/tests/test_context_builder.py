@@ -0,0 +1,93 @@
+from app.services.context_builder import (
+    ContextBuilder,
+    Snippet,
+    TokenCounter,
+    score_result
+)
+
+TITLES = {
+    "compositions": "## Relevant Team Compositions",
+    "augments": "## Relevant Augments",
+}
+
+
+def make_snippets(section, count, words=5, score=1.0):
+    return [
+        Snippet(section, " ".join(f"{section}{i}word{j}" for j in range(words)), score - i * 0.01)
+        for i in range(count)
+    ]
+
+
+def test_heuristic_counter_errs_high():
+    """Without tiktoken the estimate never counts fewer tokens than words."""
+    counter = TokenCounter()
+    counter._encoding = None
+
+    assert counter.count("") == 0
+    assert counter.count("a b c d e f") == 6
+    assert counter.count("x" * 40) == 10
+
+
+def test_build_respects_token_budget():
+    """Packed context stays within the budget and keeps the game state."""
+    builder = ContextBuilder(token_budget=150)
+    built = builder.build(
+        ["## Current Game State", "Stage: 3-2"],
+        {
+            "compositions": make_snippets("compositions", 10),
+            "augments": make_snippets("augments", 10),
+        },
+        TITLES
+    )
+
+    assert built.text.startswith("## Current Game State")
+    assert built.total_tokens <= 150
+    assert built.dropped > 0
+    assert set(built.tokens_by_section) == {"game_state", "compositions", "augments"}
+    assert sum(built.tokens_by_section.values()) >= built.total_tokens
+
+
+def test_every_section_gets_its_best_snippet():
+    """A low-scoring section still contributes its top result."""
+    builder = ContextBuilder(token_budget=200)
+    built = builder.build(
+        ["## Current Game State"],
+        {
+            "compositions": make_snippets("compositions", 10, score=1.0),
+            "augments": make_snippets("augments", 3, score=0.1),
+        },
+        TITLES
+    )
+
+    augments = built.section_snippets("augments")
+    assert [snippet.text for snippet in augments][:1] == [make_snippets("augments", 1)[0].text]
+
+
+def test_near_duplicates_are_dropped():
+    """Overlapping results keep only the best-scoring copy."""
+    text = "Jinx Vi Ekko Zac carry comp with 4.2 average placement"
+    builder = ContextBuilder(token_budget=1000)
+    built = builder.build(
+        [],
+        {
+            "compositions": [
+                Snippet("compositions", f"- {text}", 0.5),
+                Snippet("compositions", f"- {text}!", 0.9),
+                Snippet("compositions", "- Ahri Sona reroll", 0.4),
+            ],
+        },
+        TITLES
+    )
+
+    assert [snippet.score for snippet in built.snippets] == [0.9, 0.4]
+    assert built.dropped == 1
+
+
+def test_score_weights_sample_size():
+    """Equally similar stats from fewer games score lower."""
+    small = score_result({"distance": 0.2, "metadata": {"sample_size": 10}})
+    large = score_result({"distance": 0.2, "metadata": {"sample_size": 1000}})
+    unweighted = score_result({"distance": 0.2, "metadata": {}})
+
+    assert small < large < unweighted
+    assert score_result({"distance": 0.2}, reliability=0.5) == unweighted / 2
@@ -0,0 +1,208 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import MatchData
+from app.services.data_ingestion import DataIngestionService
+
+
+class FakeRiotClient:
+    """In-memory stand-in for RiotAPIClient that tracks request concurrency."""
+
+    def __init__(self, match_ids, failing=()):
+        self.match_ids = match_ids
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fetched = []
+
+    async def get_match_ids_by_puuid(self, puuid, count=20, start=0):
+        return self.match_ids[:count]
+
+    async def get_match_details(self, match_id):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.fetched.append(match_id)
+        if match_id in self.failing:
+            raise RuntimeError("boom")
+        return self.make_match(match_id)
+
+    @staticmethod
+    def make_match(match_id):
+        return MatchData(
+            match_id=match_id,
+            game_datetime=0,
+            game_length=2000.0,
+            tft_set_number=12,
+            participants=[]
+        )
+
+
+@pytest.fixture
+def ingestion_factory(tmp_path, monkeypatch):
+    """Build ingestion services writing to a temporary match store."""
+    monkeypatch.setattr(settings, "match_store_dir", str(tmp_path / "store"))
+    monkeypatch.setattr(settings, "stats_aggregate_dir", str(tmp_path / "stats"))
+
+    def factory(riot_client, concurrency=4):
+        monkeypatch.setattr(settings, "ingestion_match_concurrency", concurrency)
+        return DataIngestionService(riot_client=riot_client)
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_player_matches_fetched_concurrently(ingestion_factory):
+    """Test that match fetches overlap but stay within the configured bound."""
+    client = FakeRiotClient([f"NA1_{i}" for i in range(12)])
+    service = ingestion_factory(client, concurrency=4)
+
+    matches = await service.ingest_player_matches("puuid", count=12)
+
+    assert len(matches) == 12
+    assert 1 < client.max_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_failed_match_is_isolated(ingestion_factory):
+    """Test that one failing match does not abort the rest of the player's matches."""
+    client = FakeRiotClient([f"NA1_{i}" for i in range(5)], failing={"NA1_2"})
+    service = ingestion_factory(client)
+
+    matches = await service.ingest_player_matches("puuid", count=5)
+
+    assert sorted(m.match_id for m in matches) == ["NA1_0", "NA1_1", "NA1_3", "NA1_4"]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_match_ids_fetched_once(ingestion_factory):
+    """Test that concurrent workers share one fetch per match ID."""
+    client = FakeRiotClient(["NA1_1", "NA1_1", "NA1_2", "NA1_1"])
+    service = ingestion_factory(client)
+
+    matches, saved = await service.crawl_player_matches("puuid", count=4)
+
+    assert len(matches) == 4
+    assert sorted(client.fetched) == ["NA1_1", "NA1_2"]
+    assert saved == 2
+    assert service.match_index.fetches_saved == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fetch_does_not_cancel_waiters(ingestion_factory):
+    """Test that a waiter takes over a shared fetch whose caller was cancelled."""
+    client = FakeRiotClient([])
+    service = ingestion_factory(client)
+
+    first = asyncio.create_task(service.fetch_and_cache_match("NA1_1"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(service.fetch_and_cache_match("NA1_1"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    match = await second
+    assert match.match_id == "NA1_1"
+    assert first.cancelled()
+    assert client.fetched == ["NA1_1"]
+    assert "NA1_1" in service.match_store
+
+
+@pytest.mark.asyncio
+async def test_concurrent_crawls_report_their_own_savings(ingestion_factory):
+    """Test that each crawl reports only the fetches it saved itself."""
+    service = ingestion_factory(FakeRiotClient([]))
+    for match_id in ("NA1_1", "NA1_2"):
+        service.match_store.put(FakeRiotClient.make_match(match_id))
+
+    service.riot_client.match_ids = ["NA1_1", "NA1_2", "NA1_3"]
+    (_, first), (_, second) = await asyncio.gather(
+        service.crawl_player_matches("a", count=3),
+        service.crawl_player_matches("b", count=1)
+    )
+
+    # "a" reuses two stored matches; "b" reuses one
+    assert (first, second) == (2, 1)
+    assert service.match_index.fetches_saved == 3
+
+
+@pytest.mark.asyncio
+async def test_match_index_persists_across_restarts(ingestion_factory):
+    """Test that known matches are served from the store after a restart."""
+    first = FakeRiotClient(["NA1_1", "NA1_2"])
+    service = ingestion_factory(first)
+    await service.ingest_player_matches("puuid", count=2)
+    service.close()
+
+    second = FakeRiotClient(["NA1_1", "NA1_2", "NA1_3"])
+    service = ingestion_factory(second)
+    assert "NA1_1" in service.match_index
+
+    matches = await service.ingest_player_matches("puuid", count=3)
+
+    assert len(matches) == 3
+    assert second.fetched == ["NA1_3"]
+    assert service.match_index.fetches_saved == 2
+
+
+def test_update_stats_aggregate_folds_only_new_matches(ingestion_factory):
+    """Test that recomputing stats only processes newly stored matches."""
+    service = ingestion_factory(FakeRiotClient([]))
+    for i in range(3):
+        service.match_store.put(FakeRiotClient.make_match(f"NA1_{i}"))
+
+    aggregate, added = service.update_stats_aggregate("12.1")
+    assert added == 3
+
+    service.match_store.put(FakeRiotClient.make_match("NA1_3"))
+    aggregate, added = service.update_stats_aggregate("12.1")
+
+    assert added == 1
+    assert aggregate.matches_seen == 4
+    assert aggregate.watermark == 4
+    assert service.stats_aggregates.covered_ids("12.1") == {f"NA1_{i}" for i in range(4)}
+
+
+def test_update_stats_aggregate_resumes_from_watermark(ingestion_factory, monkeypatch):
+    """Test that an update only lists matches stored after the saved watermark."""
+    service = ingestion_factory(FakeRiotClient([]))
+    for i in range(3):
+        service.match_store.put(FakeRiotClient.make_match(f"NA1_{i}"))
+    service.update_stats_aggregate("12.1")
+
+    def full_listing():
+        raise AssertionError("update listed every stored match")
+
+    monkeypatch.setattr(service.match_store, "ids", full_listing)
+    service.match_store.put(FakeRiotClient.make_match("NA1_3"))
+    aggregate, added = service.update_stats_aggregate("12.1")
+
+    assert added == 1
+    assert aggregate.watermark == 4
+    assert service.update_stats_aggregate("12.1")[1] == 0
+
+
+def test_legacy_stats_aggregate_is_migrated(ingestion_factory):
+    """Test that aggregates saved with inline covered IDs are never double counted."""
+    service = ingestion_factory(FakeRiotClient([]))
+    for i in range(3):
+        service.match_store.put(FakeRiotClient.make_match(f"NA1_{i}"))
+    aggregate, _ = service.update_stats_aggregate("12.1")
+
+    legacy = aggregate.to_dict()
+    del legacy["watermark"]
+    legacy["covered_ids"] = ["NA1_0", "NA1_1", "NA1_2"]
+    service.stats_aggregates.delete("12.1")
+    with gzip.open(service.stats_aggregates._path("12.1"), 'wt') as f:
+        json.dump(legacy, f)
+
+    service.match_store.put(FakeRiotClient.make_match("NA1_3"))
+    aggregate, added = service.update_stats_aggregate("12.1")
+
+    assert added == 1
+    assert aggregate.matches_seen == 4
+    assert aggregate.watermark == 4
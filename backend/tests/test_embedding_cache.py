@@ -0,0 +1,98 @@
+import threading
+
+from app.services.embedding_cache import CachedEmbeddingFunction, default_namespace
+
+
+class CountingEmbeddingFunction:
+    def __init__(self, model_name="counting"):
+        self.model_name = model_name
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [[float(len(text)), float(text.count("a")), 0.5] for text in input]
+
+
+def test_cached_texts_skip_inference(tmp_path):
+    """Only texts never seen before reach the wrapped embedding function."""
+    inner = CountingEmbeddingFunction()
+    cache = CachedEmbeddingFunction(inner, tmp_path / "cache.sqlite3")
+
+    first = cache(["alpha", "beta", "alpha"])
+    second = cache(["beta", "gamma"])
+
+    assert inner.calls == [["alpha", "beta"], ["gamma"]]
+    assert first[0] == first[2] == [5.0, 2.0, 0.5]
+    assert second[0] == first[1]
+    assert cache.stats()["misses"] == 3
+    cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """A new cache on the same file serves vectors from disk."""
+    path = tmp_path / "cache.sqlite3"
+    cache = CachedEmbeddingFunction(CountingEmbeddingFunction(), path)
+    expected = cache(["Team composition: Ahri, Jinx"])
+    cache.close()
+
+    inner = CountingEmbeddingFunction()
+    reopened = CachedEmbeddingFunction(inner, path)
+    assert reopened(["Team composition: Ahri, Jinx"]) == expected
+    assert inner.calls == []
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+
+def test_memory_lru_is_bounded_and_namespaced(tmp_path):
+    """The in-memory layer evicts old entries and keys include the model namespace."""
+    path = tmp_path / "cache.sqlite3"
+    cache = CachedEmbeddingFunction(CountingEmbeddingFunction(), path, memory_size=2, namespace="model-a")
+    cache(["one", "two", "three"])
+    assert cache.stats()["memory_entries"] == 2
+
+    cache(["one"])
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+    other_model = CountingEmbeddingFunction()
+    other = CachedEmbeddingFunction(other_model, path, namespace="model-b")
+    other(["one"])
+    assert other_model.calls == [["one"]]
+    other.close()
+
+
+def test_default_namespace_includes_the_model(tmp_path):
+    """Models of the same class do not share vectors; unnamed ones are told apart by dimension."""
+    path = tmp_path / "cache.sqlite3"
+    cache = CachedEmbeddingFunction(CountingEmbeddingFunction("small"), path)
+    cache(["one"])
+    cache.close()
+
+    other_model = CountingEmbeddingFunction("large")
+    other = CachedEmbeddingFunction(other_model, path)
+    other(["one"])
+    assert other_model.calls == [["one"]]
+    other.close()
+
+    unnamed = CountingEmbeddingFunction(None)
+    assert default_namespace(unnamed) == "CountingEmbeddingFunction:dim=3"
+
+
+def test_concurrent_calls(tmp_path):
+    """Concurrent callers from the vector store's threads get consistent vectors."""
+    inner = CountingEmbeddingFunction()
+    cache = CachedEmbeddingFunction(inner, tmp_path / "cache.sqlite3")
+    results = []
+
+    def worker():
+        results.append(cache([f"text {i}" for i in range(50)]))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result == results[0] for result in results)
+    assert cache(["text 7"]) == [results[0][7]]
+    cache.close()
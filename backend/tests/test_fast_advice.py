@@ -0,0 +1,93 @@
+import json
+
+from app.services.champion_index import champion_key
+from app.services.fast_advice import FastAdviceEngine
+from benchmarks.fakes import make_snapshot
+
+
+def comp(name, champions, avg_placement=4.0, top4_rate=0.5, sample_size=500):
+    return {"metadata": {
+        "comp_name": name,
+        "champions": json.dumps(champions),
+        "key_augments": json.dumps([]),
+        "avg_placement": avg_placement,
+        "top4_rate": top4_rate,
+        "sample_size": sample_size,
+    }}
+
+
+def augment(name, avg_placement=4.0, top4_rate=0.5, sample_size=500):
+    return {"metadata": {
+        "augment_name": name,
+        "avg_placement": avg_placement,
+        "top4_rate": top4_rate,
+        "sample_size": sample_size,
+    }}
+
+
+def test_champion_key_ignores_set_prefix():
+    """Riot character IDs and board names compare equal."""
+    assert champion_key("TFT12_Jinx") == champion_key(" jinx ") == "jinx"
+
+
+def test_board_overlap_outranks_similar_stats():
+    """With equal stats, the comp the board already fields ranks first."""
+    snapshot = make_snapshot()  # Ahri, Jinx, Vi
+    options, general_advice = FastAdviceEngine().advise(snapshot, [
+        comp("Elsewhere", ["TFT12_Zac", "TFT12_Sona", "TFT12_Nami"]),
+        comp("Ours", ["TFT12_Ahri", "TFT12_Jinx", "TFT12_Lux"]),
+    ], [])
+
+    assert [option.title for option in options] == ["Play Ours", "Play Elsewhere"]
+    assert [option.rank for option in options] == [1, 2]
+    assert options[0].key_stats["board_overlap"] == 0.67
+    assert "Lux" in options[0].description
+    assert general_advice
+
+
+def test_small_samples_are_discounted():
+    """A comp with a handful of games loses to a proven one with slightly worse stats."""
+    snapshot = make_snapshot(board=[])
+    options, _ = FastAdviceEngine().advise(snapshot, [
+        comp("Lucky", ["TFT12_Zac"], avg_placement=3.0, top4_rate=0.7, sample_size=3),
+        comp("Proven", ["TFT12_Sona"], avg_placement=3.4, top4_rate=0.62, sample_size=2000),
+    ], [])
+
+    assert options[0].title == "Play Proven"
+    assert options[0].confidence > options[1].confidence
+
+
+def test_only_offered_augments_are_suggested():
+    """Augments are suggested only when they are on offer, and take one slot."""
+    snapshot = make_snapshot(available_augments=["Cybernetic Uplink"])
+    comps = [comp(f"Comp {i}", ["TFT12_Zac"]) for i in range(5)]
+    options, _ = FastAdviceEngine(max_options=3).advise(snapshot, comps, [
+        augment("Cybernetic Uplink"),
+        augment("Not Offered", avg_placement=2.0, top4_rate=0.9),
+    ])
+
+    titles = [option.title for option in options]
+    assert len(titles) == 3
+    assert "Take Cybernetic Uplink" in titles
+    assert "Take Not Offered" not in titles
+
+
+def test_advise_is_deterministic():
+    """The same inputs always produce the same advice."""
+    snapshot = make_snapshot()
+    comps = [comp(f"Comp {i}", ["TFT12_Ahri", f"TFT12_Unit{i}"], avg_placement=4.0 + i / 10) for i in range(6)]
+    engine = FastAdviceEngine()
+
+    assert engine.advise(snapshot, comps, []) == engine.advise(snapshot, comps, [])
+
+
+def test_generated_names_and_missing_metadata():
+    """Hash comp names become unit lists, and results without metadata are skipped."""
+    snapshot = make_snapshot(available_augments=["Jeweled Lotus"])
+    options, _ = FastAdviceEngine().advise(
+        snapshot,
+        [comp("Comp_0123456789", ["TFT12_Vi", "TFT12_Ahri", "TFT12_Jinx", "TFT12_Lux"]), {"metadata": None}],
+        [{"metadata": None}]
+    )
+
+    assert [option.title for option in options] == ["Play Ahri, Jinx, Lux +1"]
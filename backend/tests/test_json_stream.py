@@ -0,0 +1,45 @@
+import json
+
+from app.services.json_stream import JsonArrayItemParser, sse_event
+
+
+def feed_chars(parser, text):
+    items = []
+    for ch in text:
+        items.extend(parser.feed(ch))
+    return items
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    """Each array object is returned by the chunk containing its closing brace."""
+    parser = JsonArrayItemParser()
+    assert parser.feed('[{"title": "A", "key_stats": {"top4": 0.6}}, {"ti') == [
+        {"title": "A", "key_stats": {"top4": 0.6}}
+    ]
+    assert parser.feed('tle": "B"}') == [{"title": "B"}]
+    assert parser.feed("]") == []
+    assert parser.done
+
+
+def test_options_wrapper_and_trailing_fields():
+    """Options nested under a key are found; later arrays and fields are only buffered."""
+    text = json.dumps({
+        "options": [{"title": "Roll {now}", "reasoning": 'say "hi" ]'}, {"title": "Level"}],
+        "general_advice": "Play [strong] boards.",
+        "extra": [{"title": "ignored"}],
+    })
+    parser = JsonArrayItemParser()
+    items = feed_chars(parser, text)
+
+    assert [item["title"] for item in items] == ["Roll {now}", "Level"]
+    assert json.loads(parser.text)["general_advice"] == "Play [strong] boards."
+
+
+def test_malformed_items_are_skipped():
+    """An item that is not valid JSON does not stop later items."""
+    parser = JsonArrayItemParser()
+    assert feed_chars(parser, '[{"a": 1,}, {"b": 2}]') == [{"b": 2}]
+
+
+def test_sse_event_format():
+    assert sse_event("option", {"rank": 1}) == 'event: option\ndata: {"rank": 1}\n\n'
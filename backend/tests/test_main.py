@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.core.config import settings
+
+
+def test_import_defers_heavy_modules():
+    """Importing the app does not load chromadb or the OpenAI client."""
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('chromadb', 'openai', 'onnxruntime') if m in sys.modules))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.strip()
+
+    assert loaded == ""
+
+
+@pytest.mark.asyncio
+async def test_lifespan_provides_services(tmp_path, monkeypatch):
+    """Services are built once at startup and injected into endpoints."""
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_path", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(settings, "match_data_cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "match_store_dir", str(tmp_path / "match_store"))
+    monkeypatch.setattr(settings, "stats_aggregate_dir", str(tmp_path / "stats"))
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        services = app.state.services
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/health")
+
+        assert response.status_code == 200
+        assert response.json()["database_connected"] is True
+        assert services.rag_service.vector_store is services.vector_store
@@ -0,0 +1,122 @@
+import pytest
+
+from app.models.schemas import MatchData
+from app.services.match_store import JsonMatchStore, SegmentMatchStore
+from app.utils.migrate_match_cache import migrate_match_cache
+
+
+def make_match(match_id, set_number=12, placements=(1, 2)):
+    """Create a small match with one unit per participant."""
+    return MatchData(
+        match_id=match_id,
+        game_datetime=0,
+        game_length=2000.0,
+        tft_set_number=set_number,
+        participants=[
+            {
+                "placement": placement,
+                "augments": ["Jeweled Lotus"],
+                "units": [{"character_id": "Ashe", "itemNames": ["Guinsoo"]}],
+            }
+            for placement in placements
+        ]
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a segment store with tiny segments to exercise rollover."""
+    store = SegmentMatchStore(tmp_path / "store", segment_max_bytes=200)
+    yield store
+    store.close()
+
+
+def test_put_and_get(store):
+    """Test point lookups through the ID index."""
+    store.put(make_match("NA1_1"))
+    store.put(make_match("NA1_2", set_number=11))
+
+    assert "NA1_1" in store
+    assert len(store) == 2
+    assert store.get("NA1_2").tft_set_number == 11
+    assert store.get("NA1_missing") is None
+
+
+def test_put_is_idempotent(store):
+    """Test that storing a known match does not duplicate it."""
+    store.put(make_match("NA1_1"))
+    store.put(make_match("NA1_1"))
+
+    assert [m.match_id for m in store.scan()] == ["NA1_1"]
+
+
+def test_json_put_keeps_stored_match(tmp_path):
+    """Test that the legacy store does not rewrite a known match."""
+    store = JsonMatchStore(tmp_path / "matches")
+    store.put(make_match("NA1_1"))
+    store.put(make_match("NA1_1", placements=(8,)))
+
+    assert len(store) == 1
+    assert [p["placement"] for p in store.get("NA1_1").participants] == [1, 2]
+
+
+def test_scan_is_partitioned_by_set(store):
+    """Test that scans can be restricted to one set partition."""
+    for i in range(5):
+        store.put(make_match(f"NA1_{i}", set_number=12 if i % 2 else 11))
+
+    assert store.partitions() == ["set_11", "set_12"]
+    assert sorted(m.match_id for m in store.scan(set_number=12)) == ["NA1_1", "NA1_3"]
+    assert len(list(store.scan())) == 5
+    # Tiny segment size forces several segments per partition
+    assert len(list((store.root / "set_11").glob("segment_*.bin"))) > 1
+
+
+def test_scan_columns(store):
+    """Test the column-oriented scan: per-match IDs, per-participant columns and offsets."""
+    store.put(make_match("NA1_1", placements=(1, 5)))
+    store.put(make_match("NA1_2", placements=(3,)))
+
+    batches = list(store.scan_columns(batch_size=1, columns=("placement",)))
+
+    assert batches[0] == {"match_id": ["NA1_1"], "tft_set_number": [12], "offsets": [0, 2], "placement": [1, 5]}
+    assert batches[1] == {"match_id": ["NA1_2"], "tft_set_number": [12], "offsets": [0, 1], "placement": [3]}
+
+
+def test_reopen_loads_index(tmp_path):
+    """Test that a reopened store finds previously written matches."""
+    store = SegmentMatchStore(tmp_path / "store")
+    store.put(make_match("NA1_1"))
+    store.close()
+
+    reopened = SegmentMatchStore(tmp_path / "store")
+    reopened.put(make_match("NA1_2"))
+
+    assert reopened.get("NA1_1").match_id == "NA1_1"
+    assert len(list(reopened.scan())) == 2
+    reopened.close()
+
+
+def test_migrate_json_cache(tmp_path):
+    """Test migrating the legacy JSON cache into a segment store."""
+    legacy = JsonMatchStore(tmp_path / "cache")
+    legacy.put(make_match("NA1_1"))
+    legacy.put(make_match("NA1_2"))
+
+    migrate_match_cache(tmp_path / "cache", tmp_path / "store")
+
+    store = SegmentMatchStore(tmp_path / "store")
+    assert sorted(store.ids()) == ["NA1_1", "NA1_2"]
+    store.close()
+
+
+def test_iter_batches(store):
+    """Test streaming raw matches in bounded batches."""
+    for i in range(5):
+        store.put(make_match(f"NA1_{i}"))
+
+    batches = list(store.iter_batches(2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    batches = list(store.iter_batches(2, match_ids=["NA1_4", "NA1_missing", "NA1_0"]))
+    assert [[m["match_id"] for m in batch] for batch in batches] == [["NA1_4", "NA1_0"]]
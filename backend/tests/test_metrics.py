@@ -0,0 +1,107 @@
+import httpx
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.rag_service import RAGService
+from app.services.riot_client import RiotAPIClient
+from app.services.riot_replay import FixtureArchive, RiotStandIn
+from benchmarks.fakes import FakeChatClient, FakeVectorStore, make_snapshot
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Enable metrics, starting from empty values."""
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def test_render_prometheus_text(enabled):
+    """Counters and histograms render in the Prometheus text format."""
+    registry = metrics.Registry()
+    requests = metrics.Counter("test_requests", "Requests", ("status",), registry=registry)
+    latency = metrics.Histogram("test_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+
+    requests.inc(status="200")
+    requests.inc(2, status="429")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+    text = registry.render()
+
+    assert "# TYPE tft_advisor_test_requests counter" in text
+    assert 'tft_advisor_test_requests_total{status="429"} 2.0' in text
+    assert 'tft_advisor_test_seconds_bucket{le="0.1"} 1' in text
+    assert 'tft_advisor_test_seconds_bucket{le="1.0"} 2' in text
+    assert 'tft_advisor_test_seconds_bucket{le="+Inf"} 3' in text
+    assert "tft_advisor_test_seconds_sum 5.55" in text
+    assert "tft_advisor_test_seconds_count 3" in text
+
+
+def test_disabled_records_nothing(monkeypatch):
+    """With metrics disabled, updates are dropped and timers are no-ops."""
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    registry = metrics.Registry()
+    counter = metrics.Counter("test_disabled", "Disabled", registry=registry)
+    histogram = metrics.Histogram("test_disabled_seconds", "Disabled", registry=registry)
+
+    counter.inc()
+    with histogram.time():
+        pass
+
+    assert counter.value() == 0
+    assert histogram.count() == 0
+
+
+@pytest.mark.asyncio
+async def test_advice_records_stages(enabled):
+    """An advice request records retrieval, context build, LLM and token metrics."""
+    vector_store = FakeVectorStore(query_latency=0)
+    rag = RAGService(vector_store, FakeChatClient(latency=0))
+    await rag.generate_advice(make_snapshot())
+    vector_store.close()
+
+    for stage in ("retrieval", "context_build", "llm_options", "llm_general_advice"):
+        assert metrics.ADVICE_STAGE_SECONDS.count(stage=stage) == 1
+    for operation in ("embed", "compositions", "augments", "playbooks"):
+        assert metrics.VECTOR_STORE_SECONDS.count(operation=operation) == 1
+    assert metrics.ADVICE_SECONDS.count(mode="llm", source="llm") == 1
+    assert metrics.CONTEXT_TOKENS.count() == 1
+    assert metrics.LLM_TOKENS.value(model=rag.model, kind="completion") > 0
+
+
+@pytest.mark.asyncio
+async def test_riot_client_counts_429s(enabled, monkeypatch):
+    """Riot responses are counted by status, and 429s by limit type."""
+    monkeypatch.setattr(settings, "riot_max_retries", 10)
+    archive = FixtureArchive()
+    archive.add_json("americas.api.riotgames.com", "/tft/match/v1/matches/by-puuid/p/ids", ["NA1_1"], query="start=0&count=1")
+    stand_in = RiotStandIn(archive, throttle_probability=0.5, retry_after=0.01, seed=1)
+    async with RiotAPIClient(api_key="test", transport=httpx.ASGITransport(app=stand_in)) as client:
+        for _ in range(4):
+            await client.get_match_ids_by_puuid("p", count=1)
+
+    method = "match-v1.ids-by-puuid"
+    assert metrics.RIOT_REQUESTS.value(method=method, status="200") == 4
+    assert metrics.RIOT_RATE_LIMITED.value(method=method, type="service") == stand_in.stats["throttled"] > 0
+    assert metrics.RIOT_REQUEST_SECONDS.count(method=method) == stand_in.stats["requests"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(monkeypatch):
+    """/metrics serves the registry when enabled and 404s otherwise."""
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        monkeypatch.setattr(settings, "metrics_enabled", False)
+        assert (await client.get("/metrics")).status_code == 404
+
+        monkeypatch.setattr(settings, "metrics_enabled", True)
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE tft_advisor_advice_stage_seconds histogram" in response.text
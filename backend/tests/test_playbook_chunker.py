@@ -0,0 +1,55 @@
+from app.services.playbook_chunker import Playbook, playbook_source, split_markdown
+
+PLAYBOOK = """# Early Game Strategy
+
+## Economy Management
+- Natural level to 4
+- Save to 50 gold
+
+## Streaking
+
+### Win Streak
+Buy XP to keep your board strong.
+
+### Lose Streak
+Keep 1-2 units on board.
+
+```
+# not a heading inside code
+```
+"""
+
+
+def test_split_on_headings_with_breadcrumbs():
+    """Each headed section becomes a chunk prefixed with its heading path."""
+    chunks = split_markdown(PLAYBOOK)
+
+    assert [chunk.heading_path for chunk in chunks] == [
+        ["Early Game Strategy", "Economy Management"],
+        ["Early Game Strategy", "Streaking", "Win Streak"],
+        ["Early Game Strategy", "Streaking", "Lose Streak"],
+    ]
+    assert chunks[0].text == "Early Game Strategy > Economy Management\n- Natural level to 4\n- Save to 50 gold"
+    assert "# not a heading inside code" in chunks[2].body
+    assert [chunk.index for chunk in chunks] == [0, 1, 2]
+
+
+def test_long_sections_are_split():
+    """Sections over the size limit are split on paragraph boundaries."""
+    body = "\n\n".join(f"Paragraph {i} " + "x" * 80 for i in range(10))
+    chunks = split_markdown(f"## Long\n{body}", max_chars=300)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.body) <= 300 for chunk in chunks)
+    assert all(chunk.section == "Long" for chunk in chunks)
+    assert "Paragraph 9" in chunks[-1].body
+
+
+def test_text_before_first_heading_is_kept():
+    chunks = split_markdown("Intro line.\n# Title\nBody.")
+    assert chunks[0].heading_path == [] and chunks[0].text == "Intro line."
+
+
+def test_playbook_identity():
+    assert playbook_source("Fast 8 / Econ!") == "fast_8_econ"
+    assert Playbook("a", "A", "text").content_hash != Playbook("a", "A", "text2").content_hash
@@ -0,0 +1,110 @@
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.endpoints import router
+from app.core.config import settings
+from app.core.profiling import Profile, ProfileStore, ProfilingMiddleware
+
+TOKEN = "s3cret"
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    """An app with the profiling middleware and a slow endpoint it profiles."""
+    monkeypatch.setattr(settings, "profiling_admin_token", TOKEN)
+    monkeypatch.setattr(settings, "profiling_paths", "/api/slow")
+    monkeypatch.setattr(settings, "profiling_interval", 0.001)
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(router, prefix="/api")
+    app.state.services = SimpleNamespace(profile_store=ProfileStore(tmp_path / "profiles"))
+
+    @app.get("/api/slow")
+    async def slow():
+        busy_work(0.05)
+        return {"ok": True}
+
+    return app
+
+
+def client_for(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_request_with_token_is_profiled(profiled_app):
+    """A request carrying the token gets a stored, downloadable profile."""
+    async with client_for(profiled_app) as client:
+        response = await client.get("/api/slow", headers={"X-Profile-Token": TOKEN})
+        profile_id = response.headers["X-Profile-Id"]
+
+        listed = await client.get("/api/profiles", headers={"X-Profile-Token": TOKEN})
+        tree = await client.get(f"/api/profiles/{profile_id}", headers={"X-Profile-Token": TOKEN})
+        folded = await client.get(
+            f"/api/profiles/{profile_id}", params={"format": "folded"}, headers={"X-Profile-Token": TOKEN}
+        )
+
+    assert response.json() == {"ok": True}
+    assert [summary["id"] for summary in listed.json()] == [profile_id]
+
+    data = tree.json()
+    assert data["path"] == "/api/slow"
+    assert data["wall_time"] >= 0.05
+    assert data["samples"] > 0
+    assert "busy_work" in json.dumps(data["threads"]["event loop"])
+    assert "busy_work" in folded.text
+
+
+@pytest.mark.asyncio
+async def test_requests_without_valid_token_are_not_profiled(profiled_app, monkeypatch):
+    """Missing, wrong or query-string tokens, unsampled requests and a disabled hook leave no profile."""
+    async with client_for(profiled_app) as client:
+        plain = await client.get("/api/slow")
+        wrong = await client.get("/api/slow", headers={"X-Profile-Token": "nope"})
+        query = await client.get("/api/slow", params={"profile": TOKEN})
+        monkeypatch.setattr(settings, "profiling_sample_rate", 0.0)
+        unsampled = await client.get("/api/slow", headers={"X-Profile-Token": TOKEN})
+        forbidden = await client.get("/api/profiles", headers={"X-Profile-Token": "nope"})
+        query_download = await client.get("/api/profiles", params={"profile": TOKEN})
+
+        monkeypatch.setattr(settings, "profiling_admin_token", "")
+        disabled = await client.get("/api/profiles", headers={"X-Profile-Token": ""})
+
+    for response in (plain, wrong, query, unsampled):
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+    assert forbidden.status_code == query_download.status_code == 403
+    assert disabled.status_code == 404
+    assert profiled_app.state.services.profile_store.list() == []
+
+
+def test_store_keeps_newest_profiles(tmp_path):
+    """The store prunes old profiles and rejects ids that are not profile ids."""
+    store = ProfileStore(tmp_path, max_profiles=2)
+    for second in range(3):
+        store.save(Profile(
+            id=f"20260101T00000{second}-0000000{second}",
+            method="POST",
+            path="/api/advice",
+            started_at="",
+            interval=0.005,
+            stacks={"event loop": {("main",): 1}}
+        ))
+
+    assert [summary["id"] for summary in store.list()] == ["20260101T000002-00000002", "20260101T000001-00000001"]
+    with pytest.raises(KeyError):
+        store.path("20260101T000000-00000000")
+    with pytest.raises(KeyError):
+        store.path("../../etc/passwd")
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.advice_cache import AdviceCache, MemoryAdviceCacheBackend
+from app.services.rag_service import FALLBACK_GENERAL_ADVICE, RAGService
+from benchmarks.fakes import FakeChatClient, FakeVectorStore, make_snapshot
+
+
+class ThreadRecordingVectorStore(FakeVectorStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.threads = set()
+
+    def _results(self, kind, n_results):
+        self.threads.add(threading.current_thread().name)
+        return super()._results(kind, n_results)
+
+
+@pytest.mark.asyncio
+async def test_generate_advice_uses_retrieval_and_llm():
+    """Advice combines retrieved context with parsed LLM options."""
+    vector_store = FakeVectorStore(query_latency=0)
+    llm = FakeChatClient(latency=0)
+    rag = RAGService(vector_store, llm)
+
+    advice = await rag.generate_advice(make_snapshot())
+
+    assert [option.title for option in advice.options] == ["Roll for Upgrades", "Greed to Level 8"]
+    assert advice.general_advice
+    assert advice.retrieved_context
+    assert vector_store.queries == 3
+    assert vector_store.embeddings == 1
+    assert llm.calls == 2
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_vector_queries_run_off_the_event_loop():
+    """Chroma queries run on the vector store's threads, so the loop stays responsive."""
+    vector_store = ThreadRecordingVectorStore(query_latency=0.05)
+    rag = RAGService(vector_store, FakeChatClient(latency=0))
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(rag.generate_advice(make_snapshot()) for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    task.cancel()
+
+    assert all(name.startswith("vector-store") for name in vector_store.threads)
+    # 12 queries of 50ms each would take 0.6s if they ran back to back on the loop
+    assert elapsed < 0.4
+    assert ticks > 10
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, calls", [("sequential", 2), ("concurrent", 2), ("merged", 1)])
+async def test_generation_modes(monkeypatch, mode, calls):
+    """Every generation mode yields options and general advice."""
+    monkeypatch.setattr(settings, "advice_generation_mode", mode)
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    llm = FakeChatClient(latency=0.05)
+    rag = RAGService(vector_store, llm)
+
+    start = time.perf_counter()
+    advice = await rag.generate_advice(make_snapshot())
+    elapsed = time.perf_counter() - start
+
+    assert llm.calls == calls
+    assert len(advice.options) == 2
+    assert advice.general_advice
+    if mode != "sequential":
+        assert elapsed < 0.1
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_merged_mode_falls_back_on_bad_json(monkeypatch):
+    """A malformed merged completion falls back to stats-only options and advice."""
+    monkeypatch.setattr(settings, "advice_generation_mode", "merged")
+    llm = FakeChatClient(latency=0)
+
+    async def broken(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="not json"))])
+
+    llm.chat.completions.create = broken
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    advice = await RAGService(vector_store, llm).generate_advice(make_snapshot())
+
+    assert advice.generated_by == "fast"
+    assert advice.options[0].title.startswith("Play ")
+    assert advice.general_advice != FALLBACK_GENERAL_ADVICE
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["concurrent", "merged"])
+async def test_stream_advice_emits_context_before_generation(monkeypatch, mode):
+    """Context arrives after retrieval, options before general advice, and done carries everything."""
+    monkeypatch.setattr(settings, "advice_generation_mode", mode)
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    rag = RAGService(vector_store, FakeChatClient(latency=0.2))
+
+    start = time.perf_counter()
+    events = []
+    async for event, data in rag.stream_advice(make_snapshot()):
+        events.append((event, data, time.perf_counter() - start))
+
+    names = [event for event, _, _ in events]
+    assert names == ["context", "option", "option", "general_advice", "done"]
+    assert events[0][2] < 0.1
+    # The first option is parsed well before the completion finishes
+    assert events[1][2] < events[2][2]
+    assert events[1][1]["title"] == "Roll for Upgrades"
+    assert events[3][1]["general_advice"]
+
+    done = events[-1][1]
+    assert [option["title"] for option in done["options"]] == ["Roll for Upgrades", "Greed to Level 8"]
+    assert done["retrieved_context"] == events[0][1]["retrieved_context"]
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_advice_falls_back_when_llm_fails():
+    """A failing stream still yields stats-only options and general advice."""
+    llm = FakeChatClient(latency=0)
+
+    async def failing(**kwargs):
+        raise RuntimeError("upstream unavailable")
+
+    llm.chat.completions.create = failing
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    events = [event async for event in RAGService(vector_store, llm).stream_advice(make_snapshot())]
+
+    assert [name for name, _ in events] == ["context", "option", "option", "option", "general_advice", "done"]
+    assert events[1][1]["title"].startswith("Play ")
+    assert events[4][1]["general_advice"] != FALLBACK_GENERAL_ADVICE
+    assert events[-1][1]["generated_by"] == "fast"
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_fast_mode_skips_llm():
+    """mode=fast ranks options from stats without calling the LLM or the cache."""
+    llm = FakeChatClient(latency=0)
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    cache = AdviceCache(MemoryAdviceCacheBackend())
+    rag = RAGService(vector_store, llm, advice_cache=cache)
+
+    advice = await rag.generate_advice(make_snapshot(), mode="fast")
+
+    assert llm.calls == 0
+    assert len(cache.backend) == 0
+    assert advice.generated_by == "fast"
+    assert [option.rank for option in advice.options] == [1, 2, 3]
+    vector_store.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_llm_falls_back_to_fast_advice(monkeypatch):
+    """An LLM slower than the latency budget is abandoned for stats-only advice."""
+    monkeypatch.setattr(settings, "llm_latency_budget", 0.1)
+    vector_store = FakeVectorStore(query_latency=0, embed_latency=0)
+    cache = AdviceCache(MemoryAdviceCacheBackend())
+    rag = RAGService(vector_store, FakeChatClient(latency=1.0), advice_cache=cache)
+
+    start = time.perf_counter()
+    advice = await rag.generate_advice(make_snapshot())
+
+    assert time.perf_counter() - start < 0.5
+    assert advice.generated_by == "fast"
+    # Stats-only answers are not cached, so the next request tries the LLM again
+    assert len(cache.backend) == 0
+    vector_store.close()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.rate_limiter import (
+    RateLimitBucket,
+    RateLimitWindow,
+    RiotRateLimiter,
+    parse_rate_limit_header,
+)
+
+
+def test_parse_rate_limit_header():
+    """Test parsing Riot rate limit headers."""
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1.0), (100, 120.0)]
+    assert parse_rate_limit_header("") == []
+    assert parse_rate_limit_header("bogus,5:10") == [(5, 10.0)]
+
+
+def test_window_wait_time():
+    """Test that a full window reports the time until its oldest request expires."""
+    window = RateLimitWindow(limit=2, seconds=1.0)
+    window.record(0.0)
+    window.record(0.5)
+
+    assert window.wait_time(0.6) == pytest.approx(0.4)
+    assert window.wait_time(1.1) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_respects_stacked_windows():
+    """Test that no more than the allowed number of requests start per window."""
+    limiter = RiotRateLimiter([(5, 0.2), (8, 1.0)])
+    limiter.update_from_headers("match", {})
+
+    starts = []
+
+    async def request():
+        await limiter.acquire("match")
+        starts.append(time.monotonic())
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert len(starts) == 10
+    starts.sort()
+    # Short window: the 6th request waits for the first to age out
+    assert starts[5] - starts[0] >= 0.2
+    # Long window: the 9th request waits a full second
+    assert starts[8] - starts[0] >= 1.0
+
+
+@pytest.mark.asyncio
+async def test_headers_update_limits():
+    """Test that response headers replace the configured limits."""
+    limiter = RiotRateLimiter([(20, 1.0)])
+    await limiter.acquire("match")
+    limiter.update_from_headers("match", {
+        "X-App-Rate-Limit": "500:10,30000:600",
+        "X-Method-Rate-Limit": "250:10",
+    })
+
+    assert limiter.app.limits == [(500, 10.0), (30000, 600.0)]
+    assert limiter.methods["match"].limits == [(250, 10.0)]
+    # The probe request counts against the newly learned method window
+    assert len(limiter.methods["match"].windows[0]._timestamps) == 1
+
+
+@pytest.mark.asyncio
+async def test_one_probe_while_the_lock_is_contended():
+    """Test that callers queued on the lock do not both probe an unknown method."""
+    limiter = RiotRateLimiter([(20, 1.0)])
+    async with limiter._lock:
+        first = asyncio.create_task(limiter.acquire("match"))
+        second = asyncio.create_task(limiter.acquire("match"))
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(0.01)
+    assert [first.done(), second.done()] == [True, False]
+
+    limiter.update_from_headers("match", {})
+    await asyncio.wait_for(second, 1.0)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_blocks_application_bucket():
+    """Test that an application 429 blocks every method until Retry-After."""
+    limiter = RiotRateLimiter([(100, 1.0)])
+    retry_after = limiter.on_rate_limited("match", {
+        "Retry-After": "0.2",
+        "X-Rate-Limit-Type": "application",
+    })
+    assert retry_after == 0.2
+
+    start = time.monotonic()
+    await limiter.acquire("league")
+    assert time.monotonic() - start >= 0.15
+
+
+def test_changed_window_keeps_spent_requests():
+    """Test that requests already made count against windows whose duration changed."""
+    bucket = RateLimitBucket([(5, 1.0)])
+    now = time.monotonic()
+    for _ in range(4):
+        bucket.record(now)
+
+    # Mid-burst, the header reports different windows
+    bucket.set_limits([(5, 2.0), (10, 10.0)])
+    assert [window.count(now) for window in bucket.windows] == [4, 4]
+
+    bucket.record(now)
+    assert bucket.wait_time(now) > 0
@@ -0,0 +1,127 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.data_ingestion import DataIngestionService
+from app.services.riot_client import RiotAPIClient
+from app.services.riot_replay import FixtureArchive, RecordingTransport, RiotStandIn, route_method
+from benchmarks.bench_ingestion_replay import build_riot_archive
+
+MATCH = {
+    "metadata": {"match_id": "NA1_1"},
+    "info": {"game_datetime": 0, "game_length": 2000.0, "tft_set_number": 12, "participants": []},
+}
+
+
+def make_archive(path=None):
+    archive = FixtureArchive(path)
+    archive.add_json("americas.api.riotgames.com", "/tft/match/v1/matches/NA1_1", MATCH)
+    return archive
+
+
+def make_client(stand_in):
+    return RiotAPIClient(api_key="test", transport=httpx.ASGITransport(app=stand_in))
+
+
+def test_route_method():
+    """Test that paths map to the rate limit methods the client acquires."""
+    assert route_method("/tft/match/v1/matches/NA1_1") == "match-v1.match"
+    assert route_method("/tft/match/v1/matches/by-puuid/abc/ids") == "match-v1.ids-by-puuid"
+    assert route_method("/tft/league/v1/master") == "league-v1.master"
+
+
+def test_archive_roundtrip(tmp_path):
+    """Test that archived responses survive a reload and match on path alone."""
+    make_archive(tmp_path / "fixtures.jsonl")
+    archive = FixtureArchive(tmp_path / "fixtures.jsonl")
+
+    assert len(archive) == 1
+    assert archive.get("americas.api.riotgames.com", "/tft/match/v1/matches/NA1_1") is not None
+    assert archive.get("127.0.0.1", "/tft/match/v1/matches/NA1_1") is not None
+    assert archive.get("127.0.0.1", "/tft/match/v1/matches/NA1_2") is None
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay(tmp_path):
+    """Test that recorded responses can be replayed without the original server."""
+    archive = FixtureArchive(tmp_path / "fixtures.jsonl")
+    upstream = httpx.ASGITransport(app=RiotStandIn(make_archive()))
+    async with RiotAPIClient(api_key="secret", transport=RecordingTransport(archive, upstream)) as client:
+        await client.get_match_details("NA1_1")
+
+    assert "secret" not in (tmp_path / "fixtures.jsonl").read_text()
+    async with make_client(RiotStandIn(FixtureArchive(tmp_path / "fixtures.jsonl"))) as client:
+        match = await client.get_match_details("NA1_1")
+    assert match.match_id == "NA1_1"
+
+
+@pytest.mark.asyncio
+async def test_injected_429_is_retried(monkeypatch):
+    """Test that injected 429s are retried after their Retry-After."""
+    monkeypatch.setattr(settings, "riot_max_retries", 10)
+    stand_in = RiotStandIn(make_archive(), throttle_probability=0.5, retry_after=0.01, seed=1)
+    async with make_client(stand_in) as client:
+        for _ in range(5):
+            await client.get_match_details("NA1_1")
+
+    assert stand_in.stats["ok"] == 5
+    assert stand_in.stats["throttled"] > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_reach_the_client():
+    """Test that the stand-in's rate limit headers replace the client's limits."""
+    stand_in = RiotStandIn(make_archive(), app_rate_limit="50:1", method_rate_limit="7:10")
+    async with make_client(stand_in) as client:
+        await client.get_match_details("NA1_1")
+        limiter = client._get_rate_limiter(client.base_url)
+
+    assert limiter.app.limits == [(50, 1.0)]
+    assert limiter.methods["match-v1.match"].limits == [(7, 10.0)]
+
+
+def test_enforced_limit_returns_429():
+    """Test that requests beyond the enforced limit are rejected like the real API."""
+    stand_in = RiotStandIn(make_archive(), app_rate_limit="2:10")
+    statuses = [stand_in.respond("localhost", "/tft/match/v1/matches/NA1_1")[0] for _ in range(3)]
+    _, headers, _ = stand_in.respond("localhost", "/tft/match/v1/matches/NA1_1")
+
+    assert statuses == [200, 200, 429]
+    assert headers["X-Rate-Limit-Type"] == "application"
+    assert float(headers["Retry-After"]) > 0
+    assert headers["X-App-Rate-Limit-Count"] == "2:10"
+
+
+@pytest.mark.asyncio
+async def test_missing_entry_is_404():
+    """Test that requests without a recorded response get a 404."""
+    async with make_client(RiotStandIn(make_archive())) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_match_details("NA1_2")
+
+
+@pytest.mark.asyncio
+async def test_replay_mode_uses_the_archive(tmp_path, monkeypatch):
+    """Test that riot_fixture_mode=replay serves the archive in-process."""
+    make_archive(tmp_path / "fixtures.jsonl")
+    monkeypatch.setattr(settings, "riot_fixture_mode", "replay")
+    monkeypatch.setattr(settings, "riot_fixture_path", str(tmp_path / "fixtures.jsonl"))
+
+    async with RiotAPIClient(api_key="test") as client:
+        match = await client.get_match_details("NA1_1")
+    assert match.match_id == "NA1_1"
+
+
+@pytest.mark.asyncio
+async def test_synthetic_crawl_replays(tmp_path, monkeypatch):
+    """Test that a high ELO crawl completes against a synthetic archive."""
+    monkeypatch.setattr(settings, "match_store_dir", str(tmp_path / "store"))
+    stand_in = RiotStandIn(build_riot_archive(players=4, matches_per_player=4), app_rate_limit="500:1")
+    async with make_client(stand_in) as client:
+        ingestion = DataIngestionService(riot_client=client)
+        matches = await ingestion.ingest_high_elo_matches(max_players=4, matches_per_player=4)
+        ingestion.close()
+
+    # Four players sharing half their matches with the previous one
+    assert len(matches) == 10
+    assert stand_in.stats["not_found"] == 0
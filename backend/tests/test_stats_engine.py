@@ -0,0 +1,152 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.services.match_store import SegmentMatchStore
+from app.services.parallel_stats import ParallelStatsRunner
+from app.services.stats_aggregates import StatsAggregateStore
+from app.services.stats_engine import StatsAggregate, StatsEngine, comp_name
+from benchmarks import legacy_stats
+from benchmarks.synthetic import generate_matches
+
+
+@pytest.fixture(scope="module")
+def matches():
+    """Generate a mixed-set corpus so set filtering is exercised."""
+    return generate_matches(300, seed=1) + generate_matches(20, seed=2, set_number=11)
+
+
+def test_comp_stats_match_legacy(matches):
+    """Test that engine comp stats are identical to the row-by-row computation."""
+    comp_stats, _ = StatsEngine().compute_stats(matches, "12.1")
+
+    assert comp_stats
+    assert comp_stats == legacy_stats.compute_comp_stats(matches, "12.1")
+
+
+def test_augment_stats_match_legacy(matches):
+    """Test that engine augment stats are identical to the row-by-row computation."""
+    _, augment_stats = StatsEngine().compute_stats(matches, "12.1")
+
+    assert augment_stats
+    assert augment_stats == legacy_stats.compute_augment_stats(matches, "12.1")
+
+
+def test_accepts_raw_dicts(matches):
+    """Test that raw match dicts give the same result as MatchData."""
+    engine = StatsEngine()
+
+    assert (
+        engine.compute_stats([m.dict() for m in matches], "12.1")
+        == engine.compute_stats(matches, "12.1")
+    )
+
+
+def test_column_batches_match_rows(matches, tmp_path):
+    """Test that aggregating store column batches equals aggregating the matches."""
+    store = SegmentMatchStore(tmp_path / "store")
+    store.put_many(matches)
+    engine = StatsEngine()
+
+    columnar = engine.aggregate_columns(store.scan_columns(batch_size=64), "12.1")
+    store.close()
+
+    assert columnar.to_dict() == engine.aggregate(matches, "12.1").to_dict()
+
+
+def test_duplicate_champions_keep_last_items():
+    """Test the extract_items rule that the last copy of a champion wins."""
+    match = {
+        "match_id": "NA1_1",
+        "tft_set_number": 12,
+        "participants": [
+            {
+                "placement": 1,
+                "augments": [],
+                "units": [
+                    {"character_id": "Ashe", "itemNames": ["A"]},
+                    {"character_id": "Ashe", "itemNames": ["B"]},
+                ],
+            }
+        ] * 5,
+    }
+
+    comp_stats, _ = StatsEngine().compute_stats([match], "12.1")
+
+    assert comp_stats[0].key_items == {"Ashe": ["B"]}
+
+
+def test_incremental_fold_matches_full_computation(matches):
+    """Test that folding batches gives the same stats as one full pass."""
+    engine = StatsEngine()
+    full = engine.aggregate(matches, "12.1")
+
+    incremental = StatsAggregate(patch="12.1")
+    assert engine.fold(incremental, matches[:100]) == 100
+    assert engine.fold(incremental, matches[100:]) == len(matches) - 100
+
+    assert incremental.comp_stats() == full.comp_stats()
+    assert incremental.augment_stats() == full.augment_stats()
+
+
+def test_fold_never_counts_a_match_twice(matches):
+    """Test that already covered matches are skipped."""
+    engine = StatsEngine()
+    aggregate = engine.aggregate(matches[:50], "12.1")
+
+    assert engine.fold(aggregate, matches[:60]) == 10
+    assert aggregate.matches_seen == 60
+
+
+def test_aggregate_store_roundtrip(matches, tmp_path):
+    """Test that persisted aggregates materialize identical stats."""
+    aggregate = StatsEngine().aggregate(matches, "12.1")
+    store = StatsAggregateStore(tmp_path)
+    store.save(aggregate)
+
+    loaded = store.load("12.1")
+
+    assert loaded.watermark == aggregate.watermark
+    assert store.covered_ids("12.1") == aggregate.covered_ids
+    assert loaded.comp_stats() == aggregate.comp_stats()
+    assert loaded.augment_stats() == aggregate.augment_stats()
+    with pytest.raises(ValueError):
+        store.load("../escape")
+
+
+@pytest.mark.asyncio
+async def test_parallel_shards_match_serial(matches, tmp_path):
+    """Test that merging per-process shard aggregates equals a serial pass."""
+    store = SegmentMatchStore(tmp_path / "store")
+    store.put_many(matches)
+    match_ids = list(store.ids())
+
+    runner = ParallelStatsRunner(workers=2)
+    try:
+        parallel = await runner.aggregate(store, match_ids, "12.1")
+    finally:
+        runner.shutdown()
+        store.close()
+    serial = StatsEngine().aggregate(matches, "12.1")
+
+    assert parallel.covered_ids == serial.covered_ids
+    assert parallel.comp_stats() == serial.comp_stats()
+    assert parallel.augment_stats() == serial.augment_stats()
+
+
+def test_comp_names_are_stable_across_processes():
+    """Comp names do not depend on the per-process string hash seed."""
+    code = "from app.services.stats_engine import comp_name; print(comp_name(('Ahri', 'Jinx', 'Vi')))"
+    names = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env={"PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+
+    assert names == {comp_name(("Ahri", "Jinx", "Vi"))}
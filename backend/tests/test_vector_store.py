@@ -1,9 +1,24 @@
 import pytest
 from unittest.mock import Mock, AsyncMock
+from app.core.config import settings
 from app.services.vector_store import VectorStoreService
 from app.models.schemas import CompStats, AugmentStats
 
 
+class CountingEmbeddingFunction:
+    """Deterministic bag-of-letters embedding that counts embedded texts."""
+    
+    def __init__(self):
+        self.texts = []
+    
+    def __call__(self, input):
+        self.texts.extend(input)
+        return [
+            [float(text.lower().count(letter)) for letter in "abcdefghijklmnopqrstuvwxyz"]
+            for text in input
+        ]
+
+
 @pytest.fixture
 def vector_store():
     """Create a vector store instance for testing."""
@@ -58,3 +73,208 @@ def test_add_playbook(vector_store):
     
     # Should not raise an exception
     vector_store.add_playbook(title, content, tags)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_embeds_query_once(tmp_path, monkeypatch):
+    """A retrieval embeds the query once and uses it for every collection."""
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_path", str(tmp_path / "embeddings.sqlite3"))
+    embedding_function = CountingEmbeddingFunction()
+    store = VectorStoreService(embedding_function=embedding_function)
+    
+    store.add_comp_stats([
+        CompStats(
+            comp_name="Test_Comp",
+            patch="12.1",
+            champions=["Ashe", "Sejuani"],
+            avg_placement=3.5,
+            play_rate=0.15,
+            top4_rate=0.65,
+            win_rate=0.20,
+            sample_size=100
+        )
+    ])
+    store.add_playbook("Reroll", "Roll down at level 6 for three star units.", ["reroll"])
+    embedding_function.texts.clear()
+    
+    result = await store.aretrieve("Ashe Sejuani reroll", n_compositions=1, n_augments=1, n_playbooks=1)
+    
+    assert embedding_function.texts == ["Ashe Sejuani reroll"]
+    assert result.compositions[0]["metadata"]["comp_name"] == "Test_Comp"
+    assert result.augments == []
+    assert result.playbooks[0]["metadata"]["title"] == "Reroll"
+    assert {"embed", "compositions", "augments", "playbooks", "total"} <= set(result.timings)
+    store.close()
+
+
+def make_comp(champions, avg_placement=4.0, patch="12.1"):
+    return CompStats(
+        comp_name="Comp",
+        patch=patch,
+        champions=champions,
+        avg_placement=avg_placement,
+        play_rate=0.1,
+        top4_rate=0.5,
+        win_rate=0.1,
+        sample_size=50
+    )
+
+
+def test_reindex_only_touches_changed_documents(tmp_path, monkeypatch):
+    """Reindexing upserts changed stats, skips unchanged ones and deletes stale ones."""
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    embedding_function = CountingEmbeddingFunction()
+    store = VectorStoreService(embedding_function=embedding_function)
+    
+    first = [make_comp(["Ashe", "Sejuani"]), make_comp(["Ahri", "Jinx"]), make_comp(["Vi", "Ekko"])]
+    assert store.reindex_comp_stats("12.1", first) == {"upserted": 3, "updated": 0, "unchanged": 0, "deleted": 0}
+    store.reindex_comp_stats("12.2", [make_comp(["Ashe", "Sejuani"], patch="12.2")])
+    embedding_function.texts.clear()
+    
+    # One comp unchanged, one with new stats, one gone
+    second = [make_comp(["Ahri", "Jinx"]), make_comp(["Ashe", "Sejuani"], avg_placement=3.0)]
+    assert store.reindex_comp_stats("12.1", second) == {"upserted": 1, "updated": 0, "unchanged": 1, "deleted": 1}
+    assert len(embedding_function.texts) == 1
+    
+    stored = store.comp_collection.get(where={"patch": "12.1"})
+    assert len(stored["ids"]) == 2
+    # Other patches are left alone
+    assert store.comp_collection.count() == 3
+    store.close()
+
+
+def test_comps_differing_by_duplicate_units_get_distinct_ids(tmp_path, monkeypatch):
+    """Comps that only differ in a repeated unit are indexed as separate documents."""
+    from app.services.stats_engine import comp_name
+    
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    store = VectorStoreService(embedding_function=CountingEmbeddingFunction())
+    
+    comps = []
+    for comp in (("Ashe", "Ashe", "Vi"), ("Ashe", "Vi")):
+        stats = make_comp(list(set(comp)))
+        stats.comp_name = comp_name(comp)
+        comps.append(stats)
+    
+    assert store.reindex_comp_stats("12.1", comps)["upserted"] == 2
+    assert store.comp_collection.count() == 2
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_load_playbooks_is_incremental(tmp_path, monkeypatch):
+    """Only changed playbooks are re-chunked, changed chunks re-embedded and removed files dropped."""
+    from app.utils.load_playbooks import load_playbooks
+    
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    embedding_function = CountingEmbeddingFunction()
+    store = VectorStoreService(embedding_function=embedding_function)
+    
+    playbooks_dir = tmp_path / "playbooks"
+    playbooks_dir.mkdir()
+    (playbooks_dir / "reroll.md").write_text("# Reroll\n## When\nLevel 6 at 3-1.\n## How\nSlow roll above 50 gold.\n")
+    (playbooks_dir / "fast8.md").write_text("# Fast 8\n## Econ\nGreed early.\n")
+    
+    result = await load_playbooks(playbooks_dir, store)
+    assert result["upserted"] == 3
+    assert store.playbook_collection.count() == 3
+    
+    embedding_function.texts.clear()
+    assert (await load_playbooks(playbooks_dir, store))["upserted"] == 0
+    assert embedding_function.texts == []
+    
+    (playbooks_dir / "reroll.md").write_text("# Reroll\n## When\nLevel 5 at 2-5.\n## How\nSlow roll above 50 gold.\n")
+    (playbooks_dir / "fast8.md").unlink()
+    result = await load_playbooks(playbooks_dir, store)
+    
+    # The edited section is re-embedded; its sibling only gets the new file hash
+    assert result["upserted"] == 1
+    assert result["updated"] == 1
+    assert result["removed_chunks"] == 1
+    assert embedding_function.texts == ["Reroll > When\nLevel 5 at 2-5."]
+    assert set(store.playbook_hashes()) == {"reroll"}
+    
+    best = store.query_playbooks("Level 5 at 2-5", n_results=1)
+    assert best[0]["document"] == "Reroll > When\nLevel 5 at 2-5."
+    assert best[0]["metadata"]["section"] == "When"
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_load_playbooks_keeps_api_playbooks(tmp_path, monkeypatch):
+    """Playbooks added through the API survive a loader run that has no file for them."""
+    from app.utils.load_playbooks import load_playbooks
+    
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    store = VectorStoreService(embedding_function=CountingEmbeddingFunction())
+    store.add_playbook("Flex Lines", "# Flex\nPlay strongest board.", ["flex"])
+    
+    playbooks_dir = tmp_path / "playbooks"
+    playbooks_dir.mkdir()
+    (playbooks_dir / "reroll.md").write_text("# Reroll\n## When\nLevel 6 at 3-1.\n")
+    result = await load_playbooks(playbooks_dir, store)
+    
+    assert result["removed_chunks"] == 0
+    assert set(store.playbook_hashes()) == {"flex_lines", "reroll"}
+    assert set(store.playbook_hashes(origin="file")) == {"reroll"}
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_file_and_api_playbooks_with_one_source_coexist(tmp_path, monkeypatch):
+    """An API playbook titled like a playbook file neither overwrites it nor is removed with it."""
+    from app.utils.load_playbooks import load_playbooks
+    
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    store = VectorStoreService(embedding_function=CountingEmbeddingFunction())
+    
+    playbooks_dir = tmp_path / "playbooks"
+    playbooks_dir.mkdir()
+    (playbooks_dir / "reroll.md").write_text("# Reroll\n## When\nLevel 6 at 3-1.\n")
+    await load_playbooks(playbooks_dir, store)
+    store.add_playbook("Reroll", "Roll down at level 6.", ["reroll"])
+    assert store.playbook_collection.count() == 2
+    assert store.playbook_hashes(origin="file") != store.playbook_hashes(origin="api")
+    
+    (playbooks_dir / "reroll.md").unlink()
+    result = await load_playbooks(playbooks_dir, store)
+    
+    assert result["removed_chunks"] == 1
+    assert store.playbook_collection.get(include=["documents"])["documents"] == ["Roll down at level 6."]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_board_retrieval_reranks_by_overlap(tmp_path, monkeypatch):
+    """Comps sharing the board's units are found exactly and ranked first."""
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    store = VectorStoreService(embedding_function=CountingEmbeddingFunction())
+    store.reindex_comp_stats("12", [
+        make_comp(["TFT12_Zac", "TFT12_Sona", "TFT12_Nami"], patch="12"),
+        make_comp(["TFT12_Ahri", "TFT12_Jinx", "TFT12_Lux"], patch="12"),
+        make_comp(["TFT12_Ahri", "TFT12_Jinx", "TFT12_Vi"], patch="11"),
+    ])
+    
+    result = await store.aretrieve(
+        "unrelated words", n_compositions=2, n_augments=1, n_playbooks=1,
+        patch_filter="12", board=["Ahri", "Jinx", "Vi"]
+    )
+    
+    top = result.compositions[0]
+    assert top["metadata"]["champions"] == '["TFT12_Ahri", "TFT12_Jinx", "TFT12_Lux"]'
+    assert top["overlap"] == 0.5
+    assert top["distance"] is not None
+    assert "board_index" in result.timings
+    
+    # Reindexing drops the index so new comps are found
+    store.reindex_comp_stats("12", [make_comp(["TFT12_Ahri", "TFT12_Jinx", "TFT12_Vi"], patch="12")])
+    hits = store.query_compositions_by_board(["Ahri", "Jinx", "Vi"], patch_filter="12")
+    assert [hit["overlap"] for hit in hits] == [1.0]
+    store.close()
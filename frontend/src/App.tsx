@@ -22,9 +22,25 @@ function App() {
     setIsLoading(true);
     setError(null);
 
+    // Show advice as it streams in: sources first, then each option
+    let partial: StrategicAdvice = {
+      snapshot,
+      options: [],
+      general_advice: '',
+      retrieved_context: [],
+    };
+    const update = (changes: Partial<StrategicAdvice>) => {
+      partial = { ...partial, ...changes };
+      setAdvice(partial);
+    };
+
     try {
-      const result = await api.getAdvice(snapshot);
-      setAdvice(result);
+      await api.streamAdvice(snapshot, {
+        onContext: (retrievedContext) => update({ retrieved_context: retrievedContext }),
+        onOption: (option) => update({ options: [...partial.options, option] }),
+        onGeneralAdvice: (generalAdvice) => update({ general_advice: generalAdvice }),
+        onDone: (result) => update(result),
+      });
     } catch (err: any) {
       setError(err.response?.data?.detail || err.message || 'Failed to get advice');
       console.error('Error getting advice:', err);
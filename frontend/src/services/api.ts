@@ -1,5 +1,11 @@
 import axios from 'axios';
-import { GameSnapshot, StrategicAdvice, HealthStatus } from '../types/api';
+import {
+  GameSnapshot,
+  StrategicAdvice,
+  StrategicOption,
+  HealthStatus,
+  AdviceStreamHandlers,
+} from '../types/api';
 
 const API_BASE_URL = '/api';
 
@@ -23,6 +29,63 @@ export const api = {
     return response.data;
   },
 
+  // Stream strategic advice (server-sent events) as it is generated
+  async streamAdvice(snapshot: GameSnapshot, handlers: AdviceStreamHandlers): Promise<void> {
+    const response = await fetch(`${API_BASE_URL}/advice/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(snapshot),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Advice stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    const dispatch = (block: string) => {
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (!data) return;
+      const payload = JSON.parse(data);
+
+      switch (event) {
+        case 'context':
+          handlers.onContext?.(payload.retrieved_context as string[]);
+          break;
+        case 'option':
+          handlers.onOption?.(payload as StrategicOption);
+          break;
+        case 'general_advice':
+          handlers.onGeneralAdvice?.(payload.general_advice as string);
+          break;
+        case 'done':
+          handlers.onDone?.(payload as StrategicAdvice);
+          break;
+        case 'error':
+          throw new Error(payload.detail);
+      }
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        dispatch(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+  },
+
   // Data ingestion endpoints
   async ingestPlayerData(puuid: string, count: number = 20) {
     const response = await apiClient.post('/data/ingest/player', null, {
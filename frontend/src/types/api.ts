@@ -38,6 +38,14 @@ export interface StrategicAdvice {
   options: StrategicOption[];
   general_advice: string;
   retrieved_context: string[];
+  generated_by?: 'llm' | 'fast';
+}
+
+export interface AdviceStreamHandlers {
+  onContext?: (retrievedContext: string[]) => void;
+  onOption?: (option: StrategicOption) => void;
+  onGeneralAdvice?: (generalAdvice: string) => void;
+  onDone?: (advice: StrategicAdvice) => void;
 }
 
 export interface HealthStatus {